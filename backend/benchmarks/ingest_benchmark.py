@@ -0,0 +1,189 @@
+"""Ingest benchmark: run process_excel on synthetic workbooks against a local mongod.
+
+For every scale it reports wall time, peak RSS and per-sheet parse rows/sec
+plus per-collection load rows/sec, appends the run to results/ingest.jsonl and
+compares it with the previous run of the same scale so regressions show up.
+
+    cd backend && python benchmarks/ingest_benchmark.py --scales 1 10 100
+
+BENCHMARK_MONGO_URL / BENCHMARK_DB_NAME select the instance (default
+mongodb://localhost:27017, database ingest_benchmark); the database is dropped
+before every run.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import synthetic_workbook
+from synthetic_workbook import server
+
+BENCH_DIR = Path(__file__).resolve().parent
+CACHE_DIR = BENCH_DIR / '.cache'
+RESULTS_FILE = BENCH_DIR / 'results' / 'ingest.jsonl'
+
+
+def workbook_for(scale: float, seed: int):
+    """Return (path, {sheet: rows}) for a cached synthetic workbook, generating it once"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    stem = f"synthetic_v{synthetic_workbook.GENERATOR_VERSION}_x{scale:g}_s{seed}"
+    path = CACHE_DIR / f"{stem}.xlsb"
+    meta = CACHE_DIR / f"{stem}.json"
+    if not path.exists() or not meta.exists():
+        print(f"Generating {path.name}...", flush=True)
+        counts = synthetic_workbook.write_workbook(path, scale, seed)
+        meta.write_text(json.dumps(counts, ensure_ascii=False))
+    return path, json.loads(meta.read_text())
+
+
+async def claim_benchmark_job(path: Path) -> str:
+    """Queue a job for the workbook and claim it like the ingest worker does"""
+    job_id = await server.enqueue_ingest_job(str(path), "benchmark", path.name)
+    await server.acquire_ingest_lock()
+    await server.db.ingest_jobs.update_one(
+        {"id": job_id}, {"$set": {"state": "running", "worker": server.INGEST_WORKER_ID}})
+    return job_id
+
+
+async def run_ingest(path: Path, counts: dict) -> dict:
+    """Single cold ingest in this process; called in a fresh child per scale"""
+    await server.client.drop_database(server.db.name)
+    job_id = await claim_benchmark_job(path)
+
+    start = time.perf_counter()
+    stats = await server.process_excel(str(path), job_id)
+    wall = time.perf_counter() - start
+
+    job = await server.db.ingest_jobs.find_one({"id": job_id})
+    sheets = []
+    for timing in job.get("sheet_timings", []):
+        rows = counts.get(timing["sheet"], 0)
+        # Parse süresi anahtar alanları ve satır id'lerini (transform) içermez
+        seconds = round(timing["seconds"] + timing.get("transform_seconds", 0), 3)
+        sheets.append({
+            "sheet": timing["sheet"],
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_sec": round(rows / seconds) if seconds > 0 else None,
+        })
+
+    # İşçiler forkserver'dan açıldığı için RUSAGE_CHILDREN onları saymaz;
+    # her işçi kendi tepe RSS'ini sayfa sürelerine yazar
+    worker_peak_rss_mb = max((t.get("worker_peak_rss_mb", 0.0) for t in job.get("sheet_timings", [])), default=0.0)
+    if server._ingest_pool is not None:
+        server._ingest_pool.shutdown(wait=True)
+        server._ingest_pool = None
+    server.client.close()
+
+    return {
+        "wall_seconds": round(wall, 3),
+        # ru_maxrss Linux'ta KB cinsinden
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "worker_peak_rss_mb": worker_peak_rss_mb,
+        "rows_total": sum(counts.values()),
+        "sheets": sorted(sheets, key=lambda s: s["sheet"]),
+        "loads": sorted(stats or [], key=lambda s: s["collection"]),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def previous_result(scale: float, seed: int):
+    if not RESULTS_FILE.exists():
+        return None
+    last = None
+    with open(RESULTS_FILE, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if (record.get("scale") == scale and record.get("seed") == seed
+                    and record.get("generator_version") == synthetic_workbook.GENERATOR_VERSION):
+                last = record
+    return last
+
+
+def print_report(result: dict, previous, max_regression: float) -> bool:
+    """Print one scale's numbers; returns False when wall time regressed past the limit"""
+    print(f"\n=== scale x{result['scale']:g}: {result['rows_total']} rows, "
+          f"{result['wall_seconds']:.2f}s wall, peak RSS {result['peak_rss_mb']} MB "
+          f"(workers {result['worker_peak_rss_mb']} MB)")
+    print(f"{'sheet':<32}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    for sheet in result["sheets"]:
+        print(f"{sheet['sheet']:<32}{sheet['rows']:>10}{sheet['seconds']:>10.3f}{sheet['rows_per_sec'] or 0:>12}")
+    print(f"{'collection':<32}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    for load in result["loads"]:
+        print(f"{load['collection']:<32}{load['rows']:>10}{load['seconds']:>10.3f}{load['rows_per_sec']:>12}")
+
+    if not previous:
+        return True
+    change = (result["wall_seconds"] - previous["wall_seconds"]) / previous["wall_seconds"]
+    rss_change = (result["peak_rss_mb"] - previous["peak_rss_mb"]) / previous["peak_rss_mb"]
+    print(f"vs {previous.get('revision') or '?'} ({previous['timestamp']}): "
+          f"wall {change:+.1%}, peak RSS {rss_change:+.1%}")
+    if change > max_regression:
+        print(f"REGRESSION: wall time up {change:.1%} (limit {max_regression:.0%})")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="exit non-zero if wall time grows more than this fraction")
+    parser.add_argument("--no-save", action="store_true", help="do not append to the results file")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        counts = json.loads(Path(args.run_one).with_suffix('.json').read_text())
+        result = asyncio.run(run_ingest(Path(args.run_one), counts))
+        print("RESULT " + json.dumps(result, ensure_ascii=False))
+        return 0
+
+    ok = True
+    for scale in args.scales:
+        path, _ = workbook_for(scale, args.seed)
+        # Her ölçek ayrı process'te çalışır ki peak RSS bir önceki çalıştırmayı içermesin
+        proc = subprocess.run([sys.executable, __file__, "--run-one", str(path)],
+                              capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("RESULT ")]
+        if proc.returncode != 0 or not lines:
+            print(proc.stderr[-4000:], file=sys.stderr)
+            print(f"scale x{scale:g} failed (exit {proc.returncode})", file=sys.stderr)
+            return 1
+
+        result = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "revision": git_revision(),
+            "scale": scale,
+            "seed": args.seed,
+            "generator_version": synthetic_workbook.GENERATOR_VERSION,
+            "workers": server.INGEST_WORKERS,
+            "batch_size": server.INGEST_BATCH_SIZE,
+            **json.loads(lines[-1][len("RESULT "):]),
+        }
+        ok = print_report(result, previous_result(scale, args.seed), args.max_regression) and ok
+        if not args.no_save:
+            RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(RESULTS_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Serialization benchmark: response bytes and p95 render time, old path vs new path.
+
+For the widest read endpoints it renders the same live documents two ways:
+
+  before  Pydantic models (where the endpoint had a response_model), FastAPI's
+          validate + serialize step and the stdlib JSONResponse, uncompressed
+  after   trusted_json (model_rows + orjson) plus gzip / brotli as applied by
+          CompressionMiddleware
+
+and reports bytes on the wire and p95 milliseconds per response. Mongo reads are
+outside the timings. The data comes from a synthetic workbook ingested into a
+local mongod, like ingest_benchmark.py; results go to results/serialization.jsonl.
+
+    cd backend && python benchmarks/serialization_benchmark.py --scale 10
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from ingest_benchmark import BENCH_DIR, claim_benchmark_job, git_revision, workbook_for
+from synthetic_workbook import server
+
+RESULTS_FILE = BENCH_DIR / 'results' / 'serialization.jsonl'
+
+# endpoint -> (handler, response_model of the old implementation or None)
+ENDPOINTS = {
+    "/dst-data": (server.get_dst_data, server.DSTData),
+    "/stand-raporu": (server.get_stand_raporu, None),
+    "/ilce-verileri": (server.get_ilce_verileri, None),
+    "/loyalty-bayiler": (server.get_loyalty_bayiler, None),
+}
+
+
+def render_before(docs, model):
+    """What the endpoint did before: build models, re-validate against response_model, stdlib JSON"""
+    if model is None:
+        return JSONResponse(jsonable_encoder(docs)).body
+    adapter = TypeAdapter(List[model])
+    # Eski get_dst_data: her alan için d.get(...), dst için "" varsayılanı
+    models = [model(**{**{name: doc.get(name) for name in model.model_fields}, "dst": doc.get("dst", "")})
+              for doc in docs]
+    return JSONResponse(adapter.dump_python(adapter.validate_python(models), mode="json")).body
+
+
+def render_after(docs, model):
+    if model is not None:
+        docs = server.model_rows(model, docs, dst="")
+    return server.trusted_json(docs).body
+
+
+def p95_ms(func, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.quantiles(samples, n=20)[-1], 3) if len(samples) > 1 else round(samples[0], 3)
+
+
+async def handler_documents(handler) -> list:
+    """Every row the endpoint returns, following next_cursor on paginated endpoints"""
+    # Önbellek katmanını atlamak için __wrapped__ çağrılır
+    if "after" not in inspect.signature(handler).parameters:
+        return json.loads((await handler.__wrapped__()).body)
+    rows, after = [], None
+    while True:
+        page = json.loads((await handler.__wrapped__(limit=server.PAGE_MAX_LIMIT, after=after)).body)
+        rows.extend(page["items"])
+        after = page["next_cursor"]
+        if not after:
+            return rows
+
+
+async def load_documents(scale: float, seed: int) -> dict:
+    path, _ = workbook_for(scale, seed)
+    await server.client.drop_database(server.db.name)
+    job_id = await claim_benchmark_job(path)
+    await server.process_excel(str(path), job_id)
+    documents = {}
+    for endpoint, (handler, model) in ENDPOINTS.items():
+        if model is not None:
+            # Eski endpoint ham dokümanları okuyup modele çeviriyordu
+            documents[endpoint] = await server.db.dst_data.find({}, {"_id": 0}).to_list(None)
+        else:
+            documents[endpoint] = await handler_documents(handler)
+    if server._ingest_pool is not None:
+        server._ingest_pool.shutdown(wait=True)
+        server._ingest_pool = None
+    server.client.close()
+    return documents
+
+
+def measure(documents: dict, iterations: int) -> List[dict]:
+    compressor = server.CompressionMiddleware(None)
+    rows = []
+    for endpoint, (_, model) in ENDPOINTS.items():
+        docs = documents[endpoint]
+        before = render_before(docs, model)
+        after = render_after(docs, model)
+        if json.loads(before) != json.loads(after):
+            raise SystemExit(f"{endpoint}: before/after bodies differ")
+        rows.append({
+            "endpoint": endpoint,
+            "documents": len(docs),
+            "before_bytes": len(before),
+            "after_bytes": len(after),
+            "gzip_bytes": len(compressor.compress(after, "gzip")),
+            "br_bytes": len(compressor.compress(after, "br")),
+            "before_p95_ms": p95_ms(lambda: render_before(docs, model), iterations),
+            "after_p95_ms": p95_ms(lambda: render_after(docs, model), iterations),
+            "gzip_p95_ms": p95_ms(lambda: compressor.compress(render_after(docs, model), "gzip"), iterations),
+            "br_p95_ms": p95_ms(lambda: compressor.compress(render_after(docs, model), "br"), iterations),
+        })
+    return rows
+
+
+def print_report(rows: List[dict]):
+    print(f"{'endpoint':<18}{'docs':>7}{'before B':>11}{'after B':>10}{'gzip B':>9}{'br B':>9}"
+          f"{'before ms':>11}{'after ms':>10}{'+gzip ms':>10}{'+br ms':>9}")
+    for r in rows:
+        print(f"{r['endpoint']:<18}{r['documents']:>7}{r['before_bytes']:>11}{r['after_bytes']:>10}"
+              f"{r['gzip_bytes']:>9}{r['br_bytes']:>9}{r['before_p95_ms']:>11.2f}{r['after_p95_ms']:>10.2f}"
+              f"{r['gzip_p95_ms']:>10.2f}{r['br_p95_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--no-save", action="store_true", help="do not append to the results file")
+    args = parser.parse_args()
+
+    rows = measure(asyncio.run(load_documents(args.scale, args.seed)), args.iterations)
+    print_report(rows)
+    if not args.no_save:
+        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(RESULTS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                "timestamp": datetime.utcnow().isoformat(),
+                "revision": git_revision(),
+                "scale": args.scale,
+                "seed": args.seed,
+                "iterations": args.iterations,
+                "endpoints": rows,
+            }, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
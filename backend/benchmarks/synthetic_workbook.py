@@ -0,0 +1,306 @@
+"""Synthetic .xlsb workbook generator for the ingest benchmarks.
+
+Writes a real BIFF12 workbook (the records pyxlsb reads) with every sheet the
+upload expects, laid out from the SheetSchema definitions in server.py so the
+generated file follows layout changes. Size is driven by the dealer count;
+scale=10 means ten times as many dealers, invoices, invoice lines, etc.
+
+    python benchmarks/synthetic_workbook.py out.xlsb --scale 10
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import zipfile
+from pathlib import Path
+
+# Benchmarks never run against the application's database: server.py reads
+# MONGO_URL/DB_NAME at import, so point them at the benchmark instance first.
+os.environ['MONGO_URL'] = os.environ.get('BENCHMARK_MONGO_URL', 'mongodb://localhost:27017')
+os.environ['DB_NAME'] = os.environ.get('BENCHMARK_DB_NAME', 'ingest_benchmark')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+# Bump when the generated content changes so cached workbooks are rebuilt
+GENERATOR_VERSION = 1
+
+BASE_DEALERS = 500
+INVOICES_PER_DEALER = 8
+LINES_PER_INVOICE = 3
+PAYMENTS_PER_DEALER = 4
+
+# BIFF12 record ids (pyxlsb.biff12)
+_WORKBOOK, _WORKBOOK_END = 0x0183, 0x0184
+_SHEETS, _SHEETS_END, _SHEET = 0x018F, 0x0190, 0x019C
+_SST, _SST_END, _SI = 0x019F, 0x01A0, 0x0013
+_WORKSHEET, _WORKSHEET_END = 0x0181, 0x0182
+_DIMENSION, _SHEETDATA, _SHEETDATA_END = 0x0194, 0x0191, 0x0192
+_ROW, _FLOAT, _STRING = 0x0000, 0x0005, 0x0007
+
+DST_NAMES = [
+    "KEMAL BANİ", "COŞKUN ÇİMEN", "MUSTAFA KAĞAN KAYA", "MUSTAFA HARMANCI",
+    "KAZIM KARABEKİR ÖRAN", "TUNAHAN IŞILAK", "MEVLÜT ŞEKER", "TAHİR UÇAR",
+    "YASİN TUĞRA DAĞLI", "HÜSEYİN AYHAN AKMAN", "MUSTAFA USLU", "HASAN ALİ AKDAĞ",
+    "AHMET GÖKMEN", "LÜTFİ UYSAL", "ŞERAFETTİN BÜYÜKTAŞDELEN", "BURAK KÜÇÜKŞANTÜRK",
+    "YASİN AVCI", "MUSTAFA İBİŞ",
+]
+TTE_NAMES = ["ALİ VURAL", "EMRE GÜNEŞ", "SELİM ÖZTÜRK", "ONUR ÇELİK"]
+DSM_NAMES = ["OSMAN DİNÇOL", "MURAT YÖRÜKOĞLU"]
+ILCELER = ["SELÇUKLU", "MERAM", "KARATAY", "EREĞLİ", "AKŞEHİR", "BEYŞEHİR", "ÇUMRA", "SEYDİŞEHİR"]
+TIPLER = ["01-BAKKAL", "02-MARKET", "03-BÜFE", "04-KURUYEMİŞ", "05-TEKEL", "07-BENZİNLİK"]
+SINIFLAR = ["A+", "A", "B", "C", "D", "E", "E-"]
+KANALLAR = ["BAKKAL", "MARKET", "BÜFE", "TEKEL", "BENZİNLİK"]
+DURUMLAR = ["AKTİF", "PASİF"]
+GUNLER = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi"]
+
+# Alan adı -> sözlük; listede olmayan metin alanları "<ALAN> n" olarak üretilir
+FIELD_VOCABULARY = {
+    "dst": DST_NAMES, "tte": TTE_NAMES, "dsm": DSM_NAMES, "ilce": ILCELER,
+    "tip": TIPLER, "sinif": SINIFLAR, "kanal": KANALLAR, "bayi_durumu": DURUMLAR,
+    "durum": DURUMLAR, "musteri_durum": DURUMLAR, "kapsam_durumu": ["KAPSAMDA", "KAPSAM DIŞI"],
+    "jti_stant": ["VAR", "YOK"], "camel_myo_stant": ["VAR", "YOK"],
+    "pmi_stant": ["VAR", "YOK"], "bat_stant": ["VAR", "YOK"],
+    "tahsilat_turu": ["NAKİT", "KREDİ KARTI", "HAVALE"],
+}
+
+
+def _record(rec_id: int, payload: bytes = b"") -> bytes:
+    rec = bytes([rec_id]) if rec_id < 0x80 else struct.pack('<H', rec_id)
+    length = len(payload)
+    while True:
+        byte = length & 0x7F
+        length >>= 7
+        if length:
+            rec += bytes([byte | 0x80])
+        else:
+            rec += bytes([byte])
+            break
+    return rec + payload
+
+
+def _wide_string(value: str) -> bytes:
+    encoded = value.encode('utf-16-le')
+    return struct.pack('<I', len(encoded) // 2) + encoded
+
+
+class XlsbWriter:
+    """Minimal streaming BIFF12 writer: numbers, shared strings and nothing else"""
+
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        self._sheets = []
+        self._strings = {}
+
+    def _string_index(self, value: str) -> int:
+        idx = self._strings.get(value)
+        if idx is None:
+            idx = self._strings[value] = len(self._strings)
+        return idx
+
+    def add_sheet(self, name: str, width: int, rows: list):
+        """Write a sheet from (row_index, {column: value}) pairs in row order"""
+        last_row = rows[-1][0] if rows else 0
+        sheet_no = len(self._sheets) + 1
+        self._sheets.append(name)
+        with self._zip.open(f'xl/worksheets/sheet{sheet_no}.bin', 'w') as out:
+            out.write(_record(_WORKSHEET))
+            out.write(_record(_DIMENSION, struct.pack('<IIII', 0, last_row, 0, width - 1)))
+            out.write(_record(_SHEETDATA))
+            buf = bytearray()
+            for r, cells in rows:
+                buf += _record(_ROW, struct.pack('<I', r) + bytes(13))
+                for c in sorted(cells):
+                    v = cells[c]
+                    if v is None:
+                        continue
+                    if isinstance(v, str):
+                        buf += _record(_STRING, struct.pack('<III', c, 0, self._string_index(v)))
+                    else:
+                        buf += _record(_FLOAT, struct.pack('<IId', c, 0, float(v)))
+                if len(buf) > 1 << 20:
+                    out.write(buf)
+                    buf.clear()
+            out.write(buf)
+            out.write(_record(_SHEETDATA_END))
+            out.write(_record(_WORKSHEET_END))
+
+    def close(self):
+        book = bytearray(_record(_WORKBOOK) + _record(_SHEETS))
+        rels = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">']
+        for i, name in enumerate(self._sheets, start=1):
+            book += _record(_SHEET, struct.pack('<II', 0, i) + _wide_string(f'rId{i}') + _wide_string(name))
+            rels.append(f'<Relationship Id="rId{i}" Target="worksheets/sheet{i}.bin" '
+                        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>')
+        book += _record(_SHEETS_END) + _record(_WORKBOOK_END)
+        rels.append('</Relationships>')
+
+        sst = bytearray(_record(_SST, struct.pack('<II', len(self._strings), len(self._strings))))
+        for value in self._strings:
+            sst += _record(_SI, b'\x00' + _wide_string(value))
+        sst += _record(_SST_END)
+
+        self._zip.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="bin" ContentType="application/vnd.ms-excel.sheet.binary.macroEnabled.main"/>'
+            '</Types>'))
+        self._zip.writestr('xl/workbook.bin', bytes(book))
+        self._zip.writestr('xl/_rels/workbook.bin.rels', '\n'.join(rels))
+        self._zip.writestr('xl/sharedStrings.bin', bytes(sst))
+        self._zip.close()
+
+
+def schema_row(schema, rng: random.Random, overrides: dict = None) -> dict:
+    """Random values for every schema field, keyed by column"""
+    cells = {}
+    for field, col, kind in schema.fields:
+        if kind in ("float", "int"):
+            cells[col] = float(rng.randrange(0, 5000)) if kind == "int" else round(rng.uniform(0, 50000), 2)
+        elif kind == "raw":
+            cells[col] = float(rng.randrange(45000, 46400))
+        else:
+            base = field.split("_")[0] if field not in FIELD_VOCABULARY else field
+            vocab = FIELD_VOCABULARY.get(field) or FIELD_VOCABULARY.get(base)
+            cells[col] = rng.choice(vocab) if vocab else f"{field.upper()} {rng.randrange(50)}"
+    cells.update(overrides or {})
+    return cells
+
+
+def header_row(index: int, width: int):
+    return index, {c: f"SÜTUN {c}" for c in range(width)}
+
+
+def tarih(rng: random.Random) -> float:
+    return float(rng.randrange(45292, 46022))  # 2024-01-01 .. 2025-12-31
+
+
+def generate_sheets(scale: float, seed: int = 42):
+    """Yield (sheet name, width, rows, data row count) for every uploaded sheet"""
+    rng = random.Random(seed)
+    dealers = max(1, int(BASE_DEALERS * scale))
+    codes = [100000 + i for i in range(dealers)]
+    names = [f"{rng.choice(ILCELER)} TİCARET {i} LTD. ŞTİ." for i in range(dealers)]
+
+    s = server.BAYI_LIST_SCHEMA
+    width = max(s.width, 99)
+    yield s.sheet, width, [header_row(0, width), header_row(1, width)] + [
+        (s.start_row + i, schema_row(s, rng, {0: float(kod), 1: names[i]}))
+        for i, kod in enumerate(codes)
+    ], dealers
+
+    s = server.FATURA_SCHEMA
+    invoices = []
+    rows = [header_row(0, 14)]
+    for i, kod in enumerate(codes):
+        for j in range(INVOICES_PER_DEALER):
+            matbu = f"KNY{i:07d}{j:02d}"
+            invoices.append(matbu)
+            rows.append((len(rows), schema_row(s, rng, {0: str(kod), 3: tarih(rng), 5: matbu})))
+    yield s.sheet, 14, rows, len(rows) - 1
+
+    s = server.BELGE_DETAY_SCHEMA
+    rows = [header_row(0, 9)]
+    for matbu in invoices:
+        for _ in range(LINES_PER_INVOICE):
+            urun = rng.choice(server.SKU_FIELDS[:-1]).replace("_", " ").upper()
+            rows.append((len(rows), schema_row(s, rng, {0: matbu, 6: urun})))
+    yield s.sheet, 9, rows, len(rows) - 1
+
+    s = server.TAHSILAT_SCHEMA
+    rows = [header_row(0, 9)]
+    for kod in codes:
+        for _ in range(PAYMENTS_PER_DEALER):
+            gun = rng.randrange(1, 29)
+            rows.append((len(rows), schema_row(s, rng, {2: str(kod), 5: f"{gun:02d}/{rng.randrange(1, 13):02d}/2025"})))
+    yield s.sheet, 9, rows, len(rows) - 1
+
+    s = server.KONYA_GUN_SCHEMA
+    width = 26
+    rows = [header_row(0, width)]
+    rows += [(1 + i, {7: kanal, 10: round(rng.uniform(0, 1e6), 2)}) for i, kanal in enumerate(KANALLAR)]
+    rows.append(header_row(s.header_row, width))
+    rows += [(s.start_row + i, schema_row(s, rng, {0: float(kod), 1: names[i]})) for i, kod in enumerate(codes)]
+    yield s.sheet, width, rows, dealers
+
+    s = server.STAND_RAPORU_SCHEMA
+    width = 73
+    rows = [header_row(0, width)]
+    for i, kod in enumerate(codes):
+        cells = schema_row(s, rng, {5: str(kod), 6: names[i]})
+        cells.update({66 + d: float(rng.random() < 0.2) for d in range(7)})
+        rows.append((1 + i, cells))
+    yield s.sheet, width, rows, dealers
+
+    # DATA sabit 32 satırlık özet sayfası, ölçekten bağımsız
+    width = 124
+    rows = [header_row(0, width)]
+    for r in range(1, 21):
+        label = "TEAM-II" if r == 10 else "TEAM-I" if r == 20 else DST_NAMES[(r - 1) % len(DST_NAMES)]
+        rows.append((r, schema_row(server.DATA_DST_SCHEMA, rng, {0: label})))
+    rows.append((21, schema_row(server.DATA_TOTALS_SCHEMA, rng, {0: "TOPLAM"})))
+    rows += [(23 + i, schema_row(server.DATA_TTE_SCHEMA, rng, {0: name})) for i, name in enumerate(TTE_NAMES)]
+    rows += [(28 + i, schema_row(server.DATA_TTE_STAND_SCHEMA, rng, {0: name})) for i, name in enumerate(TTE_NAMES)]
+    yield 'DATA', width, rows, len(rows) - 1
+
+    s = server.EKIP_RAPORU_SCHEMA
+    rows = [header_row(0, s.width)]
+    for d in range(365):
+        rows.append((1 + d, schema_row(s, rng, {0: server.AY_ALANLARI[d * 12 // 365].upper(), 1: float(45658 + d)})))
+    rows.append((len(rows), schema_row(s, rng, {1: "YIL TOPLAM KARTON"})))
+    rows.append((len(rows), schema_row(s, rng, {1: "YIL TOPLAM KASA"})))
+    yield s.sheet, s.width, rows, len(rows) - 1
+
+    s = server.STIL_AY_SATIS_SCHEMA
+    rows = [header_row(0, s.width)] + [(1 + i, schema_row(s, rng, {0: ay.upper()})) for i, ay in enumerate(server.AY_ALANLARI)]
+    yield s.sheet, s.width, rows, len(rows) - 1
+
+    s = server.PERSONEL_DATA_SCHEMA
+    rows = [header_row(0, s.width), header_row(1, s.width)]
+    rows += [(2 + i, schema_row(s, rng, {3: name})) for i, name in enumerate(DST_NAMES + TTE_NAMES + DSM_NAMES)]
+    yield s.sheet, s.width, rows, len(rows) - 2
+
+    s = server.RUT_SCHEMA
+    rows = [header_row(0, s.width)]
+    for i, kod in enumerate(codes):
+        dst = DST_NAMES[i % len(DST_NAMES)]
+        rows.append((1 + i, schema_row(s, rng, {
+            2: f"R{i % len(DST_NAMES):02d}{i % 6}", 3: f"{dst} {GUNLER[i % 6]}",
+            4: float(i // (len(DST_NAMES) * 6) + 1), 5: str(kod), 6: names[i],
+        })))
+    yield s.sheet, s.width, rows, dealers
+
+    s = server.BAYI_HEDEF_SCHEMA
+    rows = [header_row(0, 21)] + [(1 + i, schema_row(s, rng, {1: float(kod), 2: names[i]})) for i, kod in enumerate(codes)]
+    yield s.sheet, 21, rows, dealers
+
+    s = server.FATURA_EKI_SCHEMA
+    rows = [header_row(r, 18) for r in range(4)]
+    loyalty = codes[::5]
+    rows += [(s.start_row + i, schema_row(s, rng, {4: float(kod), 5: names[(kod - 100000)]})) for i, kod in enumerate(loyalty)]
+    yield s.sheet, 18, rows, len(loyalty)
+
+
+def write_workbook(path, scale: float, seed: int = 42) -> dict:
+    """Write the synthetic workbook and return {sheet: data row count}"""
+    writer = XlsbWriter(path)
+    counts = {}
+    try:
+        for name, width, rows, count in generate_sheets(scale, seed):
+            writer.add_sheet(name, width, rows)
+            counts[name] = count
+    finally:
+        writer.close()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    for sheet, count in write_workbook(args.path, args.scale, args.seed).items():
+        print(f"{sheet}: {count} rows")
@@ -1,30 +1,95 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Query
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Match
+from starlette.datastructures import Headers
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, InsertOne, DeleteMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from bson import json_util, ObjectId
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Generic, TypeVar, Union
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 import pyxlsb
 import tempfile
 import re
 import unicodedata
 import httpx
+import asyncio
+import time
+import hashlib
+import math
+import json
+import gzip
+import base64
+import functools
+import contextvars
+import itertools
+import resource
+import orjson
+import brotli
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from concurrent.futures.process import BrokenProcessPool
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# İsteğin başında okunan (nesil, koleksiyon haritası); istek boyunca bütün
+# okumalar aynı yüklemenin koleksiyonlarına gider
+request_generation: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar(
+    "request_generation", default=None)
+
+class GenerationDatabase:
+    """Motor database that resolves upload collections to the copy the published generation uses.
+
+    Yüklenen her koleksiyonun iki fiziksel kopyası vardır: {ad} ve {ad}__alt.
+    Hangisinin yayında olduğunu system_info'daki "physical" haritası söyler;
+    yükleme diğer kopyaya yazar, yayın ve geri alma yalnızca haritayı çevirir.
+    Haritada olmayan adlar (system_info, ingest_jobs, ...) olduğu gibi geçer.
+    """
+    
+    def __init__(self, database):
+        self.database = database
+        # Yalnızca bütünüyle değiştirilir, yerinde güncellenmez: istekler referansı saklar
+        self.physical: Dict[str, str] = {}
+    
+    def resolve(self, name: str) -> str:
+        snapshot = request_generation.get()
+        physical = self.physical if snapshot is None else snapshot[1]
+        return physical.get(name, name)
+    
+    def __getitem__(self, name: str):
+        return self.database[self.resolve(name)]
+    
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        resolved = self.resolve(name)
+        if resolved != name:
+            return self.database[resolved]
+        return getattr(self.database, name)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = GenerationDatabase(client[os.environ['DB_NAME']])
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson rendering; NaN/inf become null instead of failing the request"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -36,6 +101,201 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Okuma endpoint'leri için süreç içi yanıt önbelleği. Veriler yalnızca bir
+# yükleme yayınlandığında değiştiği için anahtar, endpoint + parametreler +
+# yükleme nesli (system_info.generation); yeni nesil eski kayıtları geçersiz
+# kılar. Nesil en fazla CACHE_GENERATION_CHECK saniyede bir Mongo'dan okunur.
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '2048'))
+# Önbellekteki yanıtların toplam (serileştirilmiş) boyut sınırı
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', '300'))
+CACHE_GENERATION_CHECK = float(os.environ.get('CACHE_GENERATION_CHECK', '5'))
+
+def response_size(value: Any) -> int:
+    """Serialized size of a cached endpoint result, used for the cache byte budget"""
+    if isinstance(value, Response):
+        return len(value.body)
+    return len(orjson.dumps(value, default=lambda o: o.model_dump() if isinstance(o, BaseModel) else str(o),
+                            option=orjson.OPT_NON_STR_KEYS))
+
+class ResponseCache:
+    """LRU bounded by entry count and total bytes, with a per-entry TTL, scoped to one upload generation.
+
+    Yalnızca başarılı sonuçlar saklanır: endpoint hata durumunda exception
+    fırlatır, bu yüzden geçici bir Mongo hatası önbelleğe girmez.
+    """
+    
+    def __init__(self, max_entries: int, ttl: float, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.ttl = ttl
+        self.generation: Optional[int] = None
+        # Neslin yayınlandığı an (UTC); Last-Modified başlığı buradan gelir
+        self.published_at: Optional[datetime] = None
+        self.checked_at = 0.0
+        # key -> (expires_at, value, size)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._pending: Dict[tuple, asyncio.Future] = {}
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0,
+                         "uncacheable": 0}
+    
+    def clear(self):
+        if self._entries:
+            self.counters["invalidations"] += 1
+        self._entries.clear()
+        self.bytes = 0
+    
+    def _store(self, key: tuple, value: Any):
+        # Başarısız yanıtlar ve bütçeden büyük sonuçlar saklanmaz
+        if isinstance(value, Response) and value.status_code != 200:
+            self.counters["uncacheable"] += 1
+            return
+        size = response_size(value)
+        if size > self.max_bytes:
+            self.counters["uncacheable"] += 1
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous[2]
+        self._entries[key] = (time.monotonic() + self.ttl, value, size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.counters["evictions"] += 1
+    
+    def set_generation(self, generation: Optional[int], published_at: Optional[str] = None):
+        self.checked_at = time.monotonic()
+        if generation != self.generation:
+            self.clear()
+            self.generation = generation
+            self.published_at = utc_datetime(published_at)
+    
+    async def current_generation(self) -> Optional[int]:
+        if time.monotonic() - self.checked_at >= CACHE_GENERATION_CHECK:
+            info = await db.system_info.find_one(
+                {"type": "excel_upload"}, {"generation": 1, "yayinlanma": 1, "son_guncelleme": 1, "physical": 1}
+            ) or {}
+            # yayinlanma öncesi yüklemelerde son_guncelleme kullanılır
+            self.set_generation(info.get("generation", 0), info.get("yayinlanma") or info.get("son_guncelleme"))
+            # Koleksiyon haritası nesille aynı belgeden gelir
+            db.physical = info.get("physical") or {}
+        return self.generation
+    
+    async def get_or_compute(self, key: tuple, compute):
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value, size = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return value
+            del self._entries[key]
+            self.bytes -= size
+            self.counters["expirations"] += 1
+        self.counters["misses"] += 1
+        
+        # Aynı anahtar için eşzamanlı istekler tek hesaplamayı bekler
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # bekleyen yoksa "never retrieved" uyarısını önle
+            raise
+        finally:
+            self._pending.pop(key, None)
+        future.set_result(value)
+        # Hesaplama sürerken nesil değiştiyse sonucu saklama
+        if key[1] == self.generation:
+            self._store(key, value)
+        return value
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_ratio": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "generation": self.generation,
+        }
+
+def trusted_json(content: Any) -> Response:
+    """Return Mongo documents as-is, skipping response_model validation and jsonable_encoder.
+
+    Yalnızca yüklemede şekli belirlenmiş koleksiyonlar için; response_model
+    OpenAPI şeması için decorator'da kalır. @cached ile birlikte önbellekte
+    serileştirilmiş gövde tutulur.
+    """
+    return FastJSONResponse(content)
+
+def model_rows(model: type, docs: List[Dict[str, Any]], only: Optional[List[str]] = None,
+               **defaults) -> List[Dict[str, Any]]:
+    """Shape documents to the model's fields and defaults without validating them.
+
+    only restricts the output to those fields (see parse_fields).
+    """
+    fields = {name: defaults.get(name, None if field.is_required() else field.get_default(call_default_factory=True))
+              for name, field in model.model_fields.items() if only is None or name in only}
+    return [{name: doc.get(name, default) for name, default in fields.items()} for doc in docs]
+
+# Geniş dokümanlarda fields=a,b,c ile yalnızca istenen alanlar okunur ve döner
+FIELD_NAME = re.compile(r"[A-Za-z0-9_]+")
+
+def parse_fields(fields: Optional[str], model: Optional[type] = None) -> Optional[List[str]]:
+    """Split a fields= parameter; None means every field. Names outside the model are a 400"""
+    names = list(dict.fromkeys(name.strip() for name in (fields or "").split(",") if name.strip()))
+    if not names:
+        return None
+    invalid = [name for name in names
+               if not FIELD_NAME.fullmatch(name) or (model is not None and name not in model.model_fields)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen alan: {', '.join(invalid)}")
+    return names
+
+def fields_projection(names: List[str]) -> Dict[str, int]:
+    return {"_id": 0, **{name: 1 for name in names}}
+
+def utc_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a stored ISO timestamp; naive values are server-local time"""
+    try:
+        return datetime.fromisoformat(value).astimezone(timezone.utc).replace(microsecond=0)
+    except (TypeError, ValueError):
+        return None
+
+response_cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_MAX_BYTES)
+
+def cached(func):
+    """Serve a read endpoint from response_cache; path and query parameters form the key"""
+    @functools.wraps(func)
+    async def wrapper(**kwargs):
+        # Anahtar, isteğin okuduğu koleksiyonların nesli olmalı
+        snapshot = request_generation.get()
+        generation = snapshot[0] if snapshot else await response_cache.current_generation()
+        params = dict(kwargs)
+        if params.get("fields") is not None:
+            # "a,b", "b,a" ve "a,b,a" aynı yanıtı verir; anahtar da aynı olsun
+            names = parse_fields(params["fields"])
+            params["fields"] = tuple(sorted(names)) if names else None
+        key = (func.__name__, generation, tuple(sorted(params.items())))
+        value = await response_cache.get_or_compute(key, lambda: func(**kwargs))
+        if isinstance(value, Response):
+            # Gövde paylaşılır; middleware'ler başlıkları yerinde değiştirebildiği için yeni nesne
+            return Response(value.body, status_code=value.status_code, media_type=value.media_type)
+        return value
+    # conditional_get middleware'i yalnızca bu endpoint'lere ETag verir
+    wrapper.generation_scoped = True
+    return wrapper
+
 # Define Models
 class LoginRequest(BaseModel):
     username: str
@@ -241,6 +501,9 @@ class BayiDetail(BaseModel):
     borc_durumu: Optional[str] = None
     # Visit days
     ziyaret_gunleri: Optional[List[str]] = None
+    # Debt aging (konya_gun) and monthly targets (bayi_hedef)
+    borc: Optional[Dict[str, float]] = None
+    hedef: Optional[Dict[str, Any]] = None
 
 class Fatura(BaseModel):
     matbu_no: str
@@ -537,6 +800,13 @@ class CariBayi(BaseModel):
     gun_13: Optional[float] = None
     gun_14_uzeri: Optional[float] = None
 
+PageItem = TypeVar("PageItem")
+
+class Page(BaseModel, Generic[PageItem]):
+    """Keyset-paginated list; pass next_cursor back as `after` until it is null"""
+    items: List[PageItem]
+    next_cursor: Optional[str] = None
+
 # Helper function to convert Turkish characters for case-insensitive search
 def turkish_to_ascii(text: str) -> str:
     """Convert Turkish special characters to ASCII equivalents"""
@@ -589,6 +859,138 @@ def safe_str(value):
         return None
     return str(value).strip() if value else None
 
+_FLOAT_KODU = re.compile(r'(\d+)\.0+')
+
+def canonical_bayi_kodu(value) -> str:
+    """Single stored/queried form of a dealer code: 1234.0, "1234.0" and " 1234 " -> "1234" """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        # Yalnızca tam sayı değerler kısaltılır; 12.5 olduğu gibi kalır, NaN/inf boş koddur
+        if not math.isfinite(value):
+            return ""
+        return str(int(value)) if value.is_integer() else str(value)
+    text = str(value).strip()
+    match = _FLOAT_KODU.fullmatch(text)
+    return match.group(1) if match else text
+
+async def find_by_keys(collection: str, keys, projection: Optional[dict] = None,
+                       field: str = "bayi_kodu") -> Dict[Any, dict]:
+    """Fetch the rows for a set of keys with one $in query; the first row per key wins.
+
+    Replaces per-row find_one calls when enriching a list of rows from another collection.
+    """
+    keys = list({key for key in keys if key})
+    if not keys:
+        return {}
+    if projection is not None:
+        projection = {**projection, field: 1}
+    found = {}
+    async for doc in db[collection].find({field: {"$in": keys}}, projection):
+        found.setdefault(doc.get(field), doc)
+    return found
+
+# Liste endpoint'lerinde keyset sayfalama. limit ya da after gönderilirse yanıt
+# {"items": [...], "next_cursor": ...} olur; next_cursor son satırın sıralama
+# değerleridir ve sonraki istekte after olarak geri gönderilir. Sayfa
+# PAGE_MAX_LIMIT'i aşamaz. İkisi de yoksa (sayfalamayı bilmeyen eski uygulama
+# sürümleri) eskisi gibi düz liste döner, UNPAGED_LIST_LIMIT satırla sınırlı.
+PAGE_MAX_LIMIT = int(os.environ.get('PAGE_MAX_LIMIT', '1000'))
+PAGE_DEFAULT_LIMIT = min(int(os.environ.get('PAGE_DEFAULT_LIMIT', '500')), PAGE_MAX_LIMIT)
+UNPAGED_LIST_LIMIT = int(os.environ.get('UNPAGED_LIST_LIMIT', '20000'))
+# Cursor değerleri sorguya aynen girer; {"$ne": null} gibi operatör dokümanları
+# reddedilsin diye yalnızca skaler tiplere izin verilir
+CURSOR_VALUE_TYPES = (str, int, float, bool, type(None), datetime, ObjectId)
+
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if (not isinstance(values, list) or len(values) != size
+            or not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values)):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+    return values
+
+def keyset_filter(sort: List[tuple], values: List[Any]) -> dict:
+    """Rows strictly after `values` in `sort` order; null sorts lowest like in Mongo"""
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        prefix = {name: values[j] for j, (name, _) in enumerate(sort[:i])}
+        value = values[i]
+        if direction == 1:
+            branches.append({**prefix, field: {"$ne": None} if value is None else {"$gt": value}})
+        elif value is not None:
+            # Azalan sırada null'lar en sonda gelir
+            branches.append({**prefix, "$or": [{field: {"$lt": value}}, {field: None}]})
+    return {"$or": branches}
+
+async def keyset_page(collection: str, query: dict, sort: List[tuple], limit: Optional[int] = None,
+                      after: Optional[str] = None, projection: Optional[dict] = None):
+    """One page of rows in `sort` order after the cursor; returns (rows, next_cursor).
+
+    sort must end in a unique field (normally _id) and be backed by an index.
+    Without a limit every remaining row is returned and next_cursor is None.
+    """
+    if after:
+        query = {"$and": [query, keyset_filter(sort, decode_cursor(after, len(sort)))]}
+    # Cursor için gereken sıralama alanları projeksiyon dışıysa geçici olarak okunur
+    hidden = []
+    if projection:
+        inclusive = any(value for name, value in projection.items() if name != "_id")
+        for field, _ in sort:
+            returned = projection.get(field, not inclusive or field == "_id")
+            if not returned:
+                hidden.append(field)
+        if inclusive:
+            projection = {**projection, **{field: 1 for field in hidden}}
+        else:
+            # Boş projeksiyon pymongo'da yalnızca _id döndürür
+            projection = {name: value for name, value in projection.items() if name not in hidden} or None
+    cursor = db[collection].find(query, projection).sort(sort)
+    if limit:
+        cursor = cursor.limit(limit + 1)
+    rows = await cursor.to_list(None)
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].get(field) for field, _ in sort])
+    for row in rows:
+        for field in hidden:
+            row.pop(field, None)
+    return rows, next_cursor
+
+async def pipeline_page(collection: str, pipeline: List[dict], sort: List[tuple], limit: int,
+                        after: Optional[str] = None):
+    """keyset_page for an aggregation whose output rows carry every `sort` field"""
+    stages = [*pipeline, {"$sort": dict(sort)}]
+    if after:
+        stages.append({"$match": keyset_filter(sort, decode_cursor(after, len(sort)))})
+    stages.append({"$limit": limit + 1})
+    rows = await db[collection].aggregate(stages).to_list(None)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].get(field) for field, _ in sort])
+    return rows, next_cursor
+
+def page_limit(limit: Optional[int], after: Optional[str] = None) -> tuple:
+    """(row limit, paged): a paged request gets at most PAGE_MAX_LIMIT rows,
+    PAGE_DEFAULT_LIMIT when only after is given; a legacy one UNPAGED_LIST_LIMIT"""
+    if limit is None and after is None:
+        return UNPAGED_LIST_LIMIT, False
+    return min(limit or PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT), True
+
+def page_response(rows: List[Any], next_cursor: Optional[str] = None, paged: bool = True):
+    if paged:
+        return {"items": rows, "next_cursor": next_cursor}
+    if next_cursor:
+        logger.warning(f"Unpaged list truncated at {len(rows)} rows; client should send limit/after")
+    return rows
+
 # DST listesi ve şifreleri
 DST_USERS = {
     "dst1": {"name": "KEMAL BANİ", "password": "dst1konya"},
@@ -770,6 +1172,7 @@ async def get_users():
 
 # Dashboard stats
 @api_router.get("/dashboard/stats", response_model=DashboardStats)
+@cached
 async def get_dashboard_stats():
     try:
         aktif = await db.stand_raporu.count_documents({"bayi_durumu": "Aktif"})
@@ -777,200 +1180,70 @@ async def get_dashboard_stats():
         return DashboardStats(aktif_bayi=aktif, pasif_bayi=pasif)
     except Exception as e:
         logger.error(f"Error getting dashboard stats: {e}")
-        return DashboardStats(aktif_bayi=0, pasif_bayi=0)
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Distributor totals endpoint
 @api_router.get("/distributor-totals", response_model=DistributorTotals)
-async def get_distributor_totals():
+@cached
+async def get_distributor_totals(fields: Optional[str] = Query(default=None, description="Virgülle ayrılmış alan listesi; boşsa tüm alanlar")):
     try:
-        totals = await db.distributor_totals.find_one({"type": "totals"})
-        if totals:
-            return DistributorTotals(**{k: v for k, v in totals.items() if k != "_id" and k != "type"})
-        return DistributorTotals()
+        fields = parse_fields(fields, DistributorTotals)
+        projection = fields_projection(fields) if fields else {"_id": 0, "type": 0}
+        totals = await db.distributor_totals.find_one({"type": "totals"}, projection)
+        return trusted_json(model_rows(DistributorTotals, [totals or {}], fields)[0])
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting distributor totals: {e}")
-        return DistributorTotals()
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Pasif Bayiler listesi
-@api_router.get("/pasif-bayiler", response_model=List[PasifBayi])
-async def get_pasif_bayiler():
+@api_router.get("/pasif-bayiler", response_model=Union[Page[PasifBayi], List[PasifBayi]])
+@cached
+async def get_pasif_bayiler(limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                            after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        # Get all passive dealers from stand_raporu
-        pasif_list = await db.stand_raporu.find({"bayi_durumu": "Pasif"}).to_list(1000)
-        
-        result = []
-        for p in pasif_list:
-            bayi_kodu = p.get("bayi_kodu", "")
-            bayi_unvani = p.get("bayi_unvani", "")
-            dst = p.get("dst")
-            tte = p.get("tte")
-            
-            # If not found in stand_raporu, try bayiler collection
-            if not bayi_unvani or not dst:
-                bayi = await db.bayiler.find_one({"bayi_kodu": bayi_kodu})
-                if bayi:
-                    bayi_unvani = bayi_unvani or bayi.get("bayi_unvani", "")
-                    dst = dst or bayi.get("dst")
-                    tte = tte or bayi.get("tte")
-            
-            result.append(PasifBayi(
-                bayi_kodu=bayi_kodu,
-                bayi_unvani=bayi_unvani,
-                dst=dst,
-                tte=tte,
-                txtkapsam=p.get("txtkapsam")
-            ))
-        
-        # Sort by bayi_unvani
-        result.sort(key=lambda x: x.bayi_unvani or "")
-        return result
+        # Ünvanı ya da DST'si eksik olanlar bayiler'den tamamlanır
+        return await pasif_bayiler({}, limit, after, tamamla=True)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting pasif bayiler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # DST Data listesi
-@api_router.get("/dst-data", response_model=List[DSTData])
-async def get_dst_data():
+@api_router.get("/dst-data", response_model=Union[Page[DSTData], List[DSTData]])
+@cached
+async def get_dst_data(limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                       after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri"),
+                       fields: Optional[str] = Query(default=None, description="Virgülle ayrılmış alan listesi; boşsa tüm alanlar")):
     try:
-        dst_list = await db.dst_data.find({}).to_list(100)
-        result = []
-        for d in dst_list:
-            result.append(DSTData(
-                dst=d.get("dst", ""),
-                bayi_sayisi=d.get("bayi_sayisi"),
-                aktif_bayi_sayisi=d.get("aktif_bayi_sayisi"),
-                pasif_bayi_sayisi=d.get("pasif_bayi_sayisi"),
-                aralik_hedef=d.get("aralik_hedef"),
-                aralik_satis=d.get("aralik_satis"),
-                kalan_satis=d.get("kalan_satis"),
-                hedef_basari_orani=d.get("hedef_basari_orani"),
-                tahsilat_hedef=d.get("tahsilat_hedef"),
-                tahsilat_tutari=d.get("tahsilat_tutari"),
-                ay_hedef_ziyaret=d.get("ay_hedef_ziyaret"),
-                ziyaret_gerceklesen=d.get("ziyaret_gerceklesen"),
-                drop_rate=d.get("drop_rate"),
-                basarili_satis=d.get("basarili_satis"),
-                basarili_satis_yuzde=d.get("basarili_satis_yuzde"),
-                carili_bayi_sayisi=d.get("carili_bayi_sayisi"),
-                gun_0=d.get("gun_0"),
-                gun_1=d.get("gun_1"),
-                gun_2=d.get("gun_2"),
-                gun_3=d.get("gun_3"),
-                gun_4=d.get("gun_4"),
-                gun_5=d.get("gun_5"),
-                gun_6=d.get("gun_6"),
-                gun_7=d.get("gun_7"),
-                gun_8=d.get("gun_8"),
-                gun_9=d.get("gun_9"),
-                gun_10=d.get("gun_10"),
-                gun_11=d.get("gun_11"),
-                gun_12=d.get("gun_12"),
-                gun_13=d.get("gun_13"),
-                gun_14_uzeri=d.get("gun_14_uzeri"),
-                cari_toplam=d.get("cari_toplam"),
-                loy_verilen_bayi_sayisi=d.get("loy_verilen_bayi_sayisi"),
-                loy_bayi_mahsuplasma_tutari=d.get("loy_bayi_mahsuplasma_tutari"),
-                skt_camel_yellow_100=d.get("skt_camel_yellow_100"),
-                camel_brown=d.get("camel_brown"),
-                camel_black=d.get("camel_black"),
-                camel_white=d.get("camel_white"),
-                camel_yellow_sp=d.get("camel_yellow_sp"),
-                camel_yellow=d.get("camel_yellow"),
-                camel_deep_blue_long=d.get("camel_deep_blue_long"),
-                camel_deep_blue=d.get("camel_deep_blue"),
-                camel_yellow_long=d.get("camel_yellow_long"),
-                camel_slender_blue=d.get("camel_slender_blue"),
-                dp_camel_slender_blueline=d.get("dp_camel_slender_blueline"),
-                camel_slender_gray=d.get("camel_slender_gray"),
-                dp_camel_slender_grayline=d.get("dp_camel_slender_grayline"),
-                winston_red_long=d.get("winston_red_long"),
-                winston_red=d.get("winston_red"),
-                winston_blue_long=d.get("winston_blue_long"),
-                winston_blue=d.get("winston_blue"),
-                winston_gray=d.get("winston_gray"),
-                winston_slims_blue=d.get("winston_slims_blue"),
-                winston_slims_gray=d.get("winston_slims_gray"),
-                winston_slims_q_line=d.get("winston_slims_q_line"),
-                winston_xsence_black=d.get("winston_xsence_black"),
-                winston_xsence_gray=d.get("winston_xsence_gray"),
-                winston_dark_blue_long=d.get("winston_dark_blue_long"),
-                winston_dark_blue=d.get("winston_dark_blue"),
-                winston_deep_blue=d.get("winston_deep_blue"),
-                winston_slender_blue_long=d.get("winston_slender_blue_long"),
-                winston_slender_blue=d.get("winston_slender_blue"),
-                winston_slender_gray=d.get("winston_slender_gray"),
-                winston_slender_dark_blue=d.get("winston_slender_dark_blue"),
-                winston_slender_q_line=d.get("winston_slender_q_line"),
-                monte_carlo_red=d.get("monte_carlo_red"),
-                monte_carlo_dark_blue_long=d.get("monte_carlo_dark_blue_long"),
-                monte_carlo_dark_blue=d.get("monte_carlo_dark_blue"),
-                monte_carlo_slender_dark_blue=d.get("monte_carlo_slender_dark_blue"),
-                ld_slims=d.get("ld_slims"),
-                ld_blue_long=d.get("ld_blue_long"),
-                ld_blue=d.get("ld_blue"),
-                toplam_gun_sku=d.get("toplam_gun_sku"),
-                camel_toplam=d.get("camel_toplam"),
-                winston_toplam=d.get("winston_toplam"),
-                mcarlo_toplam=d.get("mcarlo_toplam"),
-                myo_camel=d.get("myo_camel"),
-                ld_toplam=d.get("ld_toplam"),
-                toplam=d.get("toplam"),
-                kasa=d.get("kasa"),
-                hedef_das=d.get("hedef_das"),
-                camel_gerc=d.get("camel_gerc"),
-                winston_gerc=d.get("winston_gerc"),
-                mcarlo_gerc=d.get("mcarlo_gerc"),
-                myo_camel_gerc=d.get("myo_camel_gerc"),
-                ld_gerc=d.get("ld_gerc"),
-                toplam_gerc=d.get("toplam_gerc"),
-                kasa_gerc=d.get("kasa_gerc"),
-                gerc_das=d.get("gerc_das"),
-                bak_01=d.get("bak_01"),
-                mar_02=d.get("mar_02"),
-                bfe_03=d.get("bfe_03"),
-                kye_04=d.get("kye_04"),
-                tek_05=d.get("tek_05"),
-                ben_07=d.get("ben_07"),
-                ask_08=d.get("ask_08"),
-                czv_11=d.get("czv_11"),
-                yznc_12=d.get("yznc_12"),
-                tut_14=d.get("tut_14"),
-                tus_15=d.get("tus_15"),
-                jti=d.get("jti"),
-                pmi=d.get("pmi"),
-                bat=d.get("bat"),
-                rut_say=d.get("rut_say"),
-                w_dark_blue_ks=d.get("w_dark_blue_ks"),
-                w_slender_blue_ks=d.get("w_slender_blue_ks"),
-                w_dark_blue_long=d.get("w_dark_blue_long"),
-                mcarlo_slender_dark_blue_yil=d.get("mcarlo_slender_dark_blue_yil"),
-                w_slim_blue=d.get("w_slim_blue"),
-                w_blue_ks=d.get("w_blue_ks"),
-                w_slender_blue_long=d.get("w_slender_blue_long"),
-                camel_slender_blue_yil=d.get("camel_slender_blue_yil"),
-                mcarlo_dark_blue_ks=d.get("mcarlo_dark_blue_ks"),
-                mcarlo_dark_blue_long_yil=d.get("mcarlo_dark_blue_long_yil"),
-                w_slender_q_line_2025=d.get("w_slender_q_line_2025"),
-                w_slender_q_line_2026=d.get("w_slender_q_line_2026"),
-                frekans_ort=d.get("frekans_ort"),
-            ))
-        return result
+        limit, paged = page_limit(limit, after)
+        fields = parse_fields(fields, DSTData)
+        projection = fields_projection(fields) if fields else {"_id": 0}
+        # _id yükleme sırasını (DATA sayfasındaki sıra) korur
+        dst_list, next_cursor = await keyset_page("dst_data", {}, [("_id", 1)], limit, after, projection)
+        return trusted_json(page_response(model_rows(DSTData, dst_list, fields, dst=""), next_cursor, paged))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting DST data: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # DSM Team Data
 @api_router.get("/dsm-teams")
-async def get_dsm_teams():
+@cached
+async def get_dsm_teams(fields: Optional[str] = Query(default=None, description="Virgülle ayrılmış alan listesi; boşsa tüm alanlar")):
     try:
-        dsm_teams = await db.dsm_teams.find({}).to_list(10)
-        # Remove MongoDB _id for JSON serialization
-        for team in dsm_teams:
-            team.pop('_id', None)
-        return dsm_teams
+        fields = parse_fields(fields)
+        projection = fields_projection(fields) if fields else {"_id": 0}
+        # Takım listesi küçüktür; yine de sınırsız okunmaz
+        return trusted_json(await db.dsm_teams.find({}, projection).to_list(UNPAGED_LIST_LIMIT))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting DSM teams: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # TTE Data
 def turkish_upper(s):
@@ -980,489 +1253,282 @@ def turkish_upper(s):
     return s.replace('i', 'İ').replace('ı', 'I').upper()
 
 @api_router.get("/tte-data")
+@cached
 async def get_tte_data():
     try:
-        tte_list = await db.tte_data.find({}).to_list(10)
-        
-        # Get all stand_raporu records for aktif/pasif counts
-        all_stand = await db.stand_raporu.find({}).to_list(5000)
-        
-        # Get all bayiler records for stand counts
-        all_bayiler = await db.bayiler.find({}).to_list(5000)
-        
-        # Build TTE name to counts mapping (with Turkish uppercase)
-        tte_counts = {}
-        for stand in all_stand:
-            tte_name = turkish_upper(stand.get('tte') or '')
-            bayi_durumu = turkish_upper(stand.get('bayi_durumu') or '')
-            
-            if tte_name not in tte_counts:
-                tte_counts[tte_name] = {'aktif': 0, 'pasif': 0}
-            
-            if 'AKTİF' in bayi_durumu or 'AKTIF' in bayi_durumu:
-                tte_counts[tte_name]['aktif'] += 1
-            elif 'PASİF' in bayi_durumu or 'PASIF' in bayi_durumu:
-                tte_counts[tte_name]['pasif'] += 1
-        
-        # Build TTE to stand counts mapping from bayiler
-        tte_stands = {}
-        for bayi in all_bayiler:
-            tte_name = turkish_upper(bayi.get('tte') or '')
-            
-            if tte_name not in tte_stands:
-                tte_stands[tte_name] = {'jti': 0, 'pmi': 0, 'bat': 0}
-            
-            # JTI Stand - check if value exists and is not empty/None/0
-            jti_val = bayi.get('jti_stant')
-            if jti_val and str(jti_val).strip() and str(jti_val).strip() != '0' and str(jti_val).lower() != 'none':
-                tte_stands[tte_name]['jti'] += 1
-            
-            # PMI Stand
-            pmi_val = bayi.get('pmi_stant')
-            if pmi_val and str(pmi_val).strip() and str(pmi_val).strip() != '0' and str(pmi_val).lower() != 'none':
-                tte_stands[tte_name]['pmi'] += 1
-            
-            # BAT Stand
-            bat_val = bayi.get('bat_stant')
-            if bat_val and str(bat_val).strip() and str(bat_val).strip() != '0' and str(bat_val).lower() != 'none':
-                tte_stands[tte_name]['bat'] += 1
-        
-        # Update TTE list with counts
-        for tte in tte_list:
-            tte.pop('_id', None)
-            tte_name = turkish_upper(tte.get('tte_name') or '')
-            
-            # Get aktif/pasif counts
-            counts = tte_counts.get(tte_name, {'aktif': 0, 'pasif': 0})
-            if counts['aktif'] == 0 and counts['pasif'] == 0:
-                for key in tte_counts:
-                    if tte_name in key or key in tte_name:
-                        counts = tte_counts[key]
-                        break
-            
-            tte['aktif_bayi_sayisi'] = counts['aktif']
-            tte['pasif_bayi_sayisi'] = counts['pasif']
-            tte['bayi_sayisi'] = counts['aktif'] + counts['pasif']
-            
-            # Get stand counts
-            stands = tte_stands.get(tte_name, {'jti': 0, 'pmi': 0, 'bat': 0})
-            if stands['jti'] == 0 and stands['pmi'] == 0 and stands['bat'] == 0:
-                for key in tte_stands:
-                    if tte_name in key or key in tte_name:
-                        stands = tte_stands[key]
-                        break
-            
-            tte['jti_stand'] = stands['jti']
-            tte['pmi_stand'] = stands['pmi']
-            tte['bat_stand'] = stands['bat']
-            
-            # Calculate stand ratios (stand count / aktif count * 100)
-            aktif = counts['aktif'] or 1  # Avoid division by zero
-            tte['jti_stand_oran'] = round((stands['jti'] / aktif) * 100, 1)
-            tte['pmi_stand_oran'] = round((stands['pmi'] / aktif) * 100, 1)
-            tte['bat_stand_oran'] = round((stands['bat'] / aktif) * 100, 1)
-        
-        return tte_list
+        # Aktif/pasif ve stand sayıları yüklemede tte_ozet'e yazılır
+        return trusted_json(await db.tte_ozet.find({}, {"_id": 0, "sira": 0}).sort("sira", 1).to_list(None))
     except Exception as e:
         logger.error(f"Error getting TTE data: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # TTE bazlı Bayi Tip Kırılımları
 @api_router.get("/tte-tip-kirilim/{tte}")
+@cached
 async def get_tte_tip_kirilim(tte: str):
     try:
         # TTE adını büyük harfe çevir (Türkçe karakter desteği ile)
-        tte_upper = turkish_upper(tte)
-        
-        # Stand raporundan TTE'ye ait bayileri al
-        all_records = await db.stand_raporu.find().to_list(5000)
-        
-        # TTE'ye göre filtrele ve tip sayılarını hesapla
-        tip_counts = {}
-        for r in all_records:
-            db_tte = turkish_upper(r.get('tte') or '')
-            if db_tte == tte_upper:
-                tip = r.get('tip', '')
-                if tip:
-                    if tip not in tip_counts:
-                        tip_counts[tip] = 0
-                    tip_counts[tip] += 1
-        
-        # Sıralı liste olarak döndür
-        result = []
-        for tip, count in sorted(tip_counts.items()):
-            result.append({
-                "tip": tip,
-                "count": count
-            })
-        
-        return result
+        ozet = await db.tte_tip_ozet.find_one({"_id": turkish_upper(tte)})
+        return ozet["tipler"] if ozet else []
     except Exception as e:
         logger.error(f"Error getting TTE tip kirilim: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # TTE ve Tip bazlı Bayi Listesi
 @api_router.get("/tte-tip-bayiler/{tte}/{tip}")
-async def get_tte_tip_bayiler(tte: str, tip: str):
+@cached
+async def get_tte_tip_bayiler(tte: str, tip: str, limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                              after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        tte_upper = turkish_upper(tte)
-        
-        # Stand raporundan TTE ve Tip'e göre bayileri al
-        all_records = await db.stand_raporu.find().to_list(5000)
-        
-        result = []
-        for r in all_records:
-            db_tte = turkish_upper(r.get('tte') or '')
-            db_tip = r.get('tip', '')
-            
-            if db_tte == tte_upper and db_tip == tip:
-                result.append({
-                    "bayi_kodu": r.get("bayi_kodu", ""),
-                    "bayi_unvani": r.get("bayi_unvani", ""),
-                    "dst": r.get("dst", ""),
-                    "tip": db_tip,
-                    "bayi_durumu": r.get("bayi_durumu", "")
-                })
-        
-        # Bayi ünvanına göre sırala
-        result.sort(key=lambda x: x.get("bayi_unvani", "") or "")
-        return result
+        limit, paged = page_limit(limit, after)
+        # TTE adı boyut tablosundan id'ye çevrilir (Türkçe karakter/yazım farkları dahil)
+        tte_id = await dimension_id("tte", tte)
+        if tte_id is None:
+            return page_response([], paged=paged)
+        records, next_cursor = await keyset_page(
+            "stand_raporu", {"tte_id": tte_id, "tip": tip}, [("bayi_unvani", 1), ("_id", 1)], limit, after,
+            {"_id": 0, "bayi_kodu": 1, "bayi_unvani": 1, "dst": 1, "bayi_durumu": 1},
+        )
+        return page_response([{
+            "bayi_kodu": r.get("bayi_kodu", ""),
+            "bayi_unvani": r.get("bayi_unvani", ""),
+            "dst": r.get("dst", ""),
+            "tip": tip,
+            "bayi_durumu": r.get("bayi_durumu", ""),
+        } for r in records], next_cursor, paged)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting TTE tip bayiler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # DST bazlı Müşteri Sınıf Kırılımları
 @api_router.get("/dst-sinif-kirilim/{dst}")
+@cached
 async def get_dst_sinif_kirilim(dst: str):
     try:
-        # Stand raporundan DST'ye ait bayileri al
-        stand_records = await db.stand_raporu.find({"dst": dst}).to_list(5000)
-        
-        # Bayi kodlarını topla
-        bayi_kodlari = set()
-        for r in stand_records:
-            kod = str(r.get('bayi_kodu', '')).replace('.0', '')
-            if kod:
-                bayi_kodlari.add(kod)
-        
-        # Bayiler koleksiyonundan sınıf bilgilerini al (satisa_gore_sinif kullan)
-        sinif_counts = {}
-        async for b in db.bayiler.find():
-            kod = str(b.get('bayi_kodu', '')).replace('.0', '')
-            # satisa_gore_sinif alanını kullan (H sütunu)
-            sinif = b.get('satisa_gore_sinif', '') or b.get('sinif', '')
-            if kod in bayi_kodlari and sinif:
-                if sinif not in sinif_counts:
-                    sinif_counts[sinif] = 0
-                sinif_counts[sinif] += 1
-        
-        # Sıralı liste olarak döndür (A+, A, B, C, D, E+, E, E- sıralaması)
-        sinif_order = ['A+', 'A', 'B', 'C', 'D', 'E+', 'E', 'E-']
-        result = []
-        for sinif in sinif_order:
-            if sinif in sinif_counts:
-                result.append({
-                    "sinif": sinif,
-                    "count": sinif_counts[sinif]
-                })
-        
-        # Sıralamada olmayan sınıfları da ekle
-        for sinif, count in sorted(sinif_counts.items()):
-            if sinif not in sinif_order:
-                result.append({
-                    "sinif": sinif,
-                    "count": count
-                })
-        
-        return result
+        # Sınıflar yüklemede sıralanmış olarak (A+, A, B, ... E-) saklanır
+        # Özet boyut id'siyle anahtarlanır; DST adının yazım farkları aynı satıra çözülür
+        dst_id = await dimension_id("dst", dst)
+        if dst_id is None:
+            return []
+        ozet = await db.dst_sinif_ozet.find_one({"_id": dst_id})
+        return ozet["siniflar"] if ozet else []
     except Exception as e:
         logger.error(f"Error getting DST sinif kirilim: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # DST ve Sınıf bazlı Bayi Listesi
 @api_router.get("/dst-sinif-bayiler/{dst}/{sinif}")
-async def get_dst_sinif_bayiler(dst: str, sinif: str):
+@cached
+async def get_dst_sinif_bayiler(dst: str, sinif: str, limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                                after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        # Stand raporundan DST'ye ait bayileri al
-        stand_records = await db.stand_raporu.find({"dst": dst}).to_list(5000)
-        
-        # Bayi kodlarını topla ve bilgilerini kaydet
-        bayi_bilgi_map = {}
-        for r in stand_records:
-            kod = str(r.get('bayi_kodu', '')).replace('.0', '')
-            if kod:
-                bayi_bilgi_map[kod] = {
-                    "bayi_kodu": r.get("bayi_kodu", ""),
-                    "bayi_unvani": r.get("bayi_unvani", ""),
-                    "bayi_durumu": r.get("bayi_durumu", "")
-                }
+        limit, paged = page_limit(limit, after)
+        dst_id = await dimension_id("dst", dst)
+        if dst_id is None:
+            return page_response([], paged=paged)
         
-        # Bayiler koleksiyonundan sınıf eşleşenlerini bul (satisa_gore_sinif kullan)
-        result = []
-        async for b in db.bayiler.find():
-            kod = str(b.get('bayi_kodu', '')).replace('.0', '')
-            bayi_sinif = b.get('satisa_gore_sinif', '') or b.get('sinif', '')
-            if kod in bayi_bilgi_map and bayi_sinif == sinif:
-                info = bayi_bilgi_map[kod]
-                result.append({
-                    "bayi_kodu": info["bayi_kodu"],
-                    "bayi_unvani": info["bayi_unvani"],
-                    "sinif": sinif,
-                    "bayi_durumu": info["bayi_durumu"]
-                })
-        
-        # Bayi ünvanına göre sırala
-        result.sort(key=lambda x: x.get("bayi_unvani", "") or "")
-        return result
+        # DST'nin stand raporu satırları -> bayi kodu başına tek satır -> bayiler'den
+        # sınıf (satisa_gore_sinif, boşsa sinif) -> istenen sınıf; eşleşme sunucuda
+        pipeline = [
+            {"$match": {"dst_id": dst_id, "bayi_kodu": {"$nin": ["", None]}}},
+            # $last sıraya bağlıdır; aynı koddan birden fazla satır varsa hep aynısı seçilsin
+            {"$sort": {"bayi_kodu": 1, "_id": 1}},
+            {"$group": {
+                "_id": "$bayi_kodu",
+                "bayi_unvani": {"$last": "$bayi_unvani"},
+                "bayi_durumu": {"$last": "$bayi_durumu"},
+            }},
+            # $lookup koleksiyonu sunucuda açar; yayındaki fiziksel kopyanın adı verilir
+            {"$lookup": {"from": db.resolve("bayiler"), "localField": "_id", "foreignField": "bayi_kodu", "as": "bayi"}},
+            {"$project": {"bayi": {"$arrayElemAt": ["$bayi", 0]}, "bayi_unvani": 1, "bayi_durumu": 1}},
+            {"$project": {
+                "_id": 0,
+                "bayi_kodu": "$_id",
+                "bayi_unvani": {"$ifNull": ["$bayi_unvani", ""]},
+                "sinif": {"$cond": [
+                    {"$in": [{"$ifNull": ["$bayi.satisa_gore_sinif", ""]}, [""]]},
+                    "$bayi.sinif",
+                    "$bayi.satisa_gore_sinif",
+                ]},
+                "bayi_durumu": {"$ifNull": ["$bayi_durumu", ""]},
+            }},
+            {"$match": {"sinif": sinif}},
+        ]
+        # Bayi ünvanına göre sıralı; aynı ünvanlılar bayi koduyla ayrılır
+        rows, next_cursor = await pipeline_page(
+            "stand_raporu", pipeline, [("bayi_unvani", 1), ("bayi_kodu", 1)], limit, after,
+        )
+        return page_response(rows, next_cursor, paged)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting DST sinif bayiler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Borç yaşlandırma sorgusu: kapsam + gün dilimi, tutara göre azalan
+async def cari_bayiler(kapsam: str, deger: Optional[str], gun: str,
+                       limit: Optional[int] = None, after: Optional[str] = None):
+    # Bilinmeyen değerler sessizce tüm bayilere / toplama düşmesin
+    if kapsam != "tumu" and kapsam not in CARI_KAPSAMLARI:
+        raise HTTPException(status_code=400, detail=f"Geçersiz kapsam: {kapsam} (tumu, {', '.join(CARI_KAPSAMLARI)})")
+    if gun not in GUN_ALANLARI:
+        raise HTTPException(status_code=400, detail=f"Geçersiz gün: {gun} (0-13, 14_uzeri, toplam)")
+    limit, paged = page_limit(limit, after)
+    query = {"gun": gun}
+    if kapsam == "kanal":
+        kanal = kanal_filtresi(deger or "")
+        if kanal is None:
+            return page_response([], paged=paged)
+        query.update(kanal)
+    elif kapsam in CARI_KAPSAMLARI:
+        scope_id = await dimension_id(kapsam, deger or "")
+        if scope_id is None:
+            return page_response([], paged=paged)
+        query[CARI_KAPSAMLARI[kapsam]] = scope_id
+    
+    rows, next_cursor = await keyset_page("cari_yaslandirma", query, [("gun_deger", -1), ("_id", 1)], limit, after, {
+        "_id": 0, "gun": 0, "dst_id": 0, "dsm_id": 0, "tte_id": 0, "kanal_grubu": 0, "kanal_kodu": 0,
+    })
+    return page_response(rows, next_cursor, paged)
+
+# Borç yaşlandırma (tüm kapsamlar)
+@api_router.get("/cari-yaslandirma")
+@cached
+async def get_cari_yaslandirma(
+    kapsam: str = Query(default="tumu", description="tumu, dst, dsm, tte, kanal"),
+    deger: Optional[str] = Query(default=None, description="DST/DSM/TTE adı ya da kanal"),
+    gun: str = Query(default="toplam", description="Gün dilimi: 0-13, 14_uzeri, toplam"),
+    limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+    after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri"),
+):
+    try:
+        return await cari_bayiler(kapsam, deger, gun, limit, after)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting cari yaslandirma: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Cari Bayiler by DST and day
 @api_router.get("/cari-bayiler/{dst}")
-async def get_cari_bayiler(dst: str, gun: str = Query(default="toplam", description="Gun filtresi: 0-14, 14_uzeri, toplam")):
+@cached
+async def get_cari_bayiler(dst: str, gun: str = Query(default="toplam", description="Gun filtresi: 0-13, 14_uzeri, toplam"),
+                           limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                           after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        dst_decoded = dst
-        
-        # Find all dealers for this DST with debt
-        query = {"dst": dst_decoded}
-        
-        bayiler = await db.konya_gun.find(query).to_list(500)
-        result = []
-        
-        for b in bayiler:
-            # Filter based on gun parameter
-            if gun == "toplam":
-                # Show all dealers with any debt (musteri_bakiyesi > 0)
-                if b.get("musteri_bakiyesi", 0) > 0:
-                    result.append({
-                        "bayi_kodu": str(b.get("bayi_kodu", "")),
-                        "unvan": b.get("unvan", ""),
-                        "dst": b.get("dst", ""),
-                        "dsm": b.get("dsm", ""),
-                        "tip": b.get("tip"),
-                        "sinif": b.get("sinif"),
-                        "musteri_bakiyesi": b.get("musteri_bakiyesi", 0),
-                        "gun_deger": b.get("musteri_bakiyesi", 0)
-                    })
-            else:
-                # Map gun parameter to field name
-                gun_field_map = {
-                    "0": "gun_0", "1": "gun_1", "2": "gun_2", "3": "gun_3",
-                    "4": "gun_4", "5": "gun_5", "6": "gun_6", "7": "gun_7",
-                    "8": "gun_8", "9": "gun_9", "10": "gun_10", "11": "gun_11",
-                    "12": "gun_12", "13": "gun_13", "14_uzeri": "gun_14_uzeri"
-                }
-                field = gun_field_map.get(gun, "musteri_bakiyesi")
-                value = b.get(field, 0)
-                
-                if value and value > 0:
-                    result.append({
-                        "bayi_kodu": str(b.get("bayi_kodu", "")),
-                        "unvan": b.get("unvan", ""),
-                        "dst": b.get("dst", ""),
-                        "dsm": b.get("dsm", ""),
-                        "tip": b.get("tip"),
-                        "sinif": b.get("sinif"),
-                        "musteri_bakiyesi": b.get("musteri_bakiyesi", 0),
-                        "gun_deger": value
-                    })
-        
-        # Sort by gun_deger descending
-        result.sort(key=lambda x: x.get("gun_deger", 0), reverse=True)
-        return result
+        return await cari_bayiler("dst", dst, gun, limit, after)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting cari bayiler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Pasif bayi listeleri: stand_raporu, bayi ünvanına göre sıralı
+async def pasif_bayiler(query: dict, limit: Optional[int], after: Optional[str], tamamla: bool = False):
+    limit, paged = page_limit(limit, after)
+    if query is None:
+        return page_response([], paged=paged)
+    rows, next_cursor = await keyset_page(
+        "stand_raporu", {**query, "bayi_durumu": "Pasif"}, [("bayi_unvani", 1), ("_id", 1)], limit, after,
+        {"_id": 0, "bayi_kodu": 1, "bayi_unvani": 1, "dst": 1, "tte": 1, "txtkapsam": 1},
+    )
+    eksik = {}
+    if tamamla:
+        # Sayfadaki eksik satırlar için bayiler'e tek sorgu
+        eksik = await find_by_keys("bayiler", (
+            p.get("bayi_kodu") for p in rows if not p.get("bayi_unvani") or not p.get("dst")
+        ), {"bayi_unvani": 1, "dst": 1, "tte": 1})
+    result = []
+    for p in rows:
+        bayi = eksik.get(p.get("bayi_kodu")) or {}
+        result.append({
+            "bayi_kodu": p.get("bayi_kodu", ""),
+            "bayi_unvani": p.get("bayi_unvani") or bayi.get("bayi_unvani", ""),
+            "dst": p.get("dst") or bayi.get("dst"),
+            "tte": p.get("tte") or bayi.get("tte"),
+            "txtkapsam": p.get("txtkapsam"),
+        })
+    return page_response(result, next_cursor, paged)
 
 # Pasif Bayiler by DST
 @api_router.get("/pasif-bayiler-dst/{dst}")
-async def get_pasif_bayiler_dst(dst: str):
+@cached
+async def get_pasif_bayiler_dst(dst: str, limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                                after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        # Get passive dealers from stand_raporu filtered by DST
-        # Use turkish_to_ascii for comparison
-        dst_ascii = turkish_to_ascii(dst)
-        
-        pasif_list = await db.stand_raporu.find({
-            "bayi_durumu": "Pasif"
-        }).to_list(1000)
-        
-        result = []
-        for p in pasif_list:
-            db_dst = p.get("dst") or ""
-            db_dst_ascii = turkish_to_ascii(db_dst)
-            if db_dst_ascii == dst_ascii:
-                result.append({
-                    "bayi_kodu": p.get("bayi_kodu", ""),
-                    "bayi_unvani": p.get("bayi_unvani", ""),
-                    "dst": p.get("dst"),
-                    "tte": p.get("tte"),
-                    "txtkapsam": p.get("txtkapsam")
-                })
-        
-        result.sort(key=lambda x: x.get("bayi_unvani", "") or "")
-        return result
+        # dst_id is stamped at ingest from the dst_dim dimension table
+        dst_id = await dimension_id("dst", dst)
+        return await pasif_bayiler(None if dst_id is None else {"dst_id": dst_id}, limit, after)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting pasif bayiler by DST: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Pasif Bayiler by DSM
 @api_router.get("/pasif-bayiler-dsm/{dsm}")
-async def get_pasif_bayiler_dsm(dsm: str):
+@cached
+async def get_pasif_bayiler_dsm(dsm: str, limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                                after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        # DSM team'den DST listesini al
-        team = await db.dsm_teams.find_one({"team_name": dsm})
-        
-        if not team or not team.get("dst_list"):
-            return []
-        
-        dst_names = team.get("dst_list", [])
-        
-        # Get passive dealers from stand_raporu filtered by DST names
-        pasif_list = await db.stand_raporu.find({
-            "bayi_durumu": "Pasif",
-            "dst": {"$in": dst_names}
-        }).to_list(500)
-        
-        result = []
-        for p in pasif_list:
-            result.append({
-                "bayi_kodu": p.get("bayi_kodu", ""),
-                "bayi_unvani": p.get("bayi_unvani", ""),
-                "dst": p.get("dst"),
-                "tte": p.get("tte"),
-                "txtkapsam": p.get("txtkapsam")
-            })
-        
-        result.sort(key=lambda x: x.get("bayi_unvani", "") or "")
-        return result
+        # DSM (takım adı ya da DSM adı) -> DSM'e bağlı DST id'leri
+        dsm_id = await dimension_id("dsm", dsm)
+        dst_ids = await db.dst_dim.distinct("_id", {"dsm_id": dsm_id}) if dsm_id is not None else []
+        return await pasif_bayiler({"dst_id": {"$in": dst_ids}} if dst_ids else None, limit, after)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting pasif bayiler by DSM: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Pasif Bayiler by TTE
 @api_router.get("/pasif-bayiler-tte/{tte}")
-async def get_pasif_bayiler_tte(tte: str):
+@cached
+async def get_pasif_bayiler_tte(tte: str, limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                                after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        # Get passive dealers from stand_raporu filtered by TTE
-        # Use turkish_to_ascii for comparison to handle Turkish character differences
-        tte_ascii = turkish_to_ascii(tte)
-        
-        pasif_list = await db.stand_raporu.find({
-            "bayi_durumu": "Pasif"
-        }).to_list(1000)
-        
-        result = []
-        for p in pasif_list:
-            db_tte = p.get("tte") or ""
-            db_tte_ascii = turkish_to_ascii(db_tte)
-            if db_tte_ascii == tte_ascii:
-                result.append({
-                    "bayi_kodu": p.get("bayi_kodu", ""),
-                    "bayi_unvani": p.get("bayi_unvani", ""),
-                    "dst": p.get("dst"),
-                    "tte": p.get("tte"),
-                    "txtkapsam": p.get("txtkapsam")
-                })
-        
-        result.sort(key=lambda x: x.get("bayi_unvani", "") or "")
-        return result
+        # tte_id also resolves the DATA sheet spelling of the TTE name
+        tte_id = await dimension_id("tte", tte)
+        return await pasif_bayiler(None if tte_id is None else {"tte_id": tte_id}, limit, after)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting pasif bayiler by TTE: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Tüm distribütör için carili bayiler (gün bazlı)
 @api_router.get("/cari-bayiler-tumu")
-async def get_cari_bayiler_tumu(gun: str = Query(..., description="Gün değeri: 0, 1, 2, ... 14_uzeri, toplam")):
+@cached
+async def get_cari_bayiler_tumu(gun: str = Query(..., description="Gün değeri: 0, 1, 2, ... 13, 14_uzeri, toplam"),
+                                limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                                after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        # Map gun parameter to field name
-        gun_mapping = {
-            "0": "gun_0", "1": "gun_1", "2": "gun_2", "3": "gun_3",
-            "4": "gun_4", "5": "gun_5", "6": "gun_6", "7": "gun_7",
-            "8": "gun_8", "9": "gun_9", "10": "gun_10", "11": "gun_11",
-            "12": "gun_12", "13": "gun_13", "14_uzeri": "gun_14_uzeri",
-            "toplam": "musteri_bakiyesi"
-        }
-        
-        field_name = gun_mapping.get(gun, "musteri_bakiyesi")
-        
-        # Get all records from konya_gun where the specified day field > 0 AND musteri_bakiyesi > 0 (borçlu)
-        query = {
-            field_name: {"$gt": 0},
-            "musteri_bakiyesi": {"$gt": 0}  # Sadece borçlu bayiler
-        }
-        
-        records = await db.konya_gun.find(query).to_list(1000)
-        
-        result = []
-        for r in records:
-            gun_value = r.get(field_name, 0) or 0
-            musteri_bakiyesi = r.get("musteri_bakiyesi", 0) or 0
-            if gun_value > 0 and musteri_bakiyesi > 0:
-                result.append({
-                    "bayi_kodu": r.get("bayi_kodu", ""),
-                    "unvan": r.get("unvan", ""),
-                    "dst": r.get("dst", ""),
-                    "dsm": r.get("dsm", ""),
-                    "tip": r.get("tip", ""),
-                    "sinif": r.get("sinif", ""),
-                    "musteri_bakiyesi": musteri_bakiyesi,
-                    "gun_deger": gun_value
-                })
-        
-        # Sort by gun_deger descending
-        result.sort(key=lambda x: x.get("gun_deger", 0), reverse=True)
-        return result
+        return await cari_bayiler("tumu", None, gun, limit, after)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting all cari bayiler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # DSM için carili bayiler (gün bazlı)
 @api_router.get("/cari-bayiler-dsm/{dsm}")
-async def get_cari_bayiler_dsm(dsm: str, gun: str = Query(..., description="Gün değeri")):
+@cached
+async def get_cari_bayiler_dsm(dsm: str, gun: str = Query(..., description="Gün değeri: 0-13, 14_uzeri, toplam"),
+                               limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                               after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        gun_mapping = {
-            "0": "gun_0", "1": "gun_1", "2": "gun_2", "3": "gun_3",
-            "4": "gun_4", "5": "gun_5", "6": "gun_6", "7": "gun_7",
-            "8": "gun_8", "9": "gun_9", "10": "gun_10", "11": "gun_11",
-            "12": "gun_12", "13": "gun_13", "14_uzeri": "gun_14_uzeri",
-            "toplam": "musteri_bakiyesi"
-        }
-        
-        field_name = gun_mapping.get(gun, "musteri_bakiyesi")
-        dsm_ascii = turkish_to_ascii(dsm)
-        
-        # Get all records with musteri_bakiyesi > 0 (borçlu bayiler)
-        all_records = await db.konya_gun.find({"musteri_bakiyesi": {"$gt": 0}}).to_list(1000)
-        
-        result = []
-        for r in all_records:
-            db_dsm = r.get("dsm", "") or ""
-            db_dsm_ascii = turkish_to_ascii(db_dsm)
-            
-            if db_dsm_ascii == dsm_ascii:
-                gun_value = r.get(field_name, 0) or 0
-                musteri_bakiyesi = r.get("musteri_bakiyesi", 0) or 0
-                if gun_value > 0 and musteri_bakiyesi > 0:
-                    result.append({
-                        "bayi_kodu": r.get("bayi_kodu", ""),
-                        "unvan": r.get("unvan", ""),
-                        "dst": r.get("dst", ""),
-                        "dsm": r.get("dsm", ""),
-                        "tip": r.get("tip", ""),
-                        "sinif": r.get("sinif", ""),
-                        "musteri_bakiyesi": musteri_bakiyesi,
-                        "gun_deger": gun_value
-                    })
-        
-        result.sort(key=lambda x: x.get("gun_deger", 0), reverse=True)
-        return result
+        return await cari_bayiler("dsm", dsm, gun, limit, after)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting DSM cari bayiler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Ekip Raporu Verileri - Aylar listesi
 @api_router.get("/ekip-raporu/aylar")
+@cached
 async def get_ekip_raporu_aylar():
     try:
         pipeline = [
@@ -1477,10 +1543,11 @@ async def get_ekip_raporu_aylar():
         return result
     except Exception as e:
         logger.error(f"Error getting ekip raporu aylar: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Ekip Raporu Verileri - Ay bazlı günler
 @api_router.get("/ekip-raporu/{ay}")
+@cached
 async def get_ekip_raporu_ay(ay: str):
     try:
         records = await db.ekip_raporu.find({"ay": ay.upper()}).to_list(50)
@@ -1492,10 +1559,11 @@ async def get_ekip_raporu_ay(ay: str):
         return records
     except Exception as e:
         logger.error(f"Error getting ekip raporu for {ay}: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Ekip Raporu Verileri - Yıl toplamları
 @api_router.get("/ekip-raporu-toplam")
+@cached
 async def get_ekip_raporu_toplam():
     try:
         toplam = await db.ekip_raporu_toplam.find_one()
@@ -1505,60 +1573,57 @@ async def get_ekip_raporu_toplam():
         return {"yil_toplam_karton": {}, "yil_toplam_kasa": {}}
     except Exception as e:
         logger.error(f"Error getting ekip raporu toplam: {e}")
-        return {"yil_toplam_karton": {}, "yil_toplam_kasa": {}}
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Loyalty Bayiler
 @api_router.get("/loyalty-bayiler")
-async def get_loyalty_bayiler():
+@cached
+async def get_loyalty_bayiler(limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                              after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        records = await db.loyalty_bayiler.find().to_list(1000)
+        limit, paged = page_limit(limit, after)
+        records, next_cursor = await keyset_page("loyalty_bayiler", {}, [("bayi_kodu", 1), ("_id", 1)], limit, after)
         for r in records:
             r["_id"] = str(r["_id"])
-        return records
+        return trusted_json(page_response(records, next_cursor, paged))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting loyalty bayiler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Loyalty Bayi Sayısı
 @api_router.get("/loyalty-bayi-sayisi")
+@cached
 async def get_loyalty_bayi_sayisi():
     try:
         count = await db.loyalty_bayiler.count_documents({})
         return {"count": count}
     except Exception as e:
         logger.error(f"Error getting loyalty bayi count: {e}")
-        return {"count": 0}
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Bayi Hedef (Aylık marka hedefleri)
 @api_router.get("/bayi-hedef/{bayi_kodu}")
+@cached
 async def get_bayi_hedef(bayi_kodu: str):
     try:
-        hedef = await db.bayi_hedef.find_one({"bayi_kodu": bayi_kodu})
-        if hedef:
-            hedef["_id"] = str(hedef["_id"])
-            
-            # Toplam hesapla: Camel + Winston + M.Carlo + LD
-            camel_hedef = safe_float(hedef.get("camel_hedef", 0))
-            winston_hedef = safe_float(hedef.get("winston_hedef", 0))
-            mcarlo_hedef = safe_float(hedef.get("mcarlo_hedef", 0))
-            ld_hedef = safe_float(hedef.get("ld_hedef", 0))
-            
-            camel_satis = safe_float(hedef.get("camel_satis", 0))
-            winston_satis = safe_float(hedef.get("winston_satis", 0))
-            mcarlo_satis = safe_float(hedef.get("mcarlo_satis", 0))
-            ld_satis = safe_float(hedef.get("ld_satis", 0))
-            
-            hedef["toplam_hedef"] = camel_hedef + winston_hedef + mcarlo_hedef + ld_hedef
-            hedef["toplam_satis"] = camel_satis + winston_satis + mcarlo_satis + ld_satis
-            
-            return hedef
-        return None
+        # Toplamları (Camel + Winston + M.Carlo + LD) içeren hedef, bayi_profile'da hazır
+        kod = canonical_bayi_kodu(bayi_kodu)
+        profile = await db.bayi_profile.find_one({"_id": kod}, {"hedef": 1})
+        if profile and profile.get("hedef"):
+            return profile["hedef"]
+        # Profil yalnızca bayiler'deki kodlar için kurulur; bayiler'de olmayan
+        # bayinin hedefi bayi_hedef'ten okunur
+        hedef = await db.bayi_hedef.find_one({"bayi_kodu": kod})
+        return hedef_toplamlari(hedef) if hedef else None
     except Exception as e:
         logger.error(f"Error getting bayi hedef: {e}")
-        return None
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Carili Kanal Toplamları
 @api_router.get("/carili-kanal-toplamlari")
+@cached
 async def get_carili_kanal_toplamlari():
     try:
         toplam = await db.carili_kanal_toplamlari.find_one()
@@ -1568,57 +1633,41 @@ async def get_carili_kanal_toplamlari():
         return {}
     except Exception as e:
         logger.error(f"Error getting carili kanal toplamlari: {e}")
-        return {}
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Carili Kanal Bazlı Borçlu Bayiler
 @api_router.get("/carili-kanal-bayiler/{kanal}")
-async def get_carili_kanal_bayiler(kanal: str):
+@cached
+async def get_carili_kanal_bayiler(kanal: str, limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                                   after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        # Kanal tip eşleştirmesi
-        kanal_mapping = {
-            "piyasa": ["01 PİY", "01 BAK", "01 MAR", "01 BÜF"],
-            "yerel-zincir": ["02 YER"],
-            "askeriye": ["03 ASK", "03 CEZ"],
-            "benzinlik": ["04 BEN"],
-            "geleneksel": ["05 GEL"]
-        }
+        limit, paged = page_limit(limit, after)
+        query = kanal_filtresi(kanal)
+        if query is None:
+            return page_response([], paged=paged)
         
-        tip_list = kanal_mapping.get(kanal.lower(), [])
-        if not tip_list:
-            return []
-        
-        # konya_gun'dan borçlu bayileri al
-        all_records = await db.konya_gun.find({"musteri_bakiyesi": {"$gt": 0}}).to_list(2000)
-        
-        result = []
-        for r in all_records:
-            tip = r.get("tip", "") or ""
-            # Tip'in başlangıcını kontrol et
-            matches = False
-            for t in tip_list:
-                if tip.upper().startswith(t[:2]):
-                    matches = True
-                    break
-            
-            if matches:
-                result.append({
-                    "bayi_kodu": r.get("bayi_kodu", ""),
-                    "unvan": r.get("unvan", ""),
-                    "dst": r.get("dst", ""),
-                    "tip": r.get("tip", ""),
-                    "musteri_bakiyesi": safe_float(r.get("musteri_bakiyesi", 0)),
-                    "sinif": r.get("sinif", "")
-                })
-        
-        # Bakiyeye göre sırala (büyükten küçüğe)
-        result.sort(key=lambda x: x.get("musteri_bakiyesi", 0), reverse=True)
-        return result
+        # konya_gun'dan kanalın borçlu bayileri, bakiyeye göre büyükten küçüğe
+        records, next_cursor = await keyset_page(
+            "konya_gun", {**query, "musteri_bakiyesi": {"$gt": 0}}, [("musteri_bakiyesi", -1), ("_id", 1)],
+            limit, after, {"bayi_kodu": 1, "unvan": 1, "dst": 1, "tip": 1, "musteri_bakiyesi": 1, "sinif": 1},
+        )
+        return page_response([{
+            "bayi_kodu": r.get("bayi_kodu", ""),
+            "unvan": r.get("unvan", ""),
+            "dst": r.get("dst", ""),
+            "tip": r.get("tip", ""),
+            "musteri_bakiyesi": safe_float(r.get("musteri_bakiyesi", 0)),
+            "sinif": r.get("sinif", "")
+        } for r in records], next_cursor, paged)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting carili kanal bayiler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Son Güncelleme Zamanı
 @api_router.get("/son-guncelleme")
+@cached
 async def get_son_guncelleme():
     try:
         info = await db.system_info.find_one({"type": "excel_upload"})
@@ -1627,103 +1676,70 @@ async def get_son_guncelleme():
         return {"son_guncelleme": ""}
     except Exception as e:
         logger.error(f"Error getting son guncelleme: {e}")
-        return {"son_guncelleme": ""}
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Kanal Bazlı Müşteri Listesi
 # İlçe Bazlı Veriler (Harita için)
 @api_router.get("/ilce-verileri")
+@cached
 async def get_ilce_verileri():
     try:
-        # Stand raporundan ilçe bilgisini al
-        records = await db.stand_raporu.find().to_list(5000)
-        ilce_data = {}
-        
-        for r in records:
-            ilce = r.get("ilce", "")  # L sütunu
-            if not ilce:
-                continue
-                
-            if ilce not in ilce_data:
-                ilce_data[ilce] = {
-                    "ilce": ilce,
-                    "bayi_sayisi": 0,
-                    "aktif_bayi": 0,
-                    "pasif_bayi": 0,
-                    "bayiler": []
-                }
-            
-            ilce_data[ilce]["bayi_sayisi"] += 1
-            bayi_durumu = str(r.get("bayi_durumu", "")).upper()
-            if bayi_durumu == "AKTİF" or bayi_durumu == "AKTIF":
-                ilce_data[ilce]["aktif_bayi"] += 1
-            else:
-                ilce_data[ilce]["pasif_bayi"] += 1
-            
-            ilce_data[ilce]["bayiler"].append({
-                "bayi_kodu": r.get("bayi_kodu", ""),
-                "bayi_unvani": r.get("bayi_unvani", ""),
-                "bayi_durumu": bayi_durumu
-            })
-        
-        # Bayi sayısına göre sırala
-        result = sorted(list(ilce_data.values()), key=lambda x: x["bayi_sayisi"], reverse=True)
-        return result
+        # Bayi sayısına göre sıralı, yüklemede hesaplanır
+        return trusted_json(await db.ilce_ozet.find({}, {"_id": 0, "sira": 0}).sort("sira", 1).to_list(None))
     except Exception as e:
         logger.error(f"Error getting ilce verileri: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Stand Raporu (Kanal Kırılım için)
 @api_router.get("/stand-raporu")
-async def get_stand_raporu():
+@cached
+async def get_stand_raporu(limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                           after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
-        records = await db.stand_raporu.find().to_list(5000)
+        limit, paged = page_limit(limit, after)
+        records, next_cursor = await keyset_page("stand_raporu", {}, [("bayi_kodu", 1), ("_id", 1)], limit, after)
         for r in records:
             r["_id"] = str(r["_id"])
-        return records
+        return trusted_json(page_response(records, next_cursor, paged))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting stand raporu: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Kanal Müşterileri - Tip bazlı filtreleme
 @api_router.get("/kanal-musterileri/{kanal}")
-async def get_kanal_musterileri(kanal: str, tte: str = None, debug: bool = False):
-    # Kanal tipine göre filtreleme
-    query = {}
-    kanal_lower = kanal.lower()
-    
-    if kanal_lower == "yerel-zincir":
-        query = {"tip": {"$regex": "^12", "$options": "i"}}
-    elif kanal_lower == "askeriye":
-        query = {"tip": {"$regex": "^(08|11)", "$options": "i"}}  # 08ASK + 11CZV
-    elif kanal_lower == "cezaevi":
-        query = {"tip": {"$regex": "^11", "$options": "i"}}
-    elif kanal_lower == "benzinlik":
-        query = {"tip": {"$regex": "^07", "$options": "i"}}
-    elif kanal_lower == "piyasa":
-        query = {"tip": {"$regex": "^(01|02|03|04|05)", "$options": "i"}}
-    elif kanal_lower == "geleneksel":
-        query = {"tip": {"$regex": "^(14|15)", "$options": "i"}}
-    elif kanal_lower in ["a+", "a", "b", "c", "d", "e", "e-"]:
-        sinif_val = kanal.upper()
-        query = {"panaroma_sinif": sinif_val}
+@cached
+async def get_kanal_musterileri(kanal: str, tte: str = None, debug: bool = False,
+                                limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                                after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
+    limit, paged = page_limit(limit, after)
+    # Kanal grubu / tip kodu ya da panaroma sınıfı
+    if kanal.lower() in ["a+", "a", "b", "c", "d", "e", "e-"]:
+        query = {"panaroma_sinif": kanal.upper()}
     else:
-        # Spesifik kod (01, 02, etc.)
-        query = {"tip": {"$regex": f"^{kanal}", "$options": "i"}}
+        query = kanal_filtresi(kanal)
+        if query is None:
+            return page_response([], paged=paged)
     
-    # TTE filtresi varsa ekle - büyük harfe çevir (Türkçe karakterler için)
+    # TTE filtresi varsa ekle - boyut tablosundaki id ile
     if tte:
-        # Önce Türkçe küçük harfleri büyük harfe çevir, sonra genel upper
-        tte_upper = tte.replace('i', 'İ').replace('ı', 'I').replace('ğ', 'Ğ').replace('ü', 'Ü').replace('ş', 'Ş').replace('ö', 'Ö').replace('ç', 'Ç').upper()
-        query["tte"] = tte_upper
+        tte_id = await dimension_id("tte", tte)
+        if tte_id is None:
+            return page_response([], paged=paged)
+        query["tte_id"] = tte_id
     
     # İptal kapsamındakiler hariç - Aktif olanlar
     query["kapsam_durumu"] = {"$nin": ["İptal", "iptal", "IPTAL", "Iptal"]}
     
-    # Bayiler collection'dan çek
-    records = await db.bayiler.find(query).to_list(5000)
-    
     if debug:
-        return {"query": str(query), "count": len(records), "db_name": os.environ.get('DB_NAME', 'unknown')}
+        count = await db.bayiler.count_documents(query)
+        return {"query": str(query), "count": count, "db_name": os.environ.get('DB_NAME', 'unknown')}
+    
+    # Bayiler collection'dan çek; (kanal, bayi_kodu, _id) index'i sırayı verir
+    records, next_cursor = await keyset_page("bayiler", query, [("bayi_kodu", 1), ("_id", 1)], limit, after, {
+        "_id": 1, "bayi_kodu": 1, "bayi_unvani": 1, "tip": 1, "dst": 1, "tte": 1, "kapsam_durumu": 1,
+    })
     
     # Sonuç formatla
     result = []
@@ -1737,10 +1753,11 @@ async def get_kanal_musterileri(kanal: str, tte: str = None, debug: bool = False
             "bayi_durumu": r.get("kapsam_durumu", ""),
         })
     
-    return result
+    return page_response(result, next_cursor, paged)
 
 # Stil Ay Satış
 @api_router.get("/stil-ay-satis")
+@cached
 async def get_stil_ay_satis():
     try:
         records = await db.stil_ay_satis.find().to_list(20)
@@ -1752,24 +1769,21 @@ async def get_stil_ay_satis():
         return records
     except Exception as e:
         logger.error(f"Error getting stil ay satis: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Personel Data
 @api_router.get("/personel-data")
+@cached
 async def get_personel_data(isim: str = Query(default="", description="İsim filtresi")):
     try:
-        query = {}
         if isim:
-            isim_ascii = turkish_to_ascii(isim)
-            # Get all and filter manually for Turkish-insensitive search
-            all_records = await db.personel_data.find().to_list(100)
-            result = []
-            for r in all_records:
-                adi = r.get("adi", "") or ""
-                if isim_ascii.lower() in turkish_to_ascii(adi).lower():
-                    r["_id"] = str(r["_id"])
-                    result.append(r)
-            return result
+            # adi_key içinde Türkçe karakterden bağımsız arama
+            records = await db.personel_data.find({
+                "adi_key": {"$regex": re.escape(turkish_to_ascii(isim))}
+            }).to_list(100)
+            for r in records:
+                r["_id"] = str(r["_id"])
+            return records
         else:
             records = await db.personel_data.find().to_list(100)
             for r in records:
@@ -1777,25 +1791,18 @@ async def get_personel_data(isim: str = Query(default="", description="İsim fil
             return records
     except Exception as e:
         logger.error(f"Error getting personel data: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # RUT Günleri listesi (DST bazlı)
 @api_router.get("/rut/gunler")
+@cached
 async def get_rut_gunler(dst_name: str = Query(default="", description="DST adı filtresi")):
     try:
         pipeline = []
         
         if dst_name:
-            dst_ascii = turkish_to_ascii(dst_name)
-            # Get all records and filter manually
-            all_records = await db.rut_data.find().to_list(5000)
-            gunler_set = set()
-            for r in all_records:
-                db_dst = r.get("dst_name", "") or ""
-                if turkish_to_ascii(db_dst).lower() == dst_ascii.lower():
-                    gun = r.get("gun", "")
-                    if gun:
-                        gunler_set.add(gun)
+            gunler = await db.rut_data.distinct("gun", {"dst_name_key": turkish_to_ascii(dst_name)})
+            gunler_set = {gun for gun in gunler if gun}
             
             # Sort days in correct order
             gun_sirasi = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
@@ -1814,10 +1821,11 @@ async def get_rut_gunler(dst_name: str = Query(default="", description="DST adı
             return result
     except Exception as e:
         logger.error(f"Error getting rut gunler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # RUT DST listesi
 @api_router.get("/rut/dst-list")
+@cached
 async def get_rut_dst_list():
     try:
         pipeline = [
@@ -1829,33 +1837,47 @@ async def get_rut_dst_list():
         return [d["_id"] for d in dstler if d["_id"]]
     except Exception as e:
         logger.error(f"Error getting rut dst list: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
+
+def rut_query(dst_name: str, gun: Optional[str] = None) -> dict:
+    """rut_data filter on the (dst_name_key, gun, ziyaret_sira) index"""
+    query = {"dst_name_key": turkish_to_ascii(dst_name)}
+    if gun is not None:
+        # parse_rut gün adlarını GUN_ISIMLERI yazımıyla saklar
+        query["gun"] = {g.lower(): g for g in GUN_ISIMLERI}.get(gun.lower(), gun)
+    return query
 
 # RUT verileri (DST + gün bazlı)
 @api_router.get("/rut")
+@cached
 async def get_rut_data(dst_name: str = Query(..., description="DST adı"), gun: str = Query(..., description="Gün")):
     try:
-        dst_ascii = turkish_to_ascii(dst_name)
-        gun_lower = gun.lower()
-        
-        # Get all records and filter
-        all_records = await db.rut_data.find().to_list(5000)
-        result = []
-        
-        for r in all_records:
-            db_dst = r.get("dst_name", "") or ""
-            db_gun = r.get("gun", "") or ""
-            
-            if turkish_to_ascii(db_dst).lower() == dst_ascii.lower() and db_gun.lower() == gun_lower:
-                r["_id"] = str(r["_id"])
-                result.append(r)
-        
-        # Sort by ziyaret_sira
-        result.sort(key=lambda x: x.get("ziyaret_sira", 0))
+        result = await db.rut_data.find(rut_query(dst_name, gun)).sort("ziyaret_sira", 1).to_list(None)
+        for r in result:
+            r["_id"] = str(r["_id"])
         return result
     except Exception as e:
         logger.error(f"Error getting rut data: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
+
+# RUT haftası: DST'nin tüm günleri tek sorguda, gün sırasıyla gruplu
+@api_router.get("/rut/hafta")
+@cached
+async def get_rut_hafta(dst_name: str = Query(..., description="DST adı")):
+    try:
+        gunler: Dict[str, list] = {}
+        # (gun, ziyaret_sira) sıralaması index'ten okunur
+        async for r in db.rut_data.find(rut_query(dst_name)).sort([("gun", 1), ("ziyaret_sira", 1)]):
+            if not r.get("gun"):
+                continue
+            r["_id"] = str(r["_id"])
+            gunler.setdefault(r["gun"], []).append(r)
+        
+        sirali = sorted(gunler, key=lambda g: GUN_ISIMLERI.index(g) if g in GUN_ISIMLERI else 99)
+        return [{"gun": gun, "musteriler": gunler[gun]} for gun in sirali]
+    except Exception as e:
+        logger.error(f"Error getting rut hafta: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 # RUT Talep Gönder
 @api_router.post("/rut/talep")
@@ -1922,10 +1944,7 @@ async def download_rut_excel(dst_name: str = Query(...), gun: str = Query(...)):
         import re
         
         # Get RUT data from rut_data collection
-        rut_data = await db.rut_data.find({
-            "dst_name": dst_name,
-            "gun": gun
-        }).sort("ziyaret_sira", 1).to_list(500)
+        rut_data = await db.rut_data.find(rut_query(dst_name, gun)).sort("ziyaret_sira", 1).to_list(500)
         
         if not rut_data:
             raise HTTPException(status_code=404, detail="RUT verisi bulunamadı")
@@ -2113,6 +2132,7 @@ async def update_rut_talep(talep_id: str, durum: str = Query(..., description="Y
 
 # Bayi search
 @api_router.get("/bayiler", response_model=List[BayiSummary])
+@cached
 async def search_bayiler(q: str = Query(default="", description="Search query")):
     try:
         query = {}
@@ -2129,6 +2149,9 @@ async def search_bayiler(q: str = Query(default="", description="Search query"))
         # Sort by kapsam_durumu: Aktif first, then Pasif, then İptal
         pipeline = [
             {"$match": query} if query else {"$match": {}},
+            # Bayi dokümanları geniş; özet için gereken alanlar
+            {"$project": {"_id": 0, "bayi_kodu": 1, "bayi_unvani": 1, "kapsam_durumu": 1, "tip": 1,
+                          "panaroma_sinif": 1, "dst": 1, "tte": 1}},
             {"$addFields": {
                 "sort_order": {
                     "$switch": {
@@ -2157,141 +2180,30 @@ async def search_bayiler(q: str = Query(default="", description="Search query"))
         ) for b in bayiler]
     except Exception as e:
         logger.error(f"Error searching bayiler: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Bayi detail
 @api_router.get("/bayiler/{bayi_kodu}", response_model=BayiDetail)
-async def get_bayi_detail(bayi_kodu: str):
+@cached
+async def get_bayi_detail(bayi_kodu: str, fields: Optional[str] = Query(default=None, description="Virgülle ayrılmış alan listesi; boşsa tüm alanlar")):
     try:
-        # Try multiple formats for bayi_kodu
-        bayi = await db.bayiler.find_one({"bayi_kodu": bayi_kodu})
-        
-        if not bayi:
-            # Try without .0 suffix
-            clean_kodu = bayi_kodu.replace(".0", "") if bayi_kodu.endswith(".0") else bayi_kodu
-            bayi = await db.bayiler.find_one({"bayi_kodu": clean_kodu})
-        
-        if not bayi:
-            # Try with .0 suffix
-            bayi = await db.bayiler.find_one({"bayi_kodu": f"{bayi_kodu}.0"})
-        
-        if not bayi:
-            # Try as integer string
-            try:
-                int_kodu = str(int(float(bayi_kodu)))
-                bayi = await db.bayiler.find_one({"bayi_kodu": int_kodu})
-            except:
-                pass
+        fields = parse_fields(fields, BayiDetail)
+        # Bayi kartı ingest sırasında bayi_profile'a hazırlanır; _id her zaman döner
+        # ki alanları boş bir kart da bulunmuş sayılsın
+        profile = await db.bayi_profile.find_one(
+            {"_id": canonical_bayi_kodu(bayi_kodu)}, {name: 1 for name in fields} if fields else None
+        )
         
-        if not bayi:
+        if not profile:
             # Check if any data exists in the collection
             count = await db.bayiler.count_documents({})
             if count == 0:
                 raise HTTPException(status_code=404, detail="Veri yüklenmemiş. Lütfen Excel dosyasını yükleyin.")
             raise HTTPException(status_code=404, detail="Bayi bulunamadı")
         
-        # Get normalized bayi_kodu for lookups
-        normalized_kodu = str(bayi.get("bayi_kodu", "")).replace(".0", "")
-        try:
-            int_kodu = str(int(float(normalized_kodu)))
-        except:
-            int_kodu = normalized_kodu
-        
-        # Get borç durumu from konya_gun collection - try multiple formats
-        borc = await db.konya_gun.find_one({"bayi_kodu": bayi_kodu})
-        if not borc:
-            borc = await db.konya_gun.find_one({"bayi_kodu": int_kodu})
-        if not borc:
-            borc = await db.konya_gun.find_one({"bayi_kodu": f"{int_kodu}.0"})
-        borc_durumu = "Borcu yoktur"
-        if borc and borc.get("musteri_bakiyesi"):
-            bakiye = safe_float(borc.get("musteri_bakiyesi"))
-            if bakiye > 0:
-                borc_durumu = f"{bakiye:,.1f} TL"
-        
-        # Calculate development percentage
-        toplam_2024 = safe_float(bayi.get("toplam_satis_2024"))
-        toplam_2025 = safe_float(bayi.get("toplam_satis_2025"))
-        gelisim = 0.0
-        if toplam_2024 > 0:
-            gelisim = ((toplam_2025 - toplam_2024) / toplam_2024) * 100
-        
-        # Get ziyaret günleri from stand_raporu collection - try multiple formats
-        stand = await db.stand_raporu.find_one({"bayi_kodu": bayi_kodu})
-        if not stand:
-            stand = await db.stand_raporu.find_one({"bayi_kodu": int_kodu})
-        if not stand:
-            stand = await db.stand_raporu.find_one({"bayi_kodu": f"{int_kodu}.0"})
-        if not stand:
-            stand = await db.stand_raporu.find_one({"bayi_kodu": f"{bayi_kodu}.0"})
-        ziyaret_gunleri = stand.get("ziyaret_gunleri", []) if stand else []
-        
-        return BayiDetail(
-            bayi_kodu=str(bayi.get("bayi_kodu", "")),
-            bayi_unvani=bayi.get("bayi_unvani", ""),
-            dst=bayi.get("dst"),
-            tte=bayi.get("tte"),
-            dsm=bayi.get("dsm"),
-            tip=bayi.get("tip"),
-            panaroma_sinif=bayi.get("panaroma_sinif"),
-            satisa_gore_sinif=bayi.get("satisa_gore_sinif"),
-            kapsam_durumu=bayi.get("kapsam_durumu"),
-            jti_stant=bayi.get("jti_stant"),
-            jti_stant_adet=safe_float(bayi.get("jti_stant_adet")),
-            camel_myo_stant=bayi.get("camel_myo_stant"),
-            camel_myo_adet=safe_float(bayi.get("camel_myo_adet")),
-            pmi_stant=bayi.get("pmi_stant"),
-            pmi_adet=safe_float(bayi.get("pmi_adet")),
-            bat_stant=bayi.get("bat_stant"),
-            bat_adet=safe_float(bayi.get("bat_adet")),
-            loyalty_plan_2025=safe_float(bayi.get("loyalty_plan_2025")),
-            odenen_2025=safe_float(bayi.get("odenen_2025")),
-            ocak_2025=safe_float(bayi.get("ocak_2025")),
-            subat_2025=safe_float(bayi.get("subat_2025")),
-            mart_2025=safe_float(bayi.get("mart_2025")),
-            nisan_2025=safe_float(bayi.get("nisan_2025")),
-            mayis_2025=safe_float(bayi.get("mayis_2025")),
-            haziran_2025=safe_float(bayi.get("haziran_2025")),
-            temmuz_2025=safe_float(bayi.get("temmuz_2025")),
-            agustos_2025=safe_float(bayi.get("agustos_2025")),
-            eylul_2025=safe_float(bayi.get("eylul_2025")),
-            ekim_2025=safe_float(bayi.get("ekim_2025")),
-            kasim_2025=safe_float(bayi.get("kasim_2025")),
-            aralik_2025=safe_float(bayi.get("aralik_2025")),
-            toplam_satis_2025=safe_float(bayi.get("toplam_satis_2025")),
-            ortalama_2025=safe_float(bayi.get("ortalama_2025")),
-            ocak_2024=safe_float(bayi.get("ocak_2024")),
-            subat_2024=safe_float(bayi.get("subat_2024")),
-            mart_2024=safe_float(bayi.get("mart_2024")),
-            nisan_2024=safe_float(bayi.get("nisan_2024")),
-            mayis_2024=safe_float(bayi.get("mayis_2024")),
-            haziran_2024=safe_float(bayi.get("haziran_2024")),
-            temmuz_2024=safe_float(bayi.get("temmuz_2024")),
-            agustos_2024=safe_float(bayi.get("agustos_2024")),
-            eylul_2024=safe_float(bayi.get("eylul_2024")),
-            ekim_2024=safe_float(bayi.get("ekim_2024")),
-            kasim_2024=safe_float(bayi.get("kasim_2024")),
-            aralik_2024=safe_float(bayi.get("aralik_2024")),
-            toplam_satis_2024=safe_float(bayi.get("toplam_satis_2024")),
-            ortalama_2024=safe_float(bayi.get("ortalama_2024")),
-            ocak_2026=safe_float(bayi.get("ocak_2026")),
-            subat_2026=safe_float(bayi.get("subat_2026")),
-            mart_2026=safe_float(bayi.get("mart_2026")),
-            nisan_2026=safe_float(bayi.get("nisan_2026")),
-            mayis_2026=safe_float(bayi.get("mayis_2026")),
-            haziran_2026=safe_float(bayi.get("haziran_2026")),
-            temmuz_2026=safe_float(bayi.get("temmuz_2026")),
-            agustos_2026=safe_float(bayi.get("agustos_2026")),
-            eylul_2026=safe_float(bayi.get("eylul_2026")),
-            ekim_2026=safe_float(bayi.get("ekim_2026")),
-            kasim_2026=safe_float(bayi.get("kasim_2026")),
-            aralik_2026=safe_float(bayi.get("aralik_2026")),
-            toplam_2026=safe_float(bayi.get("toplam_2026")),
-            ortalama_2026=safe_float(bayi.get("ortalama_2026")),
-            gelisim_yuzdesi=gelisim,
-            borc_durumu=borc_durumu,
-            ziyaret_gunleri=ziyaret_gunleri
-        )
+        if fields:
+            return trusted_json(model_rows(BayiDetail, [profile], fields)[0])
+        return BayiDetail(**profile)
     except HTTPException:
         raise
     except Exception as e:
@@ -2299,26 +2211,35 @@ async def get_bayi_detail(bayi_kodu: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Faturalar for a bayi
-@api_router.get("/bayiler/{bayi_kodu}/faturalar", response_model=List[Fatura])
-async def get_bayi_faturalar(bayi_kodu: str):
+@api_router.get("/bayiler/{bayi_kodu}/faturalar", response_model=Union[Page[Fatura], List[Fatura]])
+@cached
+async def get_bayi_faturalar(bayi_kodu: str, limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                             after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
+        limit, paged = page_limit(limit, after)
         # Sort by date descending (newest first)
-        faturalar = await db.faturalar.find({"bayi_kodu": bayi_kodu}).sort("tarih_sort", -1).to_list(1000)
-        return [Fatura(
-            matbu_no=f.get("matbu_no", ""),
-            tarih=f.get("tarih", ""),
-            net_tutar=safe_float(f.get("net_tutar")),
-            bayi_kodu=f.get("bayi_kodu", "")
-        ) for f in faturalar]
+        faturalar, next_cursor = await keyset_page(
+            "faturalar", {"bayi_kodu": canonical_bayi_kodu(bayi_kodu)}, [("tarih_sort", -1), ("_id", 1)], limit, after,
+            {"matbu_no": 1, "tarih": 1, "net_tutar": 1, "bayi_kodu": 1},
+        )
+        return trusted_json(page_response([{
+            "matbu_no": f.get("matbu_no", ""),
+            "tarih": f.get("tarih", ""),
+            "net_tutar": safe_float(f.get("net_tutar")),
+            "bayi_kodu": f.get("bayi_kodu", ""),
+        } for f in faturalar], next_cursor, paged))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting faturalar: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Fatura detail with products
 @api_router.get("/faturalar/{matbu_no}", response_model=FaturaDetay)
+@cached
 async def get_fatura_detail(matbu_no: str):
     try:
-        detaylar = await db.belge_detay.find({"matbu_no": matbu_no}).to_list(1000)
+        detaylar = await db.belge_detay.find({"matbu_no": matbu_no}).sort([("satir_no", 1), ("_id", 1)]).to_list(1000)
         urunler = []
         toplam_miktar = 0.0
         toplam_tutar = 0.0
@@ -2340,20 +2261,64 @@ async def get_fatura_detail(matbu_no: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Tahsilatlar for a bayi
-@api_router.get("/bayiler/{bayi_kodu}/tahsilatlar", response_model=List[Tahsilat])
-async def get_bayi_tahsilatlar(bayi_kodu: str):
+@api_router.get("/bayiler/{bayi_kodu}/tahsilatlar", response_model=Union[Page[Tahsilat], List[Tahsilat]])
+@cached
+async def get_bayi_tahsilatlar(bayi_kodu: str, limit: Optional[int] = Query(default=None, ge=1, le=PAGE_MAX_LIMIT),
+                               after: Optional[str] = Query(default=None, description="Önceki sayfanın next_cursor değeri")):
     try:
+        limit, paged = page_limit(limit, after)
         # Sort by date descending (newest first)
-        tahsilatlar = await db.tahsilatlar.find({"bayi_kodu": bayi_kodu}).sort("tarih_sort", -1).to_list(1000)
-        return [Tahsilat(
-            tahsilat_turu=t.get("tahsilat_turu", ""),
-            islem_tarihi=t.get("islem_tarihi", ""),
-            tutar=safe_float(t.get("tutar")),
-            bayi_kodu=t.get("bayi_kodu", "")
-        ) for t in tahsilatlar]
+        tahsilatlar, next_cursor = await keyset_page(
+            "tahsilatlar", {"bayi_kodu": canonical_bayi_kodu(bayi_kodu)}, [("tarih_sort", -1), ("_id", 1)], limit, after,
+            {"tahsilat_turu": 1, "islem_tarihi": 1, "tutar": 1, "bayi_kodu": 1},
+        )
+        return trusted_json(page_response([{
+            "tahsilat_turu": t.get("tahsilat_turu", ""),
+            "islem_tarihi": t.get("islem_tarihi", ""),
+            "tutar": safe_float(t.get("tutar")),
+            "bayi_kodu": t.get("bayi_kodu", ""),
+        } for t in tahsilatlar], next_cursor, paged))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting tahsilatlar: {e}")
-        return []
+        raise HTTPException(status_code=500, detail=str(e))
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# .xlsb (ZIP) dosyalarının ilk dört baytı
+XLSB_MAGIC = b"PK\x03\x04"
+
+async def stream_to_upload_dir(chunks, first: bytes = b""):
+    """Write an async stream of chunks to a new file in UPLOAD_DIR.
+
+    Returns the file path, its size and sha256, hashed on the way in.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsb', dir=UPLOAD_DIR) as tmp:
+        try:
+            if first:
+                tmp.write(first)
+                digest.update(first)
+                size += len(first)
+            async for chunk in chunks:
+                tmp.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        except BaseException:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    return tmp.name, size, digest.hexdigest()
+
+def download_stats(start: float, size: int) -> Dict[str, Any]:
+    """Download stage entry for the ingest report"""
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "bytes": size,
+        "bytes_per_sec": round(size / elapsed) if elapsed > 0 else None,
+    }
 
 # Google Drive link ile upload
 @api_router.post("/upload-gdrive")
@@ -2394,59 +2359,59 @@ async def upload_from_gdrive(request: dict):
         
         logger.info(f"Downloading from: {download_url}")
         
-        # Download file with httpx - increased timeout for large files
+        # Download file with httpx - increased timeout for large files.
+        # The body is streamed straight into the upload directory.
+        tmp_path = None
+        download_start = time.perf_counter()
         try:
             async with httpx.AsyncClient(follow_redirects=True, timeout=600.0) as client:
-                response = await client.get(download_url)
-                
-                # Check for Google Drive virus scan warning page (for large files)
-                if b"confirm=" in response.content or "confirm=" in str(response.content):
-                    # Try to extract confirmation token
-                    content_str = response.content.decode('utf-8', errors='ignore')
-                    confirm_match = re.search(r'confirm=([a-zA-Z0-9_-]+)', content_str)
-                    if confirm_match:
-                        confirm_token = confirm_match.group(1)
-                        download_url = f"https://drive.google.com/uc?export=download&id={file_id}&confirm={confirm_token}"
-                        logger.info(f"Large file detected, using confirm token: {confirm_token}")
-                        response = await client.get(download_url)
-                    else:
-                        # Try with default confirm=t for large files
-                        download_url = f"https://drive.google.com/uc?export=download&id={file_id}&confirm=t"
-                        logger.info(f"Trying with default confirm=t")
-                        response = await client.get(download_url)
-                
-                if response.status_code != 200:
-                    raise HTTPException(status_code=400, detail=f"Dosya indirilemedi (HTTP {response.status_code}). Lütfen dosyanın 'Bağlantıyı bilen herkes görüntüleyebilir' şeklinde paylaşıldığından emin olun.")
-                
-                content = response.content
-                
-                # Check if we got an HTML error page instead of the file
-                if len(content) < 5000 and (b'<!DOCTYPE' in content or b'<html' in content):
-                    logger.error(f"Received HTML instead of file: {content[:500]}")
-                    raise HTTPException(status_code=400, detail="Dosya indirilemedi. Lütfen dosyanın herkese açık paylaşıldığından ve Excel dosyası (.xlsb) olduğundan emin olun.")
+                for attempt in range(2):
+                    async with client.stream("GET", download_url) as response:
+                        if response.status_code != 200:
+                            raise HTTPException(status_code=400, detail=f"Dosya indirilemedi (HTTP {response.status_code}). Lütfen dosyanın 'Bağlantıyı bilen herkes görüntüleyebilir' şeklinde paylaşıldığından emin olun.")
+                        
+                        chunks = response.aiter_bytes(UPLOAD_CHUNK_SIZE)
+                        first = await anext(chunks, b"")
+                        
+                        # Check for Google Drive virus scan warning page (for large files)
+                        # on the first chunk only
+                        if attempt == 0 and b"confirm=" in first:
+                            confirm_match = re.search(rb'confirm=([a-zA-Z0-9_-]+)', first)
+                            if confirm_match:
+                                confirm_token = confirm_match.group(1).decode()
+                                logger.info(f"Large file detected, using confirm token: {confirm_token}")
+                            else:
+                                # Try with default confirm=t for large files
+                                confirm_token = "t"
+                                logger.info(f"Trying with default confirm=t")
+                            download_url = f"https://drive.google.com/uc?export=download&id={file_id}&confirm={confirm_token}"
+                            continue
+                        
+                        # .xlsb bir ZIP arşividir; HTML hata/izin sayfası ya da başka bir
+                        # dosya indirilmeden ilk parçada reddedilir
+                        if not first.startswith(XLSB_MAGIC):
+                            content_type = response.headers.get("content-type", "")
+                            logger.error(f"Received {content_type or 'unknown content'} instead of an xlsb file: {first[:200]}")
+                            if b'<!DOCTYPE' in first[:5000] or b'<html' in first[:5000]:
+                                raise HTTPException(status_code=400, detail="Dosya indirilemedi. Lütfen dosyanın herkese açık paylaşıldığından ve Excel dosyası (.xlsb) olduğundan emin olun.")
+                            raise HTTPException(status_code=400, detail="İndirilen dosya bir Excel dosyası (.xlsb) değil. Lütfen linkin doğru dosyayı gösterdiğinden emin olun.")
+                        
+                        tmp_path, size, file_hash = await stream_to_upload_dir(chunks, first)
+                        break
         except httpx.TimeoutException:
             raise HTTPException(status_code=408, detail="Dosya indirme zaman aşımına uğradı. Lütfen tekrar deneyin.")
         except httpx.RequestError as e:
             logger.error(f"Request error: {e}")
             raise HTTPException(status_code=500, detail=f"Bağlantı hatası: {str(e)}")
         
-        logger.info(f"Downloaded {len(content)} bytes from Google Drive")
+        if tmp_path is None:
+            raise HTTPException(status_code=400, detail="Dosya indirilemedi. Lütfen dosyanın herkese açık paylaşıldığından ve Excel dosyası (.xlsb) olduğundan emin olun.")
         
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsb') as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
+        logger.info(f"Downloaded {size} bytes from Google Drive to {tmp_path}")
         
-        logger.info(f"File saved to {tmp_path}")
-        
-        # Process the Excel file (same as regular upload)
-        try:
-            await process_excel(tmp_path)
-            return {"success": True, "message": "Google Drive'dan veri başarıyla yüklendi!"}
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+        download = download_stats(download_start, size)
+        job_id = await enqueue_ingest_job(tmp_path, "gdrive", file_id, file_hash, download)
+        return {"success": True, "message": "Google Drive'dan indirildi, veriler işleniyor", "job_id": job_id}
                 
     except HTTPException:
         raise
@@ -2460,1006 +2425,2119 @@ async def upload_excel(file: UploadFile = File(...)):
     try:
         logger.info(f"Receiving file: {file.filename}")
         
-        # Save uploaded file to temp
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsb') as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        logger.info(f"File saved to {tmp_path}, size: {len(content)} bytes")
+        # Stream the upload to disk; the ingest worker removes it when done
+        async def upload_chunks():
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
         
-        # Process the Excel file
-        await process_excel(tmp_path)
+        download_start = time.perf_counter()
+        tmp_path, size, file_hash = await stream_to_upload_dir(upload_chunks())
         
-        # Clean up
-        os.unlink(tmp_path)
+        logger.info(f"File saved to {tmp_path}, size: {size} bytes")
         
-        return {"success": True, "message": "Excel dosyası başarıyla yüklendi ve işlendi"}
+        download = download_stats(download_start, size)
+        job_id = await enqueue_ingest_job(tmp_path, "upload", file.filename or "", file_hash, download)
+        return {"success": True, "message": "Dosya yüklendi, veriler işleniyor", "job_id": job_id}
     except Exception as e:
         logger.error(f"Upload error: {e}")
         raise HTTPException(status_code=500, detail=f"Yükleme hatası: {str(e)}")
 
-async def process_excel(file_path: str):
-    """Process the Excel file and populate MongoDB collections"""
-    logger.info("Starting Excel processing...")
-    
-    # Clear existing data
-    await db.bayiler.delete_many({})
-    await db.faturalar.delete_many({})
-    await db.belge_detay.delete_many({})
-    await db.tahsilatlar.delete_many({})
-    await db.konya_gun.delete_many({})
-    await db.stand_raporu.delete_many({})
-    await db.dst_data.delete_many({})
-    await db.dsm_teams.delete_many({})
-    await db.tte_data.delete_many({})
-    
-    with pyxlsb.open_workbook(file_path) as wb:
-        # Process AÜ BAYİ LİST
-        logger.info("Processing AÜ BAYİ LİST...")
-        with wb.get_sheet('AÜ BAYİ LİST') as sheet:
-            rows = list(sheet.rows())
-            bayiler_data = []
-            
-            for row in rows[2:]:  # Start from row 3 (index 2)
-                cells = [cell.v for cell in row]
-                if len(cells) > 0 and cells[0]:
-                    bayi_kodu = str(int(cells[0])) if isinstance(cells[0], float) else str(cells[0])
-                    bayi_unvani = safe_str(cells[1]) if len(cells) > 1 else ""
-                    
-                    bayi = {
-                        "bayi_kodu": bayi_kodu,
-                        "bayi_kodu_ascii": turkish_to_ascii(bayi_kodu),
-                        "bayi_unvani": bayi_unvani,
-                        "bayi_unvani_ascii": turkish_to_ascii(bayi_unvani) if bayi_unvani else "",
-                        "dst": safe_str(cells[2]) if len(cells) > 2 else None,
-                        "tte": safe_str(cells[3]) if len(cells) > 3 else None,
-                        "dsm": safe_str(cells[4]) if len(cells) > 4 else None,
-                        "tip": safe_str(cells[5]) if len(cells) > 5 else None,
-                        "panaroma_sinif": safe_str(cells[6]) if len(cells) > 6 else None,
-                        "satisa_gore_sinif": safe_str(cells[7]) if len(cells) > 7 else None,
-                        "sinif": safe_str(cells[8]) if len(cells) > 8 else None,  # I sütunu - Müşteri Sınıfı
-                        "kapsam_durumu": safe_str(cells[9]) if len(cells) > 9 else None,
-                        "jti_stant": safe_str(cells[10]) if len(cells) > 10 else None,
-                        "jti_stant_adet": safe_float(cells[11]) if len(cells) > 11 else 0,
-                        "camel_myo_stant": safe_str(cells[12]) if len(cells) > 12 else None,
-                        "camel_myo_adet": safe_float(cells[13]) if len(cells) > 13 else 0,
-                        "pmi_stant": safe_str(cells[14]) if len(cells) > 14 else None,
-                        "pmi_adet": safe_float(cells[15]) if len(cells) > 15 else 0,
-                        "bat_stant": safe_str(cells[16]) if len(cells) > 16 else None,
-                        "bat_adet": safe_float(cells[17]) if len(cells) > 17 else 0,
-                        "loyalty_plan_2025": safe_float(cells[18]) if len(cells) > 18 else 0,
-                        "odenen_2025": safe_float(cells[19]) if len(cells) > 19 else 0,
-                        # 2025 Monthly
-                        "ocak_2025": safe_float(cells[33]) if len(cells) > 33 else 0,
-                        "subat_2025": safe_float(cells[34]) if len(cells) > 34 else 0,
-                        "mart_2025": safe_float(cells[35]) if len(cells) > 35 else 0,
-                        "nisan_2025": safe_float(cells[36]) if len(cells) > 36 else 0,
-                        "mayis_2025": safe_float(cells[37]) if len(cells) > 37 else 0,
-                        "haziran_2025": safe_float(cells[38]) if len(cells) > 38 else 0,
-                        "temmuz_2025": safe_float(cells[39]) if len(cells) > 39 else 0,
-                        "agustos_2025": safe_float(cells[40]) if len(cells) > 40 else 0,
-                        "eylul_2025": safe_float(cells[41]) if len(cells) > 41 else 0,
-                        "ekim_2025": safe_float(cells[42]) if len(cells) > 42 else 0,
-                        "kasim_2025": safe_float(cells[43]) if len(cells) > 43 else 0,
-                        "aralik_2025": safe_float(cells[44]) if len(cells) > 44 else 0,
-                        "toplam_satis_2025": safe_float(cells[45]) if len(cells) > 45 else 0,
-                        "ortalama_2025": safe_float(cells[48]) if len(cells) > 48 else 0,
-                        # 2024 Monthly
-                        "ocak_2024": safe_float(cells[71]) if len(cells) > 71 else 0,
-                        "subat_2024": safe_float(cells[72]) if len(cells) > 72 else 0,
-                        "mart_2024": safe_float(cells[73]) if len(cells) > 73 else 0,
-                        "nisan_2024": safe_float(cells[74]) if len(cells) > 74 else 0,
-                        "mayis_2024": safe_float(cells[75]) if len(cells) > 75 else 0,
-                        "haziran_2024": safe_float(cells[76]) if len(cells) > 76 else 0,
-                        "temmuz_2024": safe_float(cells[77]) if len(cells) > 77 else 0,
-                        "agustos_2024": safe_float(cells[78]) if len(cells) > 78 else 0,
-                        "eylul_2024": safe_float(cells[79]) if len(cells) > 79 else 0,
-                        "ekim_2024": safe_float(cells[80]) if len(cells) > 80 else 0,
-                        "kasim_2024": safe_float(cells[81]) if len(cells) > 81 else 0,
-                        "aralik_2024": safe_float(cells[82]) if len(cells) > 82 else 0,
-                        "toplam_satis_2024": safe_float(cells[83]) if len(cells) > 83 else 0,
-                        "ortalama_2024": safe_float(cells[84]) if len(cells) > 84 else 0,
-                        # 2026 Monthly
-                        "ocak_2026": safe_float(cells[85]) if len(cells) > 85 else 0,
-                        "subat_2026": safe_float(cells[86]) if len(cells) > 86 else 0,
-                        "mart_2026": safe_float(cells[87]) if len(cells) > 87 else 0,
-                        "nisan_2026": safe_float(cells[88]) if len(cells) > 88 else 0,
-                        "mayis_2026": safe_float(cells[89]) if len(cells) > 89 else 0,
-                        "haziran_2026": safe_float(cells[90]) if len(cells) > 90 else 0,
-                        "temmuz_2026": safe_float(cells[91]) if len(cells) > 91 else 0,
-                        "agustos_2026": safe_float(cells[92]) if len(cells) > 92 else 0,
-                        "eylul_2026": safe_float(cells[93]) if len(cells) > 93 else 0,
-                        "ekim_2026": safe_float(cells[94]) if len(cells) > 94 else 0,
-                        "kasim_2026": safe_float(cells[95]) if len(cells) > 95 else 0,
-                        "aralik_2026": safe_float(cells[96]) if len(cells) > 96 else 0,
-                        "toplam_2026": safe_float(cells[97]) if len(cells) > 97 else 0,
-                        "ortalama_2026": safe_float(cells[98]) if len(cells) > 98 else 0,
-                    }
-                    bayiler_data.append(bayi)
-            
-            if bayiler_data:
-                await db.bayiler.insert_many(bayiler_data)
-                logger.info(f"Inserted {len(bayiler_data)} bayiler")
-        
-        # Process Fatura
-        logger.info("Processing Fatura...")
-        with wb.get_sheet('Fatura') as sheet:
-            rows = list(sheet.rows())
-            faturalar_data = []
-            
-            for row in rows[1:]:  # Start from row 2
-                cells = [cell.v for cell in row]
-                if len(cells) > 13 and cells[0]:
-                    bayi_kodu = str(cells[0]).strip() if cells[0] else ""
-                    tarih = excel_date_to_str(cells[3])
-                    
-                    # Parse date for sorting
-                    tarih_sort = None
-                    if cells[3]:
-                        try:
-                            if isinstance(cells[3], (int, float)):
-                                tarih_sort = int(cells[3])
-                            else:
-                                # Try to parse date string
-                                parts = str(cells[3]).replace('.', '/').replace('-', '/').split('/')
-                                if len(parts) == 3:
-                                    tarih_sort = int(parts[2]) * 10000 + int(parts[1]) * 100 + int(parts[0])
-                        except:
-                            tarih_sort = 0
-                    
-                    fatura = {
-                        "bayi_kodu": bayi_kodu,
-                        "tarih": tarih,
-                        "tarih_sort": tarih_sort or 0,
-                        "matbu_no": safe_str(cells[5]) if len(cells) > 5 else "",
-                        "net_tutar": safe_float(cells[13]) if len(cells) > 13 else 0
-                    }
-                    faturalar_data.append(fatura)
-            
-            if faturalar_data:
-                await db.faturalar.insert_many(faturalar_data)
-                logger.info(f"Inserted {len(faturalar_data)} faturalar")
-        
-        # Process Belge Detay
-        logger.info("Processing Belge detay...")
-        with wb.get_sheet('Belge detay') as sheet:
-            rows = list(sheet.rows())
-            detay_data = []
-            
-            for row in rows[1:]:  # Start from row 2
-                cells = [cell.v for cell in row]
-                if len(cells) > 7 and cells[0]:
-                    detay = {
-                        "matbu_no": safe_str(cells[0]),
-                        "urun": safe_str(cells[6]) if len(cells) > 6 else "",
-                        "miktar": safe_float(cells[7]) if len(cells) > 7 else 0,
-                        "birim_fiyat": safe_float(cells[8]) if len(cells) > 8 else 0
-                    }
-                    detay_data.append(detay)
-            
-            if detay_data:
-                await db.belge_detay.insert_many(detay_data)
-                logger.info(f"Inserted {len(detay_data)} belge detay")
-        
-        # Process Tahsilat
-        logger.info("Processing tahsilat...")
-        with wb.get_sheet('tahsilat') as sheet:
-            rows = list(sheet.rows())
-            tahsilat_data = []
-            
-            for row in rows[1:]:  # Start from row 2
-                cells = [cell.v for cell in row]
-                if len(cells) > 8 and cells[2]:
-                    bayi_kodu = str(cells[2]).strip() if cells[2] else ""
-                    islem_tarihi = safe_str(cells[5])
-                    
-                    # Parse date for sorting
-                    tarih_sort = 0
-                    if islem_tarihi:
-                        try:
-                            parts = islem_tarihi.replace('.', '/').replace('-', '/').split('/')
-                            if len(parts) == 3:
-                                # Format: DD/MM/YYYY
-                                tarih_sort = int(parts[2]) * 10000 + int(parts[1]) * 100 + int(parts[0])
-                        except:
-                            tarih_sort = 0
-                    
-                    tahsilat = {
-                        "bayi_kodu": bayi_kodu,
-                        "tahsilat_turu": safe_str(cells[1]) if len(cells) > 1 else "",
-                        "islem_tarihi": islem_tarihi,
-                        "tarih_sort": tarih_sort,
-                        "tutar": safe_float(cells[8]) if len(cells) > 8 else 0
-                    }
-                    tahsilat_data.append(tahsilat)
-            
-            if tahsilat_data:
-                await db.tahsilatlar.insert_many(tahsilat_data)
-                logger.info(f"Inserted {len(tahsilat_data)} tahsilatlar")
-        
-        # Process Konya Gün (for debt info)
-        logger.info("Processing KONYA GÜN...")
-        with wb.get_sheet('KONYA GÜN') as sheet:
-            rows = list(sheet.rows())
-            konya_data = []
-            
-            # Carili kanal toplamları (H2-H6, K2-K6)
-            carili_kanal_toplamlari = {}
-            if len(rows) > 5:
-                for i in range(1, 6):  # rows 2-6 (index 1-5)
-                    if i < len(rows):
-                        row_cells = [cell.v for cell in rows[i]]
-                        if len(row_cells) > 10:
-                            kanal_adi = safe_str(row_cells[7]) if len(row_cells) > 7 else ""  # H column
-                            kanal_tutari = safe_float(row_cells[10]) if len(row_cells) > 10 else 0  # K column
-                            if kanal_adi:
-                                carili_kanal_toplamlari[kanal_adi.upper().strip()] = kanal_tutari
-            
-            # Store carili totals
-            if carili_kanal_toplamlari:
-                await db.carili_kanal_toplamlari.delete_many({})
-                await db.carili_kanal_toplamlari.insert_one(carili_kanal_toplamlari)
-                logger.info(f"Saved carili kanal toplamları: {carili_kanal_toplamlari}")
-            
-            for row in rows[7:]:  # Start from row 8 (index 7) - after header
-                cells = [cell.v for cell in row]
-                if len(cells) > 10 and cells[0]:
-                    bayi_kodu = str(int(cells[0])) if isinstance(cells[0], float) else str(cells[0])
-                    konya = {
-                        "bayi_kodu": bayi_kodu,
-                        "unvan": safe_str(cells[1]) if len(cells) > 1 else "",
-                        "dst": safe_str(cells[2]) if len(cells) > 2 else "",
-                        "dsm": safe_str(cells[3]) if len(cells) > 3 else "",
-                        "tip": safe_str(cells[4]) if len(cells) > 4 else "",
-                        "sinif": safe_str(cells[5]) if len(cells) > 5 else "",
-                        "kanal": safe_str(cells[7]) if len(cells) > 7 else "",  # H column - kanal bilgisi
-                        "musteri_bakiyesi": safe_float(cells[10]) if len(cells) > 10 else 0,
-                        "gun_0": safe_float(cells[11]) if len(cells) > 11 else 0,
-                        "gun_1": safe_float(cells[12]) if len(cells) > 12 else 0,
-                        "gun_2": safe_float(cells[13]) if len(cells) > 13 else 0,
-                        "gun_3": safe_float(cells[14]) if len(cells) > 14 else 0,
-                        "gun_4": safe_float(cells[15]) if len(cells) > 15 else 0,
-                        "gun_5": safe_float(cells[16]) if len(cells) > 16 else 0,
-                        "gun_6": safe_float(cells[17]) if len(cells) > 17 else 0,
-                        "gun_7": safe_float(cells[18]) if len(cells) > 18 else 0,
-                        "gun_8": safe_float(cells[19]) if len(cells) > 19 else 0,
-                        "gun_9": safe_float(cells[20]) if len(cells) > 20 else 0,
-                        "gun_10": safe_float(cells[21]) if len(cells) > 21 else 0,
-                        "gun_11": safe_float(cells[22]) if len(cells) > 22 else 0,
-                        "gun_12": safe_float(cells[23]) if len(cells) > 23 else 0,
-                        "gun_13": safe_float(cells[24]) if len(cells) > 24 else 0,
-                        "gun_14_uzeri": safe_float(cells[25]) if len(cells) > 25 else 0,
-                    }
-                    konya_data.append(konya)
-            
-            if konya_data:
-                await db.konya_gun.insert_many(konya_data)
-                logger.info(f"Inserted {len(konya_data)} konya_gun records")
-        
-        # Process Stand Raporu (for active/passive counts and visit days)
-        logger.info("Processing STAND RAPORU...")
-        with wb.get_sheet('STAND RAPORU') as sheet:
-            rows = list(sheet.rows())
-            stand_data = []
-            
-            for row in rows[1:]:  # Start from row 2
-                cells = [cell.v for cell in row]
-                if len(cells) > 72 and cells[5]:
-                    bayi_kodu = str(cells[5]).strip() if cells[5] else ""
-                    
-                    # Bayi Unvanı - column 6 (UNVAN)
-                    bayi_unvani = safe_str(cells[6]) if len(cells) > 6 else None
-                    
-                    # TIP - column 7 (H sütunu)
-                    tip = safe_str(cells[7]) if len(cells) > 7 else None
-                    
-                    # İlçe - column 11 (L sütunu)
-                    ilce = safe_str(cells[11]) if len(cells) > 11 else None
-                    
-                    # DST - column 59 (BH)
-                    dst = safe_str(cells[59]) if len(cells) > 59 else None
-                    
-                    # TTE - column 60 (BI)
-                    tte = safe_str(cells[60]) if len(cells) > 60 else None
-                    
-                    # TXTKAPSAM - BK sütunu (index 62)
-                    txtkapsam = safe_str(cells[62]) if len(cells) > 62 else None
-                    
-                    # Ziyaret günleri - sütun 66-72
-                    ziyaret_gunleri = []
-                    gun_isimleri = ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma', 'Cumartesi', 'Pazar']
-                    for i, gun in enumerate(gun_isimleri):
-                        col_idx = 66 + i
-                        if col_idx < len(cells) and cells[col_idx] == 1.0:
-                            ziyaret_gunleri.append(gun)
-                    
-                    stand = {
-                        "bayi_kodu": bayi_kodu,
-                        "bayi_unvani": bayi_unvani,
-                        "bayi_durumu": safe_str(cells[12]) if len(cells) > 12 else None,
-                        "tip": tip,
-                        "ilce": ilce,
-                        "dst": dst,
-                        "tte": tte,
-                        "txtkapsam": txtkapsam,
-                        "ziyaret_gunleri": ziyaret_gunleri
-                    }
-                    stand_data.append(stand)
-            
-            if stand_data:
-                await db.stand_raporu.insert_many(stand_data)
-                logger.info(f"Inserted {len(stand_data)} stand_raporu records")
-        
-        # Process DATA (DST verileri)
-        logger.info("Processing DATA...")
-        with wb.get_sheet('DATA') as sheet:
-            rows = list(sheet.rows())
-            dst_data_list = []
-            
-            for row in rows[1:21]:  # 2-21 satırlar (DST verileri, TOPLAM hariç)
-                cells = [cell.v for cell in row]
-                if len(cells) > 0 and cells[0] and cells[0] not in ['TOPLAM', 'TEAM-I', 'TEAM-II']:
-                    dst = safe_str(cells[0])
-                    if dst:
-                        dst_record = {
-                            "dst": dst,
-                            "bayi_sayisi": safe_float(cells[1]) if len(cells) > 1 else 0,
-                            "aktif_bayi_sayisi": safe_float(cells[2]) if len(cells) > 2 else 0,
-                            "pasif_bayi_sayisi": safe_float(cells[3]) if len(cells) > 3 else 0,
-                            "aralik_hedef": safe_float(cells[4]) if len(cells) > 4 else 0,
-                            "aralik_satis": safe_float(cells[5]) if len(cells) > 5 else 0,
-                            "kalan_satis": safe_float(cells[6]) if len(cells) > 6 else 0,
-                            "hedef_basari_orani": safe_float(cells[7]) if len(cells) > 7 else 0,
-                            "tahsilat_hedef": safe_float(cells[8]) if len(cells) > 8 else 0,
-                            "tahsilat_tutari": safe_float(cells[9]) if len(cells) > 9 else 0,
-                            "ay_hedef_ziyaret": safe_float(cells[10]) if len(cells) > 10 else 0,
-                            "ziyaret_gerceklesen": safe_float(cells[11]) if len(cells) > 11 else 0,
-                            "drop_rate": safe_float(cells[12]) if len(cells) > 12 else 0,
-                            "basarili_satis": safe_float(cells[13]) if len(cells) > 13 else 0,
-                            "basarili_satis_yuzde": safe_float(cells[14]) if len(cells) > 14 else 0,
-                            "carili_bayi_sayisi": safe_float(cells[15]) if len(cells) > 15 else 0,
-                            "gun_0": safe_float(cells[16]) if len(cells) > 16 else 0,
-                            "gun_1": safe_float(cells[17]) if len(cells) > 17 else 0,
-                            "gun_2": safe_float(cells[18]) if len(cells) > 18 else 0,
-                            "gun_3": safe_float(cells[19]) if len(cells) > 19 else 0,
-                            "gun_4": safe_float(cells[20]) if len(cells) > 20 else 0,
-                            "gun_5": safe_float(cells[21]) if len(cells) > 21 else 0,
-                            "gun_6": safe_float(cells[22]) if len(cells) > 22 else 0,
-                            "gun_7": safe_float(cells[23]) if len(cells) > 23 else 0,
-                            "gun_8": safe_float(cells[24]) if len(cells) > 24 else 0,
-                            "gun_9": safe_float(cells[25]) if len(cells) > 25 else 0,
-                            "gun_10": safe_float(cells[26]) if len(cells) > 26 else 0,
-                            "gun_11": safe_float(cells[27]) if len(cells) > 27 else 0,
-                            "gun_12": safe_float(cells[28]) if len(cells) > 28 else 0,
-                            "gun_13": safe_float(cells[29]) if len(cells) > 29 else 0,
-                            "gun_14_uzeri": safe_float(cells[30]) if len(cells) > 30 else 0,
-                            "cari_toplam": safe_float(cells[31]) if len(cells) > 31 else 0,
-                            "loy_verilen_bayi_sayisi": safe_float(cells[32]) if len(cells) > 32 else 0,
-                            "loy_bayi_mahsuplasma_tutari": safe_float(cells[33]) if len(cells) > 33 else 0,
-                            # SKU Satışları (34-71)
-                            "skt_camel_yellow_100": safe_float(cells[34]) if len(cells) > 34 else 0,
-                            "camel_brown": safe_float(cells[35]) if len(cells) > 35 else 0,
-                            "camel_black": safe_float(cells[36]) if len(cells) > 36 else 0,
-                            "camel_white": safe_float(cells[37]) if len(cells) > 37 else 0,
-                            "camel_yellow_sp": safe_float(cells[38]) if len(cells) > 38 else 0,
-                            "camel_yellow": safe_float(cells[39]) if len(cells) > 39 else 0,
-                            "camel_deep_blue_long": safe_float(cells[40]) if len(cells) > 40 else 0,
-                            "camel_deep_blue": safe_float(cells[41]) if len(cells) > 41 else 0,
-                            "camel_yellow_long": safe_float(cells[42]) if len(cells) > 42 else 0,
-                            "camel_slender_blue": safe_float(cells[43]) if len(cells) > 43 else 0,
-                            "dp_camel_slender_blueline": safe_float(cells[44]) if len(cells) > 44 else 0,
-                            "camel_slender_gray": safe_float(cells[45]) if len(cells) > 45 else 0,
-                            "dp_camel_slender_grayline": safe_float(cells[46]) if len(cells) > 46 else 0,
-                            "winston_red_long": safe_float(cells[47]) if len(cells) > 47 else 0,
-                            "winston_red": safe_float(cells[48]) if len(cells) > 48 else 0,
-                            "winston_blue_long": safe_float(cells[49]) if len(cells) > 49 else 0,
-                            "winston_blue": safe_float(cells[50]) if len(cells) > 50 else 0,
-                            "winston_gray": safe_float(cells[51]) if len(cells) > 51 else 0,
-                            "winston_slims_blue": safe_float(cells[52]) if len(cells) > 52 else 0,
-                            "winston_slims_gray": safe_float(cells[53]) if len(cells) > 53 else 0,
-                            "winston_slims_q_line": safe_float(cells[54]) if len(cells) > 54 else 0,
-                            "winston_xsence_black": safe_float(cells[55]) if len(cells) > 55 else 0,
-                            "winston_xsence_gray": safe_float(cells[56]) if len(cells) > 56 else 0,
-                            "winston_dark_blue_long": safe_float(cells[57]) if len(cells) > 57 else 0,
-                            "winston_dark_blue": safe_float(cells[58]) if len(cells) > 58 else 0,
-                            "winston_deep_blue": safe_float(cells[59]) if len(cells) > 59 else 0,
-                            "winston_slender_blue_long": safe_float(cells[60]) if len(cells) > 60 else 0,
-                            "winston_slender_blue": safe_float(cells[61]) if len(cells) > 61 else 0,
-                            "winston_slender_gray": safe_float(cells[62]) if len(cells) > 62 else 0,
-                            "winston_slender_dark_blue": safe_float(cells[63]) if len(cells) > 63 else 0,
-                            "winston_slender_q_line": safe_float(cells[64]) if len(cells) > 64 else 0,
-                            "monte_carlo_red": safe_float(cells[65]) if len(cells) > 65 else 0,
-                            "monte_carlo_dark_blue_long": safe_float(cells[66]) if len(cells) > 66 else 0,
-                            "monte_carlo_dark_blue": safe_float(cells[67]) if len(cells) > 67 else 0,
-                            "monte_carlo_slender_dark_blue": safe_float(cells[68]) if len(cells) > 68 else 0,
-                            "ld_slims": safe_float(cells[69]) if len(cells) > 69 else 0,
-                            "ld_blue_long": safe_float(cells[70]) if len(cells) > 70 else 0,
-                            "ld_blue": safe_float(cells[71]) if len(cells) > 71 else 0,
-                            "toplam_gun_sku": safe_float(cells[72]) if len(cells) > 72 else 0,
-                            # Marka Toplamları (73-80)
-                            "camel_toplam": safe_float(cells[73]) if len(cells) > 73 else 0,
-                            "winston_toplam": safe_float(cells[74]) if len(cells) > 74 else 0,
-                            "mcarlo_toplam": safe_float(cells[75]) if len(cells) > 75 else 0,
-                            "myo_camel": safe_float(cells[76]) if len(cells) > 76 else 0,
-                            "ld_toplam": safe_float(cells[77]) if len(cells) > 77 else 0,
-                            "toplam": safe_float(cells[78]) if len(cells) > 78 else 0,
-                            "kasa": safe_float(cells[79]) if len(cells) > 79 else 0,
-                            "hedef_das": safe_float(cells[80]) if len(cells) > 80 else 0,
-                            # Gerçekleşen (81-88)
-                            "camel_gerc": safe_float(cells[81]) if len(cells) > 81 else 0,
-                            "winston_gerc": safe_float(cells[82]) if len(cells) > 82 else 0,
-                            "mcarlo_gerc": safe_float(cells[83]) if len(cells) > 83 else 0,
-                            "myo_camel_gerc": safe_float(cells[84]) if len(cells) > 84 else 0,
-                            "ld_gerc": safe_float(cells[85]) if len(cells) > 85 else 0,
-                            "toplam_gerc": safe_float(cells[86]) if len(cells) > 86 else 0,
-                            "kasa_gerc": safe_float(cells[87]) if len(cells) > 87 else 0,
-                            "gerc_das": safe_float(cells[88]) if len(cells) > 88 else 0,
-                            # Kanal Bazlı (89-99)
-                            "bak_01": safe_float(cells[89]) if len(cells) > 89 else 0,
-                            "mar_02": safe_float(cells[90]) if len(cells) > 90 else 0,
-                            "bfe_03": safe_float(cells[91]) if len(cells) > 91 else 0,
-                            "kye_04": safe_float(cells[92]) if len(cells) > 92 else 0,
-                            "tek_05": safe_float(cells[93]) if len(cells) > 93 else 0,
-                            "ben_07": safe_float(cells[94]) if len(cells) > 94 else 0,
-                            "ask_08": safe_float(cells[95]) if len(cells) > 95 else 0,
-                            "czv_11": safe_float(cells[96]) if len(cells) > 96 else 0,
-                            "yznc_12": safe_float(cells[97]) if len(cells) > 97 else 0,
-                            "tut_14": safe_float(cells[98]) if len(cells) > 98 else 0,
-                            "tus_15": safe_float(cells[99]) if len(cells) > 99 else 0,
-                            # Stand Sayıları (100-103)
-                            "jti": safe_float(cells[100]) if len(cells) > 100 else 0,
-                            "pmi": safe_float(cells[101]) if len(cells) > 101 else 0,
-                            "bat": safe_float(cells[102]) if len(cells) > 102 else 0,
-                            "rut_say": safe_float(cells[103]) if len(cells) > 103 else 0,
-                            # Yıllık SKU (104-115)
-                            "w_dark_blue_ks": safe_float(cells[104]) if len(cells) > 104 else 0,
-                            "w_slender_blue_ks": safe_float(cells[105]) if len(cells) > 105 else 0,
-                            "w_dark_blue_long": safe_float(cells[106]) if len(cells) > 106 else 0,
-                            "mcarlo_slender_dark_blue_yil": safe_float(cells[107]) if len(cells) > 107 else 0,
-                            "w_slim_blue": safe_float(cells[108]) if len(cells) > 108 else 0,
-                            "w_blue_ks": safe_float(cells[109]) if len(cells) > 109 else 0,
-                            "w_slender_blue_long": safe_float(cells[110]) if len(cells) > 110 else 0,
-                            "camel_slender_blue_yil": safe_float(cells[111]) if len(cells) > 111 else 0,
-                            "mcarlo_dark_blue_ks": safe_float(cells[112]) if len(cells) > 112 else 0,
-                            "mcarlo_dark_blue_long_yil": safe_float(cells[113]) if len(cells) > 113 else 0,
-                            "w_slender_q_line_2025": safe_float(cells[114]) if len(cells) > 114 else 0,
-                            "w_slender_q_line_2026": safe_float(cells[115]) if len(cells) > 115 else 0,
-                            "frekans_ort": safe_float(cells[116]) if len(cells) > 116 else 0,
-                        }
-                        dst_data_list.append(dst_record)
-            
-            if dst_data_list:
-                await db.dst_data.insert_many(dst_data_list)
-                logger.info(f"Inserted {len(dst_data_list)} DST data records")
-            
-            # Process DSM Teams (TEAM-I row 21, TEAM-II row 11)
-            logger.info("Processing DSM Teams...")
-            
-            # TEAM-II (satır 11 - index 10)
-            team2_row = rows[10]
-            team2_cells = [cell.v for cell in team2_row]
-            
-            # TEAM-I (satır 21 - index 20)
-            team1_row = rows[20]
-            team1_cells = [cell.v for cell in team1_row]
-            
-            def create_team_data(cells, team_name, dsm_name, dst_list):
-                return {
-                    "team_name": team_name,
-                    "dsm_name": dsm_name,
-                    "dst_list": dst_list,
-                    "bayi_sayisi": safe_float(cells[1]) if len(cells) > 1 else 0,
-                    "aktif_bayi_sayisi": safe_float(cells[2]) if len(cells) > 2 else 0,
-                    "pasif_bayi_sayisi": safe_float(cells[3]) if len(cells) > 3 else 0,
-                    "aralik_hedef": safe_float(cells[4]) if len(cells) > 4 else 0,
-                    "aralik_satis": safe_float(cells[5]) if len(cells) > 5 else 0,
-                    "kalan_satis": safe_float(cells[6]) if len(cells) > 6 else 0,
-                    "hedef_basari_orani": safe_float(cells[7]) if len(cells) > 7 else 0,
-                    "tahsilat_hedef": safe_float(cells[8]) if len(cells) > 8 else 0,
-                    "tahsilat_tutari": safe_float(cells[9]) if len(cells) > 9 else 0,
-                    "ay_hedef_ziyaret": safe_float(cells[10]) if len(cells) > 10 else 0,
-                    "ziyaret_gerceklesen": safe_float(cells[11]) if len(cells) > 11 else 0,
-                    "drop_rate": safe_float(cells[12]) if len(cells) > 12 else 0,
-                    "basarili_satis": safe_float(cells[13]) if len(cells) > 13 else 0,
-                    "basarili_satis_yuzde": safe_float(cells[14]) if len(cells) > 14 else 0,
-                    "carili_bayi_sayisi": safe_float(cells[15]) if len(cells) > 15 else 0,
-                    "gun_0": safe_float(cells[16]) if len(cells) > 16 else 0,
-                    "gun_1": safe_float(cells[17]) if len(cells) > 17 else 0,
-                    "gun_2": safe_float(cells[18]) if len(cells) > 18 else 0,
-                    "gun_3": safe_float(cells[19]) if len(cells) > 19 else 0,
-                    "gun_4": safe_float(cells[20]) if len(cells) > 20 else 0,
-                    "gun_5": safe_float(cells[21]) if len(cells) > 21 else 0,
-                    "gun_6": safe_float(cells[22]) if len(cells) > 22 else 0,
-                    "gun_7": safe_float(cells[23]) if len(cells) > 23 else 0,
-                    "gun_8": safe_float(cells[24]) if len(cells) > 24 else 0,
-                    "gun_9": safe_float(cells[25]) if len(cells) > 25 else 0,
-                    "gun_10": safe_float(cells[26]) if len(cells) > 26 else 0,
-                    "gun_11": safe_float(cells[27]) if len(cells) > 27 else 0,
-                    "gun_12": safe_float(cells[28]) if len(cells) > 28 else 0,
-                    "gun_13": safe_float(cells[29]) if len(cells) > 29 else 0,
-                    "gun_14_uzeri": safe_float(cells[30]) if len(cells) > 30 else 0,
-                    "cari_toplam": safe_float(cells[31]) if len(cells) > 31 else 0,
-                    "toplam_gun_sku": safe_float(cells[72]) if len(cells) > 72 else 0,
-                    # Hedefler
-                    "camel_toplam": safe_float(cells[73]) if len(cells) > 73 else 0,
-                    "winston_toplam": safe_float(cells[74]) if len(cells) > 74 else 0,
-                    "mcarlo_toplam": safe_float(cells[75]) if len(cells) > 75 else 0,
-                    "myo_camel": safe_float(cells[76]) if len(cells) > 76 else 0,
-                    "ld_toplam": safe_float(cells[77]) if len(cells) > 77 else 0,
-                    "toplam": safe_float(cells[78]) if len(cells) > 78 else 0,
-                    "kasa": safe_float(cells[79]) if len(cells) > 79 else 0,
-                    "hedef_das": safe_float(cells[80]) if len(cells) > 80 else 0,
-                    # Satışlar
-                    "camel_gerc": safe_float(cells[81]) if len(cells) > 81 else 0,
-                    "winston_gerc": safe_float(cells[82]) if len(cells) > 82 else 0,
-                    "mcarlo_gerc": safe_float(cells[83]) if len(cells) > 83 else 0,
-                    "myo_camel_gerc": safe_float(cells[84]) if len(cells) > 84 else 0,
-                    "ld_gerc": safe_float(cells[85]) if len(cells) > 85 else 0,
-                    "toplam_gerc": safe_float(cells[86]) if len(cells) > 86 else 0,
-                    "kasa_gerc": safe_float(cells[87]) if len(cells) > 87 else 0,
-                    "gerc_das": safe_float(cells[88]) if len(cells) > 88 else 0,
-                    # Bayi Tipleri
-                    "bak_01": safe_float(cells[89]) if len(cells) > 89 else 0,
-                    "mar_02": safe_float(cells[90]) if len(cells) > 90 else 0,
-                    "bfe_03": safe_float(cells[91]) if len(cells) > 91 else 0,
-                    "kye_04": safe_float(cells[92]) if len(cells) > 92 else 0,
-                    "tek_05": safe_float(cells[93]) if len(cells) > 93 else 0,
-                    "ben_07": safe_float(cells[94]) if len(cells) > 94 else 0,
-                    "ask_08": safe_float(cells[95]) if len(cells) > 95 else 0,
-                    "czv_11": safe_float(cells[96]) if len(cells) > 96 else 0,
-                    "yznc_12": safe_float(cells[97]) if len(cells) > 97 else 0,
-                    "tut_14": safe_float(cells[98]) if len(cells) > 98 else 0,
-                    "tus_15": safe_float(cells[99]) if len(cells) > 99 else 0,
-                    "jti": safe_float(cells[100]) if len(cells) > 100 else 0,
-                    "pmi": safe_float(cells[101]) if len(cells) > 101 else 0,
-                    "bat": safe_float(cells[102]) if len(cells) > 102 else 0,
-                    "rut_say": safe_float(cells[103]) if len(cells) > 103 else 0,
-                    # İlk 10 SKU
-                    "w_dark_blue_ks": safe_float(cells[104]) if len(cells) > 104 else 0,
-                    "w_slender_blue_ks": safe_float(cells[105]) if len(cells) > 105 else 0,
-                    "w_dark_blue_long": safe_float(cells[106]) if len(cells) > 106 else 0,
-                    "mcarlo_slender_dark_blue_yil": safe_float(cells[107]) if len(cells) > 107 else 0,
-                    "w_slim_blue": safe_float(cells[108]) if len(cells) > 108 else 0,
-                    "w_blue_ks": safe_float(cells[109]) if len(cells) > 109 else 0,
-                    "w_slender_blue_long": safe_float(cells[110]) if len(cells) > 110 else 0,
-                    "camel_slender_blue_yil": safe_float(cells[111]) if len(cells) > 111 else 0,
-                    "mcarlo_dark_blue_ks": safe_float(cells[112]) if len(cells) > 112 else 0,
-                    "mcarlo_dark_blue_long_yil": safe_float(cells[113]) if len(cells) > 113 else 0,
-                    "w_slender_q_line_2025": safe_float(cells[114]) if len(cells) > 114 else 0,
-                    "w_slender_q_line_2026": safe_float(cells[115]) if len(cells) > 115 else 0,
-                    "frekans_ort": safe_float(cells[116]) if len(cells) > 116 else 0,
-                }
-            
-            team2_data = create_team_data(
-                team2_cells,
-                "TEAM-II",
-                "MURAT YÖRÜKOĞLU",
-                ["KEMAL BANİ", "COŞKUN ÇİMEN", "MUSTAFA KAĞAN KAYA", "MUSTAFA HARMANCI", 
-                 "KAZIM KARABEKİR ÖRAN", "TUNAHAN IŞILAK", "MEVLÜT ŞEKER", "TAHİR UÇAR", "YASİN TUĞRA DAĞLI"]
-            )
-            
-            team1_data = create_team_data(
-                team1_cells,
-                "TEAM-I",
-                "OSMAN DİNÇOL",
-                ["HÜSEYİN AYHAN AKMAN", "MUSTAFA USLU", "HASAN ALİ AKDAĞ", "AHMET GÖKMEN",
-                 "LÜTFİ UYSAL", "ŞERAFETTİN BÜYÜKTAŞDELEN", "BURAK KÜÇÜKŞANTÜRK", "YASİN AVCI", "MUSTAFA İBİŞ"]
-            )
-            
-            await db.dsm_teams.insert_many([team1_data, team2_data])
-            logger.info("Inserted 2 DSM team records")
-            
-            # Process TTE Data (rows 24-27 for TTE info, rows 28-32 for stand info)
-            logger.info("Processing TTE Data...")
-            tte_data_list = []
-            
-            for i in range(23, 27):  # Rows 24-27 (index 23-26)
-                row = rows[i]
-                cells = [cell.v for cell in row]
-                if cells[0]:
-                    tte_name = safe_str(cells[0])
-                    tte_record = {
-                        "tte_name": tte_name,
-                        "bayi_sayisi": safe_float(cells[1]) if len(cells) > 1 else 0,
-                        "aktif_bayi_sayisi": safe_float(cells[2]) if len(cells) > 2 else 0,
-                        "pasif_bayi_sayisi": safe_float(cells[3]) if len(cells) > 3 else 0,
-                    }
-                    tte_data_list.append(tte_record)
-            
-            # Stand info from rows 29-32 (index 28-31)
-            for i, tte_data in enumerate(tte_data_list):
-                stand_row_idx = 28 + i  # Rows 29, 30, 31, 32
-                if stand_row_idx < len(rows):
-                    stand_row = rows[stand_row_idx]
-                    stand_cells = [cell.v for cell in stand_row]
-                    
-                    tte_data["jti"] = safe_float(stand_cells[1]) if len(stand_cells) > 1 else 0
-                    tte_data["jti_stand"] = safe_float(stand_cells[2]) if len(stand_cells) > 2 else 0
-                    tte_data["pmi"] = safe_float(stand_cells[3]) if len(stand_cells) > 3 else 0
-                    tte_data["pmi_stand"] = safe_float(stand_cells[4]) if len(stand_cells) > 4 else 0
-                    tte_data["bat"] = safe_float(stand_cells[5]) if len(stand_cells) > 5 else 0
-                    tte_data["bat_stand"] = safe_float(stand_cells[6]) if len(stand_cells) > 6 else 0
-                    # Bayi sınıfları (H-N sütunları, index 7-13)
-                    tte_data["sinif_a"] = safe_float(stand_cells[7]) if len(stand_cells) > 7 else 0
-                    tte_data["sinif_a_plus"] = safe_float(stand_cells[8]) if len(stand_cells) > 8 else 0
-                    tte_data["sinif_b"] = safe_float(stand_cells[9]) if len(stand_cells) > 9 else 0
-                    tte_data["sinif_c"] = safe_float(stand_cells[10]) if len(stand_cells) > 10 else 0
-                    tte_data["sinif_d"] = safe_float(stand_cells[11]) if len(stand_cells) > 11 else 0
-                    tte_data["sinif_e"] = safe_float(stand_cells[12]) if len(stand_cells) > 12 else 0
-                    tte_data["sinif_e_minus"] = safe_float(stand_cells[13]) if len(stand_cells) > 13 else 0
-            
-            if tte_data_list:
-                await db.tte_data.insert_many(tte_data_list)
-                logger.info(f"Inserted {len(tte_data_list)} TTE data records")
-            
-            # Process Distributor Totals from Row 22
-            logger.info("Processing Distributor Totals...")
-            await db.distributor_totals.delete_many({})
-            
-            row22 = rows[21]  # Row 22 (0-indexed = 21)
-            
-            # pyxlsb bazen boş hücreleri atlar, bu yüzden hücreleri sütun indeksine göre alalım
-            cells_dict = {cell.c: cell.v for cell in row22}  # c = column index
-            max_col = max(cells_dict.keys()) if cells_dict else 0
-            cells = [cells_dict.get(i, None) for i in range(max_col + 1)]
-            
-            # Debug: Log row length and specific cells
-            logger.info(f"Row 22 has {len(cells)} columns (max_col={max_col})")
-            logger.info(f"BY22 (index 76) value: {cells[76] if len(cells) > 76 else 'N/A'}")
-            logger.info(f"DT22 (index 123) value: {cells[123] if len(cells) > 123 else 'N/A'}")
-            
-            totals = {
-                "type": "totals",
-                # B22-AH22 (columns 1-33)
-                "bayi_sayisi": safe_float(cells[1]) if len(cells) > 1 else 0,
-                "aktif_bayi_sayisi": safe_float(cells[2]) if len(cells) > 2 else 0,
-                "pasif_bayi_sayisi": safe_float(cells[3]) if len(cells) > 3 else 0,
-                "aralik_hedef": safe_float(cells[4]) if len(cells) > 4 else 0,
-                "aralik_satis": safe_float(cells[5]) if len(cells) > 5 else 0,
-                "kalan_satis": safe_float(cells[6]) if len(cells) > 6 else 0,
-                "hedef_basari_orani": safe_float(cells[7]) if len(cells) > 7 else 0,
-                "tahsilat_hedef": safe_float(cells[8]) if len(cells) > 8 else 0,
-                "tahsilat_tutari": safe_float(cells[9]) if len(cells) > 9 else 0,
-                "ay_hedef_ziyaret": safe_float(cells[10]) if len(cells) > 10 else 0,
-                "ziyaret_gerceklesen": safe_float(cells[11]) if len(cells) > 11 else 0,
-                "drop_rate": safe_float(cells[12]) if len(cells) > 12 else 0,
-                "basarili_satis": safe_float(cells[13]) if len(cells) > 13 else 0,
-                "basarili_satis_yuzde": safe_float(cells[14]) if len(cells) > 14 else 0,
-                "carili_bayi_sayisi": safe_float(cells[15]) if len(cells) > 15 else 0,
-                "gun_0": safe_float(cells[16]) if len(cells) > 16 else 0,
-                "gun_1": safe_float(cells[17]) if len(cells) > 17 else 0,
-                "gun_2": safe_float(cells[18]) if len(cells) > 18 else 0,
-                "gun_3": safe_float(cells[19]) if len(cells) > 19 else 0,
-                "gun_4": safe_float(cells[20]) if len(cells) > 20 else 0,
-                "gun_5": safe_float(cells[21]) if len(cells) > 21 else 0,
-                "gun_6": safe_float(cells[22]) if len(cells) > 22 else 0,
-                "gun_7": safe_float(cells[23]) if len(cells) > 23 else 0,
-                "gun_8": safe_float(cells[24]) if len(cells) > 24 else 0,
-                "gun_9": safe_float(cells[25]) if len(cells) > 25 else 0,
-                "gun_10": safe_float(cells[26]) if len(cells) > 26 else 0,
-                "gun_11": safe_float(cells[27]) if len(cells) > 27 else 0,
-                "gun_12": safe_float(cells[28]) if len(cells) > 28 else 0,
-                "gun_13": safe_float(cells[29]) if len(cells) > 29 else 0,
-                "gun_14_uzeri": safe_float(cells[30]) if len(cells) > 30 else 0,
-                "cari_toplam": safe_float(cells[31]) if len(cells) > 31 else 0,
-                "loy_verilen_bayi_sayisi": safe_float(cells[32]) if len(cells) > 32 else 0,
-                "loy_bayi_mahsuplasma_tutari": safe_float(cells[33]) if len(cells) > 33 else 0,
-                # BV22-CZ22 (columns 73-103)
-                "camel_hedef": safe_float(cells[73]) if len(cells) > 73 else 0,
-                "winston_hedef": safe_float(cells[74]) if len(cells) > 74 else 0,
-                "mcarlo_hedef": safe_float(cells[75]) if len(cells) > 75 else 0,
-                "myo_camel_hedef": safe_float(cells[76]) if len(cells) > 76 else 0,
-                "ld_hedef": safe_float(cells[77]) if len(cells) > 77 else 0,
-                "toplam_hedef": safe_float(cells[78]) if len(cells) > 78 else 0,
-                "kasa_hedef": safe_float(cells[79]) if len(cells) > 79 else 0,
-                "hedef_das": safe_float(cells[80]) if len(cells) > 80 else 0,
-                "camel_satis": safe_float(cells[81]) if len(cells) > 81 else 0,
-                "winston_satis": safe_float(cells[82]) if len(cells) > 82 else 0,
-                "mcarlo_satis": safe_float(cells[83]) if len(cells) > 83 else 0,
-                "myo_camel_satis": safe_float(cells[84]) if len(cells) > 84 else 0,
-                "ld_satis": safe_float(cells[85]) if len(cells) > 85 else 0,
-                "toplam_satis": safe_float(cells[86]) if len(cells) > 86 else 0,
-                "kasa_satis": safe_float(cells[87]) if len(cells) > 87 else 0,
-                "gerc_das": safe_float(cells[88]) if len(cells) > 88 else 0,
-                "bak_01": safe_float(cells[89]) if len(cells) > 89 else 0,
-                "mar_02": safe_float(cells[90]) if len(cells) > 90 else 0,
-                "bfe_03": safe_float(cells[91]) if len(cells) > 91 else 0,
-                "kye_04": safe_float(cells[92]) if len(cells) > 92 else 0,
-                "tek_05": safe_float(cells[93]) if len(cells) > 93 else 0,
-                "ben_07": safe_float(cells[94]) if len(cells) > 94 else 0,
-                "ask_08": safe_float(cells[95]) if len(cells) > 95 else 0,
-                "czv_11": safe_float(cells[96]) if len(cells) > 96 else 0,
-                "yznc_12": safe_float(cells[97]) if len(cells) > 97 else 0,
-                "tut_14": safe_float(cells[98]) if len(cells) > 98 else 0,
-                "tus_15": safe_float(cells[99]) if len(cells) > 99 else 0,
-                "jti": safe_float(cells[100]) if len(cells) > 100 else 0,
-                "pmi": safe_float(cells[101]) if len(cells) > 101 else 0,
-                "bat": safe_float(cells[102]) if len(cells) > 102 else 0,
-                "rut_say": safe_float(cells[103]) if len(cells) > 103 else 0,
-                # DL22-DS22 (columns 115-116)
-                "qline_2026_satis": safe_float(cells[115]) if len(cells) > 115 else 0,
-                "frekans_ort": safe_float(cells[116]) if len(cells) > 116 else 0,
-                # DT22 - Q Line Hedef (column 123)
-                "qline_hedef": safe_float(cells[123]) if len(cells) > 123 else 0,
+# Yükleme işinin durumu
+@api_router.get("/upload/jobs/{job_id}")
+async def get_upload_job(job_id: str):
+    job = await db.ingest_jobs.find_one({"id": job_id}, {"_id": 0, "file_path": 0, "worker": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Yükleme işi bulunamadı")
+    if job["state"] == "queued":
+        job["queue_position"] = await db.ingest_jobs.count_documents({
+            "state": {"$in": ["queued", "running"]},
+            "created_at": {"$lt": job["created_at"]},
+        }) + 1
+    return job
+
+# Önceki yüklemeye geri dön
+@api_router.post("/upload/rollback")
+async def rollback_upload():
+    try:
+        info = await rollback_generation()
+        if not info:
+            raise HTTPException(status_code=404, detail="Geri alınacak önceki yükleme bulunamadı")
+        return {"success": True, "message": "Önceki yüklemeye geri dönüldü", "son_guncelleme": info.get("son_guncelleme", "")}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Rollback error: {e}")
+        raise HTTPException(status_code=500, detail=f"Geri alma hatası: {str(e)}")
+
+# Yükleme raporları (aşama süreleri, sayfa ve koleksiyon bazında)
+@api_router.get("/ingest/reports")
+async def get_ingest_reports(limit: int = 20, state: Optional[str] = None):
+    query = {"state": state} if state else {}
+    limit = max(1, min(limit, 200))
+    return await db.ingest_reports.find(query, {"_id": 0}).sort("started_at", -1).to_list(limit)
+
+@api_router.get("/ingest/reports/{job_id}")
+async def get_ingest_report(job_id: str):
+    report = await db.ingest_reports.find_one({"id": job_id}, {"_id": 0})
+    if not report:
+        raise HTTPException(status_code=404, detail="Yükleme raporu bulunamadı")
+    return report
+
+# Excel parsing
+# Sayfalar worker process'lerde ayrıştırılır; parser'lar açık workbook'u alır,
+# satırları akış halinde okur ve {koleksiyon: [satır dict'leri]} döndürür,
+# veritabanına dokunmaz.
+SKU_FIELDS = [
+    "skt_camel_yellow_100", "camel_brown", "camel_black", "camel_white",
+    "camel_yellow_sp", "camel_yellow", "camel_deep_blue_long", "camel_deep_blue",
+    "camel_yellow_long", "camel_slender_blue", "dp_camel_slender_blueline",
+    "camel_slender_gray", "dp_camel_slender_grayline", "winston_red_long",
+    "winston_red", "winston_blue_long", "winston_blue", "winston_gray",
+    "winston_slims_blue", "winston_slims_gray", "winston_slims_q_line",
+    "winston_xsence_black", "winston_xsence_gray", "winston_dark_blue_long",
+    "winston_dark_blue", "winston_deep_blue", "winston_slender_blue_long",
+    "winston_slender_blue", "winston_slender_gray", "winston_slender_dark_blue",
+    "winston_slender_q_line", "monte_carlo_red", "monte_carlo_dark_blue_long",
+    "monte_carlo_dark_blue", "monte_carlo_slender_dark_blue", "ld_slims",
+    "ld_blue_long", "ld_blue", "toplam"
+]
+
+AY_ALANLARI = ["ocak", "subat", "mart", "nisan", "mayis", "haziran",
+               "temmuz", "agustos", "eylul", "ekim", "kasim", "aralik"]
+
+GUN_ISIMLERI = ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma', 'Cumartesi', 'Pazar']
+
+_EMPTY_CELL = pyxlsb.worksheet.Cell(None, None, None)
+
+
+def iter_sheet_cells(wb, sheet_name: str, start: int = 0, stop: Optional[int] = None):
+    """Stream a sheet's rows, one row in memory at a time.
+
+    Rows are lists of cells where row[i] is column i.
+    """
+    with wb.get_sheet(sheet_name) as sheet:
+        for idx, row in enumerate(sheet.rows()):
+            if stop is not None and idx >= stop:
+                break
+            if idx < start:
+                continue
+            if row and row[-1].c != len(row) - 1:
+                # pyxlsb bazen boş hücreleri atlar, bu yüzden hücreleri sütun indeksine göre alalım
+                aligned = [_EMPTY_CELL] * (max(cell.c for cell in row) + 1)
+                for cell in row:
+                    aligned[cell.c] = cell
+                row = aligned
+            yield row
+
+
+# Sheet schemas
+# Alan türü -> (dönüştürücü, sütun satırda yoksa kullanılacak değer)
+FIELD_TYPES = {
+    "float": (safe_float, 0),
+    "str": (safe_str, ""),
+    "str?": (safe_str, None),
+    "int": (lambda v: int(safe_float(v)), 0),
+    "raw": (lambda v: v, None),
+}
+
+
+def compile_extractor(fields: List[tuple]):
+    """Compile [(field, column, type)] into a function mapping a cell row to a dict.
+
+    The generated function touches only the declared columns and does no
+    per-field lookups at run time.
+    """
+    names = {kind: f"_convert_{i}" for i, kind in enumerate(FIELD_TYPES)}
+    namespace = {names[kind]: convert for kind, (convert, _) in FIELD_TYPES.items()}
+    lines = ["def extract(row):", "    n = len(row)", "    return {"]
+    for field, col, kind in fields:
+        default = FIELD_TYPES[kind][1]
+        lines.append(f"        {field!r}: {names[kind]}(row[{col}].v) if n > {col} else {default!r},")
+    lines.append("    }")
+    exec("\n".join(lines), namespace)
+    return namespace["extract"]
+
+
+class SheetSchema:
+    """Layout of one sheet (or one block of rows in it): header row, first data
+    row and the column -> field/type mapping, compiled once at import."""
+
+    def __init__(self, sheet: str, fields: List[tuple], start_row: int = 1,
+                 header_row: Optional[int] = 0, stop_row: Optional[int] = None):
+        self.sheet = sheet
+        self.fields = fields
+        self.start_row = start_row
+        self.stop_row = stop_row
+        self.header_row = header_row
+        self.width = max(col for _, col, _ in fields) + 1
+        self.extract = compile_extractor(fields)
+
+    def rows(self, wb):
+        """Yield the data rows, warning once if the header is narrower than the schema"""
+        first = self.start_row if self.header_row is None else min(self.header_row, self.start_row)
+        for idx, row in enumerate(iter_sheet_cells(wb, self.sheet, first, self.stop_row), start=first):
+            if idx == self.header_row and len(row) < self.width:
+                logger.warning(f"{self.sheet}: header has {len(row)} columns, schema expects {self.width}")
+            if idx >= self.start_row:
+                yield row
+
+
+def month_fields(year: int, start_col: int) -> List[tuple]:
+    return [(f"{ay}_{year}", start_col + i, "float") for i, ay in enumerate(AY_ALANLARI)]
+
+
+def sku_fields(start_col: int, names: List[str] = SKU_FIELDS) -> List[tuple]:
+    return [(name, start_col + i, "float") for i, name in enumerate(names)]
+
+
+BAYI_LIST_SCHEMA = SheetSchema('AÜ BAYİ LİST', start_row=2, header_row=1, fields=[
+    ("dst", 2, "str?"),
+    ("tte", 3, "str?"),
+    ("dsm", 4, "str?"),
+    ("tip", 5, "str?"),
+    ("panaroma_sinif", 6, "str?"),
+    ("satisa_gore_sinif", 7, "str?"),
+    ("sinif", 8, "str?"),  # I sütunu - Müşteri Sınıfı
+    ("kapsam_durumu", 9, "str?"),
+    ("jti_stant", 10, "str?"),
+    ("jti_stant_adet", 11, "float"),
+    ("camel_myo_stant", 12, "str?"),
+    ("camel_myo_adet", 13, "float"),
+    ("pmi_stant", 14, "str?"),
+    ("pmi_adet", 15, "float"),
+    ("bat_stant", 16, "str?"),
+    ("bat_adet", 17, "float"),
+    ("loyalty_plan_2025", 18, "float"),
+    ("odenen_2025", 19, "float"),
+    # 2025 Monthly
+    *month_fields(2025, 33),
+    ("toplam_satis_2025", 45, "float"),
+    ("ortalama_2025", 48, "float"),
+    # 2024 Monthly
+    *month_fields(2024, 71),
+    ("toplam_satis_2024", 83, "float"),
+    ("ortalama_2024", 84, "float"),
+    # 2026 Monthly
+    *month_fields(2026, 85),
+    ("toplam_2026", 97, "float"),
+    ("ortalama_2026", 98, "float"),
+])
+
+FATURA_SCHEMA = SheetSchema('Fatura', [
+    ("matbu_no", 5, "str"),
+    ("net_tutar", 13, "float"),
+])
+
+BELGE_DETAY_SCHEMA = SheetSchema('Belge detay', [
+    ("matbu_no", 0, "str?"),
+    ("urun", 6, "str"),
+    ("miktar", 7, "float"),
+    ("birim_fiyat", 8, "float"),
+])
+
+TAHSILAT_SCHEMA = SheetSchema('tahsilat', [
+    ("tahsilat_turu", 1, "str"),
+    ("islem_tarihi", 5, "str?"),
+    ("tutar", 8, "float"),
+])
+
+KONYA_GUN_SCHEMA = SheetSchema('KONYA GÜN', start_row=7, header_row=6, fields=[
+    ("unvan", 1, "str"),
+    ("dst", 2, "str"),
+    ("dsm", 3, "str"),
+    ("tip", 4, "str"),
+    ("sinif", 5, "str"),
+    ("kanal", 7, "str"),  # H column - kanal bilgisi
+    ("musteri_bakiyesi", 10, "float"),
+    *[(f"gun_{i}", 11 + i, "float") for i in range(14)],
+    ("gun_14_uzeri", 25, "float"),
+])
+
+# Carili kanal toplamları (H2-H6, K2-K6)
+KONYA_KANAL_SCHEMA = SheetSchema('KONYA GÜN', start_row=1, stop_row=6, header_row=None, fields=[
+    ("kanal_adi", 7, "str"),  # H column
+    ("kanal_tutari", 10, "float"),  # K column
+])
+
+STAND_RAPORU_SCHEMA = SheetSchema('STAND RAPORU', [
+    ("bayi_unvani", 6, "str?"),  # UNVAN
+    ("tip", 7, "str?"),  # H sütunu
+    ("ilce", 11, "str?"),  # L sütunu
+    ("bayi_durumu", 12, "str?"),
+    ("dst", 59, "str?"),  # BH
+    ("tte", 60, "str?"),  # BI
+    ("txtkapsam", 62, "str?"),  # BK
+])
+
+# DATA sayfası özet bloklarıdır; satır numaraları parse_data içinde sabittir.
+DATA_ORTAK_FIELDS = [
+    ("bayi_sayisi", 1, "float"),
+    ("aktif_bayi_sayisi", 2, "float"),
+    ("pasif_bayi_sayisi", 3, "float"),
+    ("aralik_hedef", 4, "float"),
+    ("aralik_satis", 5, "float"),
+    ("kalan_satis", 6, "float"),
+    ("hedef_basari_orani", 7, "float"),
+    ("tahsilat_hedef", 8, "float"),
+    ("tahsilat_tutari", 9, "float"),
+    ("ay_hedef_ziyaret", 10, "float"),
+    ("ziyaret_gerceklesen", 11, "float"),
+    ("drop_rate", 12, "float"),
+    ("basarili_satis", 13, "float"),
+    ("basarili_satis_yuzde", 14, "float"),
+    ("carili_bayi_sayisi", 15, "float"),
+    *[(f"gun_{i}", 16 + i, "float") for i in range(14)],
+    ("gun_14_uzeri", 30, "float"),
+    ("cari_toplam", 31, "float"),
+]
+
+DATA_LOYALTY_FIELDS = [
+    ("loy_verilen_bayi_sayisi", 32, "float"),
+    ("loy_bayi_mahsuplasma_tutari", 33, "float"),
+]
+
+DATA_HEDEF_FIELDS = [
+    ("toplam_gun_sku", 72, "float"),
+    # Hedefler
+    ("camel_toplam", 73, "float"),
+    ("winston_toplam", 74, "float"),
+    ("mcarlo_toplam", 75, "float"),
+    ("myo_camel", 76, "float"),
+    ("ld_toplam", 77, "float"),
+    ("toplam", 78, "float"),
+    ("kasa", 79, "float"),
+    ("hedef_das", 80, "float"),
+    # Satışlar
+    ("camel_gerc", 81, "float"),
+    ("winston_gerc", 82, "float"),
+    ("mcarlo_gerc", 83, "float"),
+    ("myo_camel_gerc", 84, "float"),
+    ("ld_gerc", 85, "float"),
+    ("toplam_gerc", 86, "float"),
+    ("kasa_gerc", 87, "float"),
+    ("gerc_das", 88, "float"),
+    # Bayi Tipleri
+    ("bak_01", 89, "float"),
+    ("mar_02", 90, "float"),
+    ("bfe_03", 91, "float"),
+    ("kye_04", 92, "float"),
+    ("tek_05", 93, "float"),
+    ("ben_07", 94, "float"),
+    ("ask_08", 95, "float"),
+    ("czv_11", 96, "float"),
+    ("yznc_12", 97, "float"),
+    ("tut_14", 98, "float"),
+    ("tus_15", 99, "float"),
+    ("jti", 100, "float"),
+    ("pmi", 101, "float"),
+    ("bat", 102, "float"),
+    ("rut_say", 103, "float"),
+    # İlk 10 SKU
+    ("w_dark_blue_ks", 104, "float"),
+    ("w_slender_blue_ks", 105, "float"),
+    ("w_dark_blue_long", 106, "float"),
+    ("mcarlo_slender_dark_blue_yil", 107, "float"),
+    ("w_slim_blue", 108, "float"),
+    ("w_blue_ks", 109, "float"),
+    ("w_slender_blue_long", 110, "float"),
+    ("camel_slender_blue_yil", 111, "float"),
+    ("mcarlo_dark_blue_ks", 112, "float"),
+    ("mcarlo_dark_blue_long_yil", 113, "float"),
+    ("w_slender_q_line_2025", 114, "float"),
+    ("w_slender_q_line_2026", 115, "float"),
+    ("frekans_ort", 116, "float"),
+]
+
+
+# 2-21 satırlar (DST verileri, TOPLAM hariç); SKU Satışları (34-71)
+DATA_DST_SCHEMA = SheetSchema('DATA', start_row=1, stop_row=21, fields=[
+    *DATA_ORTAK_FIELDS,
+    *DATA_LOYALTY_FIELDS,
+    *sku_fields(34, SKU_FIELDS[:-1]),
+    *DATA_HEDEF_FIELDS,
+])
+
+# TEAM-II satır 11, TEAM-I satır 21
+DATA_TEAM_SCHEMA = SheetSchema('DATA', start_row=10, stop_row=21, header_row=None, fields=[
+    *DATA_ORTAK_FIELDS,
+    *DATA_HEDEF_FIELDS,
+])
+
+# Row 22 - distribütör toplamları
+DATA_TOTALS_SCHEMA = SheetSchema('DATA', start_row=21, stop_row=22, header_row=None, fields=[
+    # B22-AH22 (columns 1-33)
+    *DATA_ORTAK_FIELDS,
+    *DATA_LOYALTY_FIELDS,
+    # BV22-CZ22 (columns 73-103)
+    ("camel_hedef", 73, "float"),
+    ("winston_hedef", 74, "float"),
+    ("mcarlo_hedef", 75, "float"),
+    ("myo_camel_hedef", 76, "float"),
+    ("ld_hedef", 77, "float"),
+    ("toplam_hedef", 78, "float"),
+    ("kasa_hedef", 79, "float"),
+    ("hedef_das", 80, "float"),
+    ("camel_satis", 81, "float"),
+    ("winston_satis", 82, "float"),
+    ("mcarlo_satis", 83, "float"),
+    ("myo_camel_satis", 84, "float"),
+    ("ld_satis", 85, "float"),
+    ("toplam_satis", 86, "float"),
+    ("kasa_satis", 87, "float"),
+    ("gerc_das", 88, "float"),
+    *[field for field in DATA_HEDEF_FIELDS if 89 <= field[1] <= 103],
+    # DL22-DS22 (columns 115-116)
+    ("qline_2026_satis", 115, "float"),
+    ("frekans_ort", 116, "float"),
+    # DT22 - Q Line Hedef (column 123)
+    ("qline_hedef", 123, "float"),
+])
+
+# Rows 24-27 TTE bilgisi
+DATA_TTE_SCHEMA = SheetSchema('DATA', start_row=23, stop_row=27, header_row=None, fields=[
+    ("bayi_sayisi", 1, "float"),
+    ("aktif_bayi_sayisi", 2, "float"),
+    ("pasif_bayi_sayisi", 3, "float"),
+])
+
+# Rows 29-32 TTE stand bilgisi
+DATA_TTE_STAND_SCHEMA = SheetSchema('DATA', start_row=28, stop_row=32, header_row=None, fields=[
+    ("jti", 1, "float"),
+    ("jti_stand", 2, "float"),
+    ("pmi", 3, "float"),
+    ("pmi_stand", 4, "float"),
+    ("bat", 5, "float"),
+    ("bat_stand", 6, "float"),
+    # Bayi sınıfları (H-N sütunları, index 7-13)
+    ("sinif_a", 7, "float"),
+    ("sinif_a_plus", 8, "float"),
+    ("sinif_b", 9, "float"),
+    ("sinif_c", 10, "float"),
+    ("sinif_d", 11, "float"),
+    ("sinif_e", 12, "float"),
+    ("sinif_e_minus", 13, "float"),
+])
+
+EKIP_RAPORU_SCHEMA = SheetSchema("Günlük Ekip Raporu Verileri.", [
+    ("ay", 0, "str?"),
+    ("tarih", 1, "raw"),
+    *sku_fields(2),
+])
+
+STIL_AY_SATIS_SCHEMA = SheetSchema("STİL AY SATIŞ", [
+    ("ay", 0, "str?"),
+    *sku_fields(1),
+])
+
+PERSONEL_DATA_SCHEMA = SheetSchema("PERSONEL DATA", start_row=2, header_row=1, fields=[
+    ("sira_no", 0, "float"),
+    ("bolge", 1, "str?"),
+    ("distributor", 2, "str?"),
+    ("adi", 3, "str?"),
+    ("pozisyonu", 4, "str?"),
+    ("cep_telefonu", 5, "str?"),
+    ("yakini", 6, "str?"),
+    ("yakini_telefon", 7, "str?"),
+    ("kan_grubu", 8, "str?"),
+    ("src", 9, "str?"),
+    ("src_verilis", 10, "raw"),
+    ("psikoteknik_verilis", 11, "raw"),
+    ("psikoteknik_gecerlilik", 12, "raw"),
+    ("mezuniyet", 13, "str?"),
+    ("bolum", 14, "str?"),
+    ("arac_plaka", 15, "str?"),
+])
+
+RUT_SCHEMA = SheetSchema("RUT", [
+    ("dist_kod", 0, "str"),
+    ("dist_unvan", 1, "str"),
+    ("rut_kod", 2, "str"),
+    ("rut_aciklama", 3, "str"),
+    ("ziyaret_sira", 4, "int"),
+    ("musteri_kod", 5, "str"),
+    ("musteri_unvan", 6, "str"),
+    ("musteri_durum", 7, "str"),
+    ("musteri_grup_kod", 8, "str"),
+    ("musteri_grup", 9, "str"),
+    ("musteri_ek_grup", 10, "str"),
+    ("adres", 11, "str"),
+])
+
+BAYI_HEDEF_SCHEMA = SheetSchema('Bayi Hedef', [
+    ("bayi_adi", 2, "str"),
+    ("dst", 3, "str"),
+    ("sinif", 4, "str"),
+    ("camel_hedef", 6, "float"),
+    ("winston_hedef", 7, "float"),
+    ("mcarlo_hedef", 8, "float"),
+    ("myo_camel_hedef", 9, "float"),
+    ("ld_hedef", 10, "float"),
+    ("ay_toplam_hedef", 11, "float"),
+    ("camel_satis", 15, "float"),
+    ("winston_satis", 16, "float"),
+    ("mcarlo_satis", 17, "float"),
+    ("myo_camel_satis", 18, "float"),
+    ("ld_satis", 19, "float"),
+    ("ay_toplam_satis", 20, "float"),
+])
+
+FATURA_EKI_SCHEMA = SheetSchema('FATURA EKİ', start_row=4, header_row=3, fields=[
+    ("bayi_adi", 5, "str"),  # F column
+    ("durum", 6, "str"),
+    ("dsm", 7, "str"),
+    ("tte", 8, "str"),
+    ("dst", 9, "str"),
+    ("kanal", 10, "str"),
+    ("kod", 11, "str"),
+    ("sinif", 12, "str"),
+    ("stand_tipi", 13, "str"),
+    ("sozlesme_no", 15, "str"),
+    ("odeme_tutari", 16, "float"),
+    ("sozlesme_tutari", 17, "float"),
+])
+
+
+def parse_tarih_sort(value) -> int:
+    """DD/MM/YYYY (ya da Excel seri numarası) -> sıralama anahtarı"""
+    if not value:
+        return 0
+    try:
+        if isinstance(value, (int, float)):
+            return int(value)
+        parts = str(value).replace('.', '/').replace('-', '/').split('/')
+        if len(parts) == 3:
+            return int(parts[2]) * 10000 + int(parts[1]) * 100 + int(parts[0])
+    except:
+        pass
+    return 0
+
+
+def parse_bayi_list(wb):
+    """AÜ BAYİ LİST -> bayiler"""
+    logger.info("Processing AÜ BAYİ LİST...")
+    bayiler_data = []
+    extract = BAYI_LIST_SCHEMA.extract
+
+    for row in BAYI_LIST_SCHEMA.rows(wb):
+        if len(row) > 0 and row[0].v:
+            bayi_kodu = canonical_bayi_kodu(row[0].v)
+            bayi_unvani = safe_str(row[1].v) if len(row) > 1 else ""
+
+            bayi = {
+                "bayi_kodu": bayi_kodu,
+                "bayi_kodu_ascii": turkish_to_ascii(bayi_kodu),
+                "bayi_unvani": bayi_unvani,
+                "bayi_unvani_ascii": turkish_to_ascii(bayi_unvani) if bayi_unvani else "",
+                **extract(row),
             }
-            
-            await db.distributor_totals.insert_one(totals)
-            logger.info("Inserted distributor totals")
-            
-            # Process Günlük Ekip Raporu Verileri
-            logger.info("Processing Günlük Ekip Raporu Verileri...")
-            await db.ekip_raporu.delete_many({})
-            
-            sku_fields = [
-                "skt_camel_yellow_100", "camel_brown", "camel_black", "camel_white",
-                "camel_yellow_sp", "camel_yellow", "camel_deep_blue_long", "camel_deep_blue",
-                "camel_yellow_long", "camel_slender_blue", "dp_camel_slender_blueline",
-                "camel_slender_gray", "dp_camel_slender_grayline", "winston_red_long",
-                "winston_red", "winston_blue_long", "winston_blue", "winston_gray",
-                "winston_slims_blue", "winston_slims_gray", "winston_slims_q_line",
-                "winston_xsence_black", "winston_xsence_gray", "winston_dark_blue_long",
-                "winston_dark_blue", "winston_deep_blue", "winston_slender_blue_long",
-                "winston_slender_blue", "winston_slender_gray", "winston_slender_dark_blue",
-                "winston_slender_q_line", "monte_carlo_red", "monte_carlo_dark_blue_long",
-                "monte_carlo_dark_blue", "monte_carlo_slender_dark_blue", "ld_slims",
-                "ld_blue_long", "ld_blue", "toplam"
-            ]
-            
-            with wb.get_sheet("Günlük Ekip Raporu Verileri.") as sheet:
-                ekip_rows = list(sheet.rows())
-                ekip_data = []
-                yil_toplam_karton = None
-                yil_toplam_kasa = None
-                
-                for row in ekip_rows[1:]:
-                    cells = [c.v for c in row]
-                    if len(cells) > 1:
-                        ay = safe_str(cells[0])
-                        tarih_raw = cells[1]
-                        
-                        # Skip summary rows
-                        if isinstance(tarih_raw, str):
-                            if "TOPLAM" in tarih_raw.upper():
-                                if "YIL TOPLAM KARTON" in tarih_raw.upper():
-                                    yil_toplam_karton = {f: safe_float(cells[i+2]) for i, f in enumerate(sku_fields) if i+2 < len(cells)}
-                                elif "YIL TOPLAM KASA" in tarih_raw.upper():
-                                    yil_toplam_kasa = {f: safe_float(cells[i+2]) for i, f in enumerate(sku_fields) if i+2 < len(cells)}
-                            continue
-                        
-                        if tarih_raw:
-                            record = {
-                                "ay": ay,
-                                "tarih": tarih_raw,
-                            }
-                            for i, field in enumerate(sku_fields):
-                                record[field] = safe_float(cells[i+2]) if i+2 < len(cells) else 0
-                            ekip_data.append(record)
-                
-                if ekip_data:
-                    await db.ekip_raporu.insert_many(ekip_data)
-                    logger.info(f"Inserted {len(ekip_data)} ekip raporu records")
-                
-                # Save yearly totals
-                if yil_toplam_karton or yil_toplam_kasa:
-                    await db.ekip_raporu_toplam.delete_many({})
-                    toplam_doc = {
-                        "yil_toplam_karton": yil_toplam_karton or {},
-                        "yil_toplam_kasa": yil_toplam_kasa or {}
-                    }
-                    await db.ekip_raporu_toplam.insert_one(toplam_doc)
-            
-            # Process STİL AY SATIŞ
-            logger.info("Processing STİL AY SATIŞ...")
-            await db.stil_ay_satis.delete_many({})
-            
-            with wb.get_sheet("STİL AY SATIŞ") as sheet:
-                stil_rows = list(sheet.rows())
-                stil_data = []
-                
-                for row in stil_rows[1:]:
-                    cells = [c.v for c in row]
-                    if len(cells) > 0 and cells[0]:
-                        record = {
-                            "ay": safe_str(cells[0]),
-                        }
-                        for i, field in enumerate(sku_fields):
-                            record[field] = safe_float(cells[i+1]) if i+1 < len(cells) else 0
-                        stil_data.append(record)
-                
-                if stil_data:
-                    await db.stil_ay_satis.insert_many(stil_data)
-                    logger.info(f"Inserted {len(stil_data)} stil ay satis records")
-            
-            # Process PERSONEL DATA
-            logger.info("Processing PERSONEL DATA...")
-            await db.personel_data.delete_many({})
-            
-            with wb.get_sheet("PERSONEL DATA") as sheet:
-                personel_rows = list(sheet.rows())
-                personel_data = []
-                
-                for row in personel_rows[2:]:  # Skip header rows
-                    cells = [c.v for c in row]
-                    if len(cells) > 3 and cells[3]:  # ADI field
-                        record = {
-                            "sira_no": safe_float(cells[0]),
-                            "bolge": safe_str(cells[1]),
-                            "distributor": safe_str(cells[2]),
-                            "adi": safe_str(cells[3]),
-                            "pozisyonu": safe_str(cells[4]),
-                            "cep_telefonu": safe_str(cells[5]),
-                            "yakini": safe_str(cells[6]),
-                            "yakini_telefon": safe_str(cells[7]),
-                            "kan_grubu": safe_str(cells[8]),
-                            "src": safe_str(cells[9]),
-                            "src_verilis": cells[10],
-                            "psikoteknik_verilis": cells[11],
-                            "psikoteknik_gecerlilik": cells[12],
-                            "mezuniyet": safe_str(cells[13]),
-                            "bolum": safe_str(cells[14]),
-                            "arac_plaka": safe_str(cells[15]) if len(cells) > 15 else None
-                        }
-                        personel_data.append(record)
-                
-                if personel_data:
-                    await db.personel_data.insert_many(personel_data)
-                    logger.info(f"Inserted {len(personel_data)} personel data records")
-    
-    # Process RUT sayfası - Ayrı bir workbook açışı ile
+            bayiler_data.append(bayi)
+
+    return {"bayiler": bayiler_data}
+
+
+# Fatura, Belge detay ve tahsilat en büyük sayfalardır: satırları liste
+# yerine generator olarak döner, run_sheet_group onları parça parça gönderir
+
+def parse_fatura(wb):
+    """Fatura -> faturalar"""
+    logger.info("Processing Fatura...")
+    return {"faturalar": fatura_rows(wb)}
+
+def fatura_rows(wb):
+    extract = FATURA_SCHEMA.extract
+    for row in FATURA_SCHEMA.rows(wb):
+        if len(row) > 13 and row[0].v:
+            fatura = extract(row)
+            fatura["bayi_kodu"] = canonical_bayi_kodu(row[0].v)
+            fatura["tarih"] = excel_date_to_str(row[3].v)
+            fatura["tarih_sort"] = parse_tarih_sort(row[3].v)
+            yield fatura
+
+
+def parse_belge_detay(wb):
+    """Belge detay -> belge_detay"""
+    logger.info("Processing Belge detay...")
+    return {"belge_detay": belge_detay_rows(wb)}
+
+def belge_detay_rows(wb):
+    extract = BELGE_DETAY_SCHEMA.extract
+    # Satır numarası faturanın kendi satır sırasıdır; satır id'leri içerik
+    # hash'i olduğundan ekrandaki sıra buradan gelir
+    satirlar: Dict[str, int] = {}
+    for row in BELGE_DETAY_SCHEMA.rows(wb):
+        if len(row) > 7 and row[0].v:
+            detay = extract(row)
+            satirlar[detay["matbu_no"]] = detay["satir_no"] = satirlar.get(detay["matbu_no"], 0) + 1
+            yield detay
+
+
+def parse_tahsilat(wb):
+    """tahsilat -> tahsilatlar"""
+    logger.info("Processing tahsilat...")
+    return {"tahsilatlar": tahsilat_rows(wb)}
+
+def tahsilat_rows(wb):
+    extract = TAHSILAT_SCHEMA.extract
+    for row in TAHSILAT_SCHEMA.rows(wb):
+        if len(row) > 8 and row[2].v:
+            tahsilat = extract(row)
+            tahsilat["bayi_kodu"] = canonical_bayi_kodu(row[2].v)
+            # Format: DD/MM/YYYY
+            tahsilat["tarih_sort"] = parse_tarih_sort(tahsilat["islem_tarihi"])
+            yield tahsilat
+
+
+def parse_konya_gun(wb):
+    """KONYA GÜN -> konya_gun ve carili_kanal_toplamlari"""
+    logger.info("Processing KONYA GÜN...")
+    konya_data = []
+
+    carili_kanal_toplamlari = {}
+    for row in KONYA_KANAL_SCHEMA.rows(wb):
+        if len(row) > 10:
+            kanal = KONYA_KANAL_SCHEMA.extract(row)
+            if kanal["kanal_adi"]:
+                carili_kanal_toplamlari[kanal["kanal_adi"].upper().strip()] = kanal["kanal_tutari"]
+
+    extract = KONYA_GUN_SCHEMA.extract
+    for row in KONYA_GUN_SCHEMA.rows(wb):
+        if len(row) > 10 and row[0].v:
+            konya = extract(row)
+            konya["bayi_kodu"] = canonical_bayi_kodu(row[0].v)
+            konya_data.append(konya)
+
+    return {
+        "konya_gun": konya_data,
+        "carili_kanal_toplamlari": [carili_kanal_toplamlari] if carili_kanal_toplamlari else [],
+    }
+
+
+def parse_stand_raporu(wb):
+    """STAND RAPORU -> stand_raporu"""
+    logger.info("Processing STAND RAPORU...")
+    stand_data = []
+    extract = STAND_RAPORU_SCHEMA.extract
+
+    for row in STAND_RAPORU_SCHEMA.rows(wb):
+        if len(row) > 72 and row[5].v:
+            stand = extract(row)
+            stand["bayi_kodu"] = canonical_bayi_kodu(row[5].v)
+            # Ziyaret günleri - sütun 66-72
+            stand["ziyaret_gunleri"] = [gun for i, gun in enumerate(GUN_ISIMLERI) if row[66 + i].v == 1.0]
+            stand_data.append(stand)
+
+    return {"stand_raporu": stand_data}
+
+
+def parse_data(wb):
+    """DATA -> dst_data, dsm_teams, tte_data, distributor_totals"""
+    logger.info("Processing DATA...")
+    # Özet sayfası; yalnızca ilk 32 satır okunur
+    rows = list(iter_sheet_cells(wb, 'DATA', stop=32))
+    empty_row = []
+
+    def row_at(idx):
+        return rows[idx] if idx < len(rows) else empty_row
+
+    dst_data_list = []
+    for row in rows[DATA_DST_SCHEMA.start_row:DATA_DST_SCHEMA.stop_row]:
+        first = row[0].v if len(row) > 0 else None
+        if first and first not in ['TOPLAM', 'TEAM-I', 'TEAM-II']:
+            dst = safe_str(first)
+            if dst:
+                dst_data_list.append({"dst": dst, **DATA_DST_SCHEMA.extract(row)})
+
+    # Process DSM Teams (TEAM-I row 21, TEAM-II row 11)
+    logger.info("Processing DSM Teams...")
+
+    def create_team_data(row, team_name, dsm_name, dst_list):
+        return {
+            "team_name": team_name,
+            "dsm_name": dsm_name,
+            "dst_list": dst_list,
+            **DATA_TEAM_SCHEMA.extract(row),
+        }
+
+    team2_data = create_team_data(
+        row_at(10),
+        "TEAM-II",
+        "MURAT YÖRÜKOĞLU",
+        ["KEMAL BANİ", "COŞKUN ÇİMEN", "MUSTAFA KAĞAN KAYA", "MUSTAFA HARMANCI", 
+         "KAZIM KARABEKİR ÖRAN", "TUNAHAN IŞILAK", "MEVLÜT ŞEKER", "TAHİR UÇAR", "YASİN TUĞRA DAĞLI"]
+    )
+
+    team1_data = create_team_data(
+        row_at(20),
+        "TEAM-I",
+        "OSMAN DİNÇOL",
+        ["HÜSEYİN AYHAN AKMAN", "MUSTAFA USLU", "HASAN ALİ AKDAĞ", "AHMET GÖKMEN",
+         "LÜTFİ UYSAL", "ŞERAFETTİN BÜYÜKTAŞDELEN", "BURAK KÜÇÜKŞANTÜRK", "YASİN AVCI", "MUSTAFA İBİŞ"]
+    )
+
+    # Process TTE Data (rows 24-27 for TTE info, rows 29-32 for stand info)
+    logger.info("Processing TTE Data...")
+    tte_data_list = []
+
+    for idx in range(DATA_TTE_SCHEMA.start_row, DATA_TTE_SCHEMA.stop_row):
+        row = row_at(idx)
+        if row and row[0].v:
+            tte_data_list.append({"tte_name": safe_str(row[0].v), **DATA_TTE_SCHEMA.extract(row)})
+
+    for i, tte_data in enumerate(tte_data_list):
+        stand_row_idx = DATA_TTE_STAND_SCHEMA.start_row + i
+        if stand_row_idx < len(rows):
+            tte_data.update(DATA_TTE_STAND_SCHEMA.extract(rows[stand_row_idx]))
+
+    # Process Distributor Totals from Row 22
+    logger.info("Processing Distributor Totals...")
+
+    row22 = row_at(DATA_TOTALS_SCHEMA.start_row)
+    logger.info(f"Row 22 has {len(row22)} columns")
+    logger.info(f"BY22 (index 76) value: {row22[76].v if len(row22) > 76 else 'N/A'}")
+    logger.info(f"DT22 (index 123) value: {row22[123].v if len(row22) > 123 else 'N/A'}")
+
+    totals = {"type": "totals", **DATA_TOTALS_SCHEMA.extract(row22)}
+
+    return {
+        "dst_data": dst_data_list,
+        "dsm_teams": [team1_data, team2_data],
+        "tte_data": tte_data_list,
+        "distributor_totals": [totals],
+    }
+
+
+def parse_ekip_raporu(wb):
+    """Günlük Ekip Raporu Verileri. -> ekip_raporu ve ekip_raporu_toplam"""
+    logger.info("Processing Günlük Ekip Raporu Verileri...")
+
+    ekip_data = []
+    yil_toplam_karton = None
+    yil_toplam_kasa = None
+    extract = EKIP_RAPORU_SCHEMA.extract
+
+    for row in EKIP_RAPORU_SCHEMA.rows(wb):
+        if len(row) > 1:
+            record = extract(row)
+            tarih_raw = record["tarih"]
+
+            # Skip summary rows
+            if isinstance(tarih_raw, str):
+                if "TOPLAM" in tarih_raw.upper():
+                    sku_totals = {f: record[f] for f in SKU_FIELDS}
+                    if "YIL TOPLAM KARTON" in tarih_raw.upper():
+                        yil_toplam_karton = sku_totals
+                    elif "YIL TOPLAM KASA" in tarih_raw.upper():
+                        yil_toplam_kasa = sku_totals
+                continue
+
+            if tarih_raw:
+                ekip_data.append(record)
+
+    # Save yearly totals
+    toplam_data = []
+    if yil_toplam_karton or yil_toplam_kasa:
+        toplam_data.append({
+            "yil_toplam_karton": yil_toplam_karton or {},
+            "yil_toplam_kasa": yil_toplam_kasa or {}
+        })
+
+    return {"ekip_raporu": ekip_data, "ekip_raporu_toplam": toplam_data}
+
+
+def parse_stil_ay_satis(wb):
+    """STİL AY SATIŞ -> stil_ay_satis"""
+    logger.info("Processing STİL AY SATIŞ...")
+    extract = STIL_AY_SATIS_SCHEMA.extract
+    stil_data = [extract(row) for row in STIL_AY_SATIS_SCHEMA.rows(wb) if len(row) > 0 and row[0].v]
+    return {"stil_ay_satis": stil_data}
+
+
+def parse_personel_data(wb):
+    """PERSONEL DATA -> personel_data"""
+    logger.info("Processing PERSONEL DATA...")
+    extract = PERSONEL_DATA_SCHEMA.extract
+    # ADI field required
+    personel_data = [extract(row) for row in PERSONEL_DATA_SCHEMA.rows(wb) if len(row) > 3 and row[3].v]
+    return {"personel_data": personel_data}
+
+
+def parse_rut(wb):
+    """RUT -> rut_data"""
     logger.info("Processing RUT...")
-    await db.rut_data.delete_many({})
-    
+    rut_data = []
+    extract = RUT_SCHEMA.extract
+    # Önce uzun günlerden başla (Pazartesi -> Pazar'dan önce kontrol edilmeli)
+    gunler = ["Pazartesi", "Cumartesi", "Perşembe", "Çarşamba", "Salı", "Cuma", "Pazar"]
+
+    for row in RUT_SCHEMA.rows(wb):
+        if len(row) > 6 and row[5].v:  # MusteriKod required
+            record = extract(row)
+            record["musteri_kod"] = canonical_bayi_kodu(row[5].v)
+            rut_aciklama = record["rut_aciklama"]
+
+            # RutAciklama'dan DST adı ve gün çıkar ("KEMAL BANİ Pazartesi" formatında)
+            dst_name = ""
+            gun = ""
+            if rut_aciklama:
+                for g in gunler:
+                    # Tam kelime olarak ara
+                    if rut_aciklama.endswith(g) or f" {g}" in rut_aciklama:
+                        gun = g
+                        # Son kelime olarak günü çıkar
+                        idx = rut_aciklama.rfind(g)
+                        if idx > 0:
+                            dst_name = rut_aciklama[:idx].strip()
+                        break
+
+            record["dst_name"] = dst_name
+            record["gun"] = gun
+            rut_data.append(record)
+
+    return {"rut_data": rut_data}
+
+
+def parse_bayi_hedef(wb):
+    """Bayi Hedef -> bayi_hedef"""
+    logger.info("Processing Bayi Hedef...")
+    bayi_hedef_data = []
+    extract = BAYI_HEDEF_SCHEMA.extract
+
+    for row in BAYI_HEDEF_SCHEMA.rows(wb):
+        if len(row) > 20 and row[1].v:
+            bayi_hedef = extract(row)
+            bayi_hedef["bayi_kodu"] = canonical_bayi_kodu(row[1].v)
+            bayi_hedef_data.append(bayi_hedef)
+
+    return {"bayi_hedef": bayi_hedef_data}
+
+
+def parse_fatura_eki(wb):
+    """FATURA EKİ -> loyalty_bayiler"""
+    logger.info("Processing FATURA EKİ (Loyalty)...")
+    loyalty_data = []
+    extract = FATURA_EKI_SCHEMA.extract
+
+    for row in FATURA_EKI_SCHEMA.rows(wb):
+        if len(row) > 17 and row[5].v:  # F column - bayi adı
+            kod = row[4].v
+            loyalty = extract(row)
+            loyalty["bayi_kodu"] = canonical_bayi_kodu(kod) if kod else ""
+            loyalty_data.append(loyalty)
+
+    return {"loyalty_bayiler": loyalty_data}
+
+
+# Sheet name -> (parser, required). A failing required sheet aborts the upload
+# before any collection is cleared; optional sheets only log a warning.
+SHEET_PARSERS = {
+    'AÜ BAYİ LİST': (parse_bayi_list, True),
+    'Fatura': (parse_fatura, True),
+    'Belge detay': (parse_belge_detay, True),
+    'tahsilat': (parse_tahsilat, True),
+    'KONYA GÜN': (parse_konya_gun, True),
+    'STAND RAPORU': (parse_stand_raporu, True),
+    'DATA': (parse_data, True),
+    'Günlük Ekip Raporu Verileri.': (parse_ekip_raporu, True),
+    'STİL AY SATIŞ': (parse_stil_ay_satis, True),
+    'PERSONEL DATA': (parse_personel_data, True),
+    'RUT': (parse_rut, False),
+    'Bayi Hedef': (parse_bayi_hedef, False),
+    'FATURA EKİ': (parse_fatura_eki, False),
+}
+
+# Collections rebuilt on every upload. The others (carili_kanal_toplamlari,
+# ekip_raporu_toplam, bayi_hedef, loyalty_bayiler) are only replaced when the
+# workbook actually has rows for them.
+REPLACED_COLLECTIONS = [
+    "bayiler", "faturalar", "belge_detay", "tahsilatlar", "konya_gun",
+    "stand_raporu", "dst_data", "dsm_teams", "tte_data", "distributor_totals",
+    "ekip_raporu", "stil_ay_satis", "personel_data", "rut_data", "bayi_profile",
+    "tte_ozet", "tte_tip_ozet", "dst_sinif_ozet", "ilce_ozet", "dst_dim", "tte_dim", "dsm_dim",
+    "cari_yaslandirma",
+]
+
+# Her grup tek worker görevinde, workbook bir kez açılarak işlenir. En büyük
+# sayfalar (Fatura, Belge detay) kendi gruplarında paralel çalışır.
+SHEET_GROUPS = [
+    ['Fatura'],
+    ['Belge detay'],
+    ['AÜ BAYİ LİST', 'tahsilat', 'KONYA GÜN', 'STAND RAPORU'],
+    ['DATA', 'Günlük Ekip Raporu Verileri.', 'STİL AY SATIŞ', 'PERSONEL DATA',
+     'RUT', 'Bayi Hedef', 'FATURA EKİ'],
+]
+
+# Secondary indexes per collection. They are built after the bulk load instead
+# of being maintained row by row during it.
+COLLECTION_INDEXES = {
+    "bayiler": [[("bayi_kodu", 1), ("satisa_gore_sinif", 1), ("sinif", 1)], "bayi_kodu_ascii", "bayi_unvani_ascii",
+                # Kanal listeleri (bayi_kodu, _id) ile sayfalanır; TTE süzgeçli
+                # istekler (kanal, tte_id, kapsam_durumu) index'ini kullanır
+                [("kanal_kodu", 1), ("bayi_kodu", 1), ("_id", 1)], [("kanal_grubu", 1), ("bayi_kodu", 1), ("_id", 1)],
+                [("panaroma_sinif", 1), ("bayi_kodu", 1), ("_id", 1)],
+                [("kanal_kodu", 1), ("tte_id", 1), ("kapsam_durumu", 1)],
+                [("kanal_grubu", 1), ("tte_id", 1), ("kapsam_durumu", 1)]],
+    "faturalar": [[("bayi_kodu", 1), ("tarih_sort", -1), ("_id", 1)], "matbu_no"],
+    "belge_detay": [[("matbu_no", 1), ("satir_no", 1)]],
+    "tahsilatlar": [[("bayi_kodu", 1), ("tarih_sort", -1), ("_id", 1)]],
+    "konya_gun": ["bayi_kodu",
+                  # Carili kanal listeleri bakiyeye göre azalan sırada sayfalanır
+                  [("kanal_grubu", 1), ("musteri_bakiyesi", -1), ("_id", 1)],
+                  [("kanal_kodu", 1), ("musteri_bakiyesi", -1), ("_id", 1)]],
+    "stand_raporu": [[("bayi_kodu", 1), ("_id", 1)], [("bayi_durumu", 1), ("bayi_unvani", 1), ("_id", 1)],
+                     [("tte_id", 1), ("tip", 1), ("bayi_unvani", 1), ("_id", 1)],
+                     [("dst_id", 1), ("bayi_durumu", 1), ("bayi_unvani", 1), ("_id", 1)],
+                     [("tte_id", 1), ("bayi_durumu", 1), ("bayi_unvani", 1), ("_id", 1)]],
+    "rut_data": ["musteri_kod", [("dst_name_key", 1), ("gun", 1), ("ziyaret_sira", 1)]],
+    "personel_data": ["adi_key"],
+    "bayi_hedef": ["bayi_kodu"],
+    "loyalty_bayiler": [[("bayi_kodu", 1), ("_id", 1)]],
+    "cari_yaslandirma": [
+        [("gun", 1), ("gun_deger", -1), ("_id", 1)],
+        *[[(key, 1), ("gun", 1), ("gun_deger", -1), ("_id", 1)]
+          for key in ("dst_id", "dsm_id", "tte_id", "kanal_grubu", "kanal_kodu")],
+    ],
+    "dst_dim": ["anahtarlar", "dsm_id"],
+    "tte_dim": ["anahtarlar"],
+    "dsm_dim": ["anahtarlar"],
+}
+
+# Bayi kodu alanları; parser'lar bunları canonical_bayi_kodu ile yazar, istekler
+# de parametreyi aynı fonksiyondan geçirip tek bir index'li sorgu yapar.
+BAYI_KODU_FIELDS = {
+    "bayiler": "bayi_kodu",
+    "faturalar": "bayi_kodu",
+    "tahsilatlar": "bayi_kodu",
+    "konya_gun": "bayi_kodu",
+    "stand_raporu": "bayi_kodu",
+    "bayi_hedef": "bayi_kodu",
+    "loyalty_bayiler": "bayi_kodu",
+    "rut_data": "musteri_kod",
+}
+
+# Türkçe karakterden bağımsız eşleşme için ingest sırasında saklanan anahtar
+# alanlar: {koleksiyon: {anahtar alan: kaynak alan}}. Değer turkish_to_ascii
+# ile üretilir; endpoint'ler parametreyi aynı şekilde çevirip index'li eşitlik
+# sorgusu yapar.
+NORMALIZED_KEYS = {
+    "rut_data": {"dst_name_key": "dst_name"},
+    "personel_data": {"adi_key": "adi"},
+}
+
+# Satış kanalları: tip alanının ilk iki hanesi kanal kodu, kanal grubu
+# koleksiyonun tablosundan. Ingest bayiler ve konya_gun satırlarına
+# kanal_kodu/kanal_grubu yazar; kanal endpoint'leri bu alanlarda index'li
+# eşitlik sorgusu yapar.
+KANAL_KODLARI = {
+    "01": "piyasa", "02": "piyasa", "03": "piyasa", "04": "piyasa", "05": "piyasa",
+    "07": "benzinlik",
+    "08": "askeriye",
+    "11": "cezaevi",
+    "12": "yerel-zincir",
+    "14": "geleneksel", "15": "geleneksel",
+}
+# KONYA GÜN sayfası ayrı bir tip kodlaması kullanır: 01 PİY/BAK/MAR/BÜF,
+# 02 YER, 03 ASK ve 03 CEZ, 04 BEN, 05 GEL
+KONYA_GUN_KANAL_KODLARI = {
+    "01": "piyasa",
+    "02": "yerel-zincir",
+    "03": "askeriye",
+    "04": "benzinlik",
+    "05": "geleneksel",
+}
+# Ekrandaki "Askeriye + Cezaevi" kartı iki grubu birlikte listeler
+KANAL_GRUP_KAPSAMI = {"askeriye": ["askeriye", "cezaevi"]}
+KANAL_GRUPLARI = {*KANAL_KODLARI.values(), *KONYA_GUN_KANAL_KODLARI.values()}
+KANAL_COLLECTIONS = {"bayiler": KANAL_KODLARI, "konya_gun": KONYA_GUN_KANAL_KODLARI}
+
+def kanal_kodu(tip) -> Optional[str]:
+    kod = str(tip or "").strip()[:2].upper()
+    return kod or None
+
+def add_kanal_kodlari(collection: str, docs: List[dict]):
+    kodlar = KANAL_COLLECTIONS[collection]
+    for doc in docs:
+        doc["kanal_kodu"] = kanal_kodu(doc.get("tip"))
+        doc["kanal_grubu"] = kodlar.get(doc["kanal_kodu"])
+
+def kanal_filtresi(kanal: str) -> Optional[dict]:
+    """Query for a channel group name or a tip code; None if kanal is neither"""
+    kanal = kanal.lower()
+    if kanal in KANAL_GRUP_KAPSAMI or kanal in KANAL_GRUPLARI:
+        return {"kanal_grubu": {"$in": KANAL_GRUP_KAPSAMI.get(kanal, [kanal])}}
+    kod = kanal_kodu(kanal)
+    if not kod:
+        return None
+    query = {"kanal_kodu": kod}
+    if len(kanal) > 2:
+        # "01 BAK" gibi uzun kodlarda kalan kısım tip üzerinde
+        query["tip"] = {"$regex": f"^{re.escape(kanal)}", "$options": "i"}
+    return query
+
+# Yüklemeler koleksiyonun yayında olmayan kopyasına ({ad} ya da {ad}__alt)
+# yazılır; yayın system_info'daki haritayı çevirir (bkz. GenerationDatabase).
+# Diğer kopya bir önceki nesildir ve geri alma için saklanır.
+ALTERNATE_SUFFIX = "__alt"
+# Eski sürümlerin kopyaları; migrate_generation_copies taşır ya da siler
+LEGACY_SUFFIXES = ("__staging", "__swap")
+LEGACY_PREVIOUS_SUFFIX = "__prev"
+
+# Delta yükleme: bu koleksiyonlarda her satırın _id'si içeriğinin hash'idir;
+# birebir aynı satırlar sayaçla ayrılır. Değişen satırlar yalnızca _id
+# kümeleri karşılaştırılarak bulunur, araya eklenen bir satır diğerlerinin
+# id'sini değiştirmez.
+DELTA_COLLECTIONS = ("bayiler", "faturalar", "belge_detay", "tahsilatlar", "konya_gun", "stand_raporu",
+                     "rut_data", "bayi_hedef", "loyalty_bayiler")
+# İlk parçada kopyada olmayan satırların oranı bunu aşarsa kopya boşaltılıp
+# tam yüklenir; çok satır değiştiğinde bu daha ucuzdur
+DELTA_MAX_RATIO = float(os.environ.get('DELTA_MAX_RATIO', '0.3'))
+
+INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', '4'))
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', '5000'))
+# İşçilerden ana sürece giden kuyrukta bekleyebilecek en fazla parça sayısı;
+# ana sürecin bellekte tuttuğu akan satırlar bununla sınırlıdır
+INGEST_QUEUE_CHUNKS = int(os.environ.get('INGEST_QUEUE_CHUNKS', '8'))
+_ingest_pool: Optional[ProcessPoolExecutor] = None
+_ingest_queue = None
+# İşçi süreçlerinde init_ingest_worker'ın verdiği kuyruk
+_chunk_queue = None
+
+def init_ingest_worker(queue):
+    global _chunk_queue
+    _chunk_queue = queue
+
+def get_ingest_pool() -> ProcessPoolExecutor:
+    """Worker pool for sheet parsing, with the queue its workers send parsed chunks on.
+
+    Sunucu sürecinde Motor thread'leri ve açık soketler var; fork bunları
+    kilitli halde kopyalayabilir. forkserver işçileri temiz bir süreçten açar.
+    Kuyruk multiprocessing kuralı gereği işçilere başlarken verilir.
+    """
+    global _ingest_pool, _ingest_queue
+    if _ingest_pool is None:
+        context = multiprocessing.get_context("forkserver")
+        _ingest_queue = context.Queue(INGEST_QUEUE_CHUNKS)
+        _ingest_pool = ProcessPoolExecutor(
+            max_workers=INGEST_WORKERS, mp_context=context,
+            initializer=init_ingest_worker, initargs=(_ingest_queue,))
+    return _ingest_pool
+
+def add_normalized_keys(name: str, docs: List[dict]):
+    for key_field, source in NORMALIZED_KEYS[name].items():
+        for doc in docs:
+            doc[key_field] = turkish_to_ascii(doc.get(source) or "")
+
+def stamp_row_ids(docs: List[dict], seen: Optional[Dict[str, int]] = None):
+    """Set each row's _id to a hash of its content, counting up among identical rows.
+
+    seen carries the counts across the chunks of one collection.
+    """
+    seen = {} if seen is None else seen
+    for doc in docs:
+        digest = hashlib.blake2b(
+            json.dumps(doc, sort_keys=True, default=str).encode(), digest_size=12
+        ).hexdigest()
+        copies = seen.get(digest, 0)
+        seen[digest] = copies + 1
+        doc["_id"] = f"{digest}|{copies}" if copies else digest
+
+def has_row_id(seen: Dict[str, int], row_id) -> bool:
+    """Whether stamp_row_ids gave out row_id with these counts"""
+    if not isinstance(row_id, str):
+        return False
+    digest, _, copy = row_id.partition("|")
+    return seen.get(digest, 0) > (int(copy) if copy.isdigit() else 0)
+
+def hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def chunked(rows, size: int):
+    """Lists of up to size items from any iterable"""
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, size)):
+        yield chunk
+
+def run_sheet_group(file_path: str, sheet_names: List[str], run_id: Optional[str] = None):
+    """Worker process entry point: open the workbook once and parse a group of sheets.
+
+    run_id verilirse türetilmiş koleksiyonların girdisi olmayan koleksiyonlar
+    (bkz. DERIVED_INPUTS) INGEST_BATCH_SIZE'lık parçalar halinde kuyruğa yazılır
+    ve döndürülmez; streamed bunların satır sayılarını tutar. Kuyruğa son
+    olarak grubun bitiş işareti (run_id, None, None) yazılır.
+    """
+    parsed = {}
+    streamed = {}
+    warnings = []
+    timings = {}
     try:
-        with pyxlsb.open_workbook(file_path) as wb_rut:
-            with wb_rut.get_sheet("RUT") as sheet:
-                rut_rows = list(sheet.rows())
-                rut_data = []
-                
-                for row in rut_rows[1:]:  # Skip header
-                    cells = [c.v for c in row]
-                    if len(cells) > 6 and cells[5]:  # MusteriKod required
-                        rut_aciklama = safe_str(cells[3]) if len(cells) > 3 else ""
-                        
-                        # RutAciklama'dan DST adı ve gün çıkar
-                        dst_name = ""
-                        gun = ""
-                        if rut_aciklama:
-                            # "KEMAL BANİ Pazartesi" formatında
-                            # Önce uzun günlerden başla (Pazartesi -> Pazar'dan önce kontrol edilmeli)
-                            gunler = ["Pazartesi", "Cumartesi", "Perşembe", "Çarşamba", "Salı", "Cuma", "Pazar"]
-                            for g in gunler:
-                                # Tam kelime olarak ara
-                                if rut_aciklama.endswith(g) or f" {g}" in rut_aciklama:
-                                    gun = g
-                                    # Son kelime olarak günü çıkar
-                                    idx = rut_aciklama.rfind(g)
-                                    if idx > 0:
-                                        dst_name = rut_aciklama[:idx].strip()
-                                    break
-                        
-                        record = {
-                            "dist_kod": safe_str(cells[0]) if len(cells) > 0 else "",
-                            "dist_unvan": safe_str(cells[1]) if len(cells) > 1 else "",
-                            "rut_kod": safe_str(cells[2]) if len(cells) > 2 else "",
-                            "rut_aciklama": rut_aciklama,
-                            "dst_name": dst_name,
-                            "gun": gun,
-                            "ziyaret_sira": int(safe_float(cells[4])) if len(cells) > 4 else 0,
-                            "musteri_kod": safe_str(cells[5]) if len(cells) > 5 else "",
-                            "musteri_unvan": safe_str(cells[6]) if len(cells) > 6 else "",
-                            "musteri_durum": safe_str(cells[7]) if len(cells) > 7 else "",
-                            "musteri_grup_kod": safe_str(cells[8]) if len(cells) > 8 else "",
-                            "musteri_grup": safe_str(cells[9]) if len(cells) > 9 else "",
-                            "musteri_ek_grup": safe_str(cells[10]) if len(cells) > 10 else "",
-                            "adres": safe_str(cells[11]) if len(cells) > 11 else "",
-                        }
-                        rut_data.append(record)
-                
-                if rut_data:
-                    await db.rut_data.insert_many(rut_data)
-                    logger.info(f"Inserted {len(rut_data)} rut records")
-    except Exception as e:
-        logger.warning(f"Could not process RUT sheet: {e}")
+        with pyxlsb.open_workbook(file_path) as wb:
+            for name in sheet_names:
+                parser, required = SHEET_PARSERS[name]
+                start = time.perf_counter()
+                rows = 0
+                transform_seconds = send_seconds = 0.0
+                try:
+                    for collection, docs in parser(wb).items():
+                        stream = run_id is not None and collection not in DERIVED_INPUTS
+                        count = 0
+                        for chunk in chunked(docs, INGEST_BATCH_SIZE):
+                            transform_start = time.perf_counter()
+                            if collection in NORMALIZED_KEYS:
+                                add_normalized_keys(collection, chunk)
+                            if collection in KANAL_COLLECTIONS:
+                                add_kanal_kodlari(collection, chunk)
+                            transform_seconds += time.perf_counter() - transform_start
+                            if stream:
+                                send_start = time.perf_counter()
+                                _chunk_queue.put((run_id, collection, chunk))
+                                send_seconds += time.perf_counter() - send_start
+                            else:
+                                parsed.setdefault(collection, []).extend(chunk)
+                            count += len(chunk)
+                        if stream:
+                            streamed[collection] = count
+                        rows += count
+                except Exception as e:
+                    if required:
+                        raise
+                    warnings.append(f"Could not process {name} sheet: {e}")
+                timings[name] = {
+                    "seconds": round(time.perf_counter() - start - transform_seconds - send_seconds, 3),
+                    "transform_seconds": round(transform_seconds, 3),
+                    # Ana sürecin parçaları yazmasını beklerken geçen süre
+                    "send_seconds": round(send_seconds, 3),
+                    "rows": rows,
+                }
+    finally:
+        if run_id is not None:
+            _chunk_queue.put((run_id, None, None))
+    # ru_maxrss Linux'ta KB cinsinden
+    peak_rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    for timing in timings.values():
+        timing["worker_peak_rss_mb"] = peak_rss_mb
+    return parsed, streamed, warnings, timings
+
+async def write_streamed_chunks(queue, run_id: str, groups: int, writers: Dict[str, "CopyWriter"],
+                                physical: Dict[str, str], job_id: Optional[str], stop: asyncio.Event):
+    """Write the chunks the sheet workers send into the inactive copies, until every group has finished.
+
+    Bir yazma hatasından ya da stop'tan sonra da kuyruk boşaltılmaya devam
+    eder, yoksa dolu kuyrukta bekleyen işçiler hiç bitmez; hata sonda
+    fırlatılır. Başka bir ayrıştırmadan kalan parçalar run_id ile ayıklanır.
+    """
+    error = None
+    while groups:
+        item_run_id, collection, rows = await asyncio.to_thread(queue.get)
+        if item_run_id != run_id:
+            continue
+        if collection is None:
+            if rows == "abort":
+                break
+            groups -= 1
+            continue
+        if error is not None or stop.is_set():
+            continue
+        try:
+            if collection not in writers:
+                writers[collection] = CopyWriter(collection, inactive_copy(physical, collection), job_id)
+            await writers[collection].write(rows)
+        except Exception as e:
+            error = e
+    if error is not None:
+        raise error
+
+async def parse_workbook(file_path: str, job_id: Optional[str] = None, physical: Optional[Dict[str, str]] = None):
+    """Parse all sheet groups in parallel without blocking the event loop.
+
+    Returns the collections the derived builds need, as lists, and a
+    CopyWriter per streamed collection, whose rows are already in its
+    inactive copy. A streamed collection whose optional sheet failed is left out.
+    """
+    global _ingest_pool
+    loop = asyncio.get_running_loop()
+    pool = get_ingest_pool()
+    queue = _ingest_queue
+    pending = [name for group in SHEET_GROUPS for name in group]
+    await update_ingest_job(job_id, stage="parsing", current_sheets=pending)
     
-    # Process Bayi Hedef sheet
+    parsed = {}
+    streamed = {}
+    writers: Dict[str, CopyWriter] = {}
+    sheet_timings = []
+    run_id = uuid.uuid4().hex
+    stop = asyncio.Event()
+    consumer = asyncio.create_task(
+        write_streamed_chunks(queue, run_id, len(SHEET_GROUPS), writers, physical or {}, job_id, stop))
+    futures = [loop.run_in_executor(pool, run_sheet_group, file_path, group, run_id) for group in SHEET_GROUPS]
     try:
-        logger.info("Processing Bayi Hedef...")
-        with pyxlsb.open_workbook(file_path) as wb_hedef:
-            with wb_hedef.get_sheet('Bayi Hedef') as sheet:
-                rows = list(sheet.rows())
-                bayi_hedef_data = []
-                
-                for row in rows[1:]:  # Skip header
-                    cells = [cell.v for cell in row]
-                    if len(cells) > 20 and cells[1]:
-                        bayi_kodu = str(int(cells[1])) if isinstance(cells[1], float) else str(cells[1])
-                        bayi_hedef = {
-                            "bayi_kodu": bayi_kodu,
-                        "bayi_adi": safe_str(cells[2]) if len(cells) > 2 else "",
-                        "dst": safe_str(cells[3]) if len(cells) > 3 else "",
-                        "sinif": safe_str(cells[4]) if len(cells) > 4 else "",
-                        "camel_hedef": safe_float(cells[6]) if len(cells) > 6 else 0,
-                        "winston_hedef": safe_float(cells[7]) if len(cells) > 7 else 0,
-                        "mcarlo_hedef": safe_float(cells[8]) if len(cells) > 8 else 0,
-                        "myo_camel_hedef": safe_float(cells[9]) if len(cells) > 9 else 0,
-                        "ld_hedef": safe_float(cells[10]) if len(cells) > 10 else 0,
-                        "ay_toplam_hedef": safe_float(cells[11]) if len(cells) > 11 else 0,
-                        "camel_satis": safe_float(cells[15]) if len(cells) > 15 else 0,
-                        "winston_satis": safe_float(cells[16]) if len(cells) > 16 else 0,
-                        "mcarlo_satis": safe_float(cells[17]) if len(cells) > 17 else 0,
-                        "myo_camel_satis": safe_float(cells[18]) if len(cells) > 18 else 0,
-                        "ld_satis": safe_float(cells[19]) if len(cells) > 19 else 0,
-                        "ay_toplam_satis": safe_float(cells[20]) if len(cells) > 20 else 0,
-                    }
-                    bayi_hedef_data.append(bayi_hedef)
-            
-            if bayi_hedef_data:
-                await db.bayi_hedef.delete_many({})
-                await db.bayi_hedef.insert_many(bayi_hedef_data)
-                logger.info(f"Inserted {len(bayi_hedef_data)} bayi_hedef records")
-    except Exception as e:
-        logger.warning(f"Could not process Bayi Hedef sheet: {e}")
+        for future in asyncio.as_completed(futures):
+            group_parsed, group_streamed, warnings, timings = await future
+            for warning in warnings:
+                logger.warning(warning)
+            parsed.update(group_parsed)
+            streamed.update(group_streamed)
+            # Sayfa adları nokta içerebildiği için alan adı değil liste olarak saklanır
+            sheet_timings.extend({"sheet": name, **timing} for name, timing in timings.items())
+            pending = [name for name in pending if name not in timings]
+            await update_ingest_job(job_id, current_sheets=pending, sheet_timings=sheet_timings)
+        await consumer
+    except BrokenProcessPool:
+        _ingest_pool = None
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+        if not consumer.done():
+            # Çalışan işçiler kuyruğa yazmayı sürdürür; sonraki ayrıştırmanın
+            # tüketicisi onların parçalarını run_id ile atar
+            stop.set()
+            await asyncio.to_thread(queue.put, (run_id, None, "abort"))
+            await asyncio.gather(consumer, return_exceptions=True)
+    return parsed, {name: writers[name] for name, rows in streamed.items() if rows}
+
+async def create_collection_indexes(name: str, target: Optional[str] = None):
+    """Create name's indexes on its live copy, or on the physical collection target"""
+    collection = db.database[target] if target else db[name]
+    for keys in COLLECTION_INDEXES.get(name, []):
+        await collection.create_index(keys)
+
+def inactive_copy(physical: Dict[str, str], name: str) -> str:
+    """The physical collection of name that the published generation does not use"""
+    return name + ALTERNATE_SUFFIX if physical.get(name, name) == name else name
+
+async def reserve_inactive_copies() -> Dict[str, Any]:
+    """Give up the rollback target so the next generation can be written over it.
+
+    Tek bir find_one_and_update: geri alma previous_physical'ı şartlı okur, bu
+    yüzden bu çağrıdan sonra hiçbir geri alma yazılmakta olan kopyaları yayına
+    alamaz. Dönen belge yazılacak kopyaların hesaplandığı yayındır.
+    """
+    info = await db.system_info.find_one_and_update(
+        {"type": "excel_upload"}, {"$unset": {"previous_physical": ""}}, projection={"_id": 0}
+    ) or {}
+    # Diğer süreçler haritayı en geç CACHE_GENERATION_CHECK saniyede tazeler;
+    # yayından hemen sonra eski haritayla okuyan bir istek kalmış olabilir
+    published_at = utc_datetime(info.get("yayinlanma"))
+    if published_at:
+        wait = CACHE_GENERATION_CHECK - (datetime.now(timezone.utc) - published_at).total_seconds()
+        if wait > 0:
+            await asyncio.sleep(wait)
+    return info
+
+class CopyWriter:
+    """Writes one collection of the next generation into its inactive copy, chunk by chunk.
+
+    Delta koleksiyonlarında kopya bir önceki nesildir. İlk parçanın kopyada
+    bulunan satır oranı yolu seçer: deltada yalnızca kopyada olmayan satırlar
+    eklenir, finish yeni yüklemede olmayanları siler ve index'ler yerinde
+    güncellenir. Tam yüklemede kopya boşaltılır, index'ler sonda kurulur.
+    """
     
-    # Process Fatura Eki (Loyalty bayileri)
-    try:
-        logger.info("Processing FATURA EKİ (Loyalty)...")
-        with pyxlsb.open_workbook(file_path) as wb_loyalty:
-            with wb_loyalty.get_sheet('FATURA EKİ') as sheet:
-                rows = list(sheet.rows())
-                loyalty_data = []
-                
-                for row in rows[4:]:  # Start from row 5 (index 4)
-                    cells = [cell.v for cell in row]
-                    if len(cells) > 17 and cells[5]:  # F column - bayi adı
-                        bayi_kodu = str(int(cells[4])) if isinstance(cells[4], float) else str(cells[4]) if cells[4] else ""
-                        loyalty = {
-                            "bayi_kodu": bayi_kodu,
-                            "bayi_adi": safe_str(cells[5]) if len(cells) > 5 else "",
-                            "durum": safe_str(cells[6]) if len(cells) > 6 else "",
-                            "dsm": safe_str(cells[7]) if len(cells) > 7 else "",
-                            "tte": safe_str(cells[8]) if len(cells) > 8 else "",
-                            "dst": safe_str(cells[9]) if len(cells) > 9 else "",
-                            "kanal": safe_str(cells[10]) if len(cells) > 10 else "",
-                            "kod": safe_str(cells[11]) if len(cells) > 11 else "",
-                            "sinif": safe_str(cells[12]) if len(cells) > 12 else "",
-                            "stand_tipi": safe_str(cells[13]) if len(cells) > 13 else "",
-                            "sozlesme_no": safe_str(cells[15]) if len(cells) > 15 else "",
-                            "odeme_tutari": safe_float(cells[16]) if len(cells) > 16 else 0,
-                            "sozlesme_tutari": safe_float(cells[17]) if len(cells) > 17 else 0,
-                        }
-                        loyalty_data.append(loyalty)
-                
-                if loyalty_data:
-                    await db.loyalty_bayiler.delete_many({})
-                    await db.loyalty_bayiler.insert_many(loyalty_data)
-                    logger.info(f"Inserted {len(loyalty_data)} loyalty_bayiler records")
-    except Exception as e:
-        logger.warning(f"Could not process FATURA EKİ sheet: {e}")
+    def __init__(self, name: str, target: str, job_id: Optional[str] = None):
+        self.name = name
+        self.target = target
+        self.job_id = job_id
+        self.collection = db.database[target]
+        self.mode: Optional[str] = None
+        self.rows = 0
+        self.inserted = 0
+        self.seconds = 0.0
+        # stamp_row_ids sayaçları; deltada silinecek satırlar bunlardan bulunur
+        self.row_ids: Dict[str, int] = {}
+    
+    async def choose_mode(self, docs: List[dict]) -> str:
+        if self.name in DELTA_COLLECTIONS and await self.collection.find_one({}, {"_id": 1}):
+            present = await self.collection.count_documents({"_id": {"$in": [doc["_id"] for doc in docs]}})
+            if len(docs) - present <= DELTA_MAX_RATIO * len(docs):
+                return "delta"
+        await self.collection.drop()
+        return "full"
+    
+    async def write(self, docs: List[dict]):
+        start = time.perf_counter()
+        if self.name in DELTA_COLLECTIONS:
+            # Satır id'lerindeki hash boyut id'leri yazıldıktan sonra hesaplanır;
+            # yalnızca boyut id'si değişen satırlar da delta'ya girer
+            await asyncio.to_thread(stamp_row_ids, docs, self.row_ids)
+        if self.mode is None:
+            self.mode = await self.choose_mode(docs)
+        inserts = docs
+        if self.mode == "delta":
+            existing = {doc["_id"] async for doc in self.collection.find(
+                {"_id": {"$in": [doc["_id"] for doc in docs]}}, {"_id": 1})}
+            inserts = [doc for doc in docs if doc["_id"] not in existing]
+        if inserts:
+            await self.collection.insert_many(inserts, ordered=False)
+        self.rows += len(docs)
+        self.inserted += len(inserts)
+        self.seconds += time.perf_counter() - start
+        await update_ingest_job(self.job_id, inc={"rows_processed": len(docs)})
+    
+    async def write_all(self, docs: List[dict]):
+        for chunk in chunked(docs, INGEST_BATCH_SIZE):
+            await self.write(chunk)
     
-    # Son güncelleme zamanını kaydet
-    from datetime import datetime
-    await db.system_info.delete_many({})
-    await db.system_info.insert_one({
+    async def finish(self) -> Dict[str, Any]:
+        """Delete the rows this upload no longer has, build the indexes and report"""
+        start = time.perf_counter()
+        deleted = 0
+        if self.mode is None:
+            await self.collection.drop()
+            await db.database.create_collection(self.target)
+            self.mode = "full"
+        if self.mode == "delta":
+            stale = []
+            async for doc in self.collection.find({}, {"_id": 1}):
+                if not has_row_id(self.row_ids, doc["_id"]):
+                    stale.append(doc["_id"])
+                if len(stale) >= INGEST_BATCH_SIZE:
+                    await self.collection.delete_many({"_id": {"$in": stale}})
+                    deleted += len(stale)
+                    stale = []
+            if stale:
+                await self.collection.delete_many({"_id": {"$in": stale}})
+                deleted += len(stale)
+        # Delta kopyası COLLECTION_INDEXES'e sonradan eklenen bir index'ten önce
+        # kurulmuş olabilir; var olan index için create_index no-op'tur
+        index_start = time.perf_counter()
+        await create_collection_indexes(self.name, self.target)
+        index_seconds = time.perf_counter() - index_start
+        self.seconds += time.perf_counter() - start
+        rows_per_sec = self.rows / self.seconds if self.seconds > 0 else 0.0
+        logger.info(f"Wrote {self.rows} {self.name} records to {self.target} ({self.mode}: "
+                    f"{self.inserted} inserted, {deleted} deleted) in {self.seconds:.2f}s ({rows_per_sec:.0f} rows/s)")
+        return {
+            "collection": self.name,
+            "mode": self.mode,
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "deleted": deleted,
+            "seconds": round(self.seconds, 3),
+            "index_seconds": round(index_seconds, 3),
+            "rows_per_sec": round(rows_per_sec),
+        }
+
+async def record_generation(new_info: Dict[str, Any]):
+    """Replace the system_info generation document in one write"""
+    await db.system_info.replace_one({"type": "excel_upload"}, dict(new_info), upsert=True)
+    response_cache.set_generation(new_info["generation"], new_info["yayinlanma"])
+    db.physical = new_info.get("physical") or {}
+
+async def publish_generation(targets: Dict[str, str], info: Dict[str, Any], file_hash: str,
+                             job_id: Optional[str] = None) -> Dict[str, Any]:
+    """Point the written collections at their new copies and record the generation.
+
+    targets, reserve_inactive_copies'in döndürdüğü info'daki haritaya göre
+    yazılan kopyalardır; yayın tek bir system_info yazmasıdır. Bu yüklemede
+    olmayan koleksiyonlar bulundukları kopyada kalır.
+    """
+    physical = info.get("physical") or {}
+    new_info = {
         "son_guncelleme": datetime.now().isoformat(),
-        "type": "excel_upload"
-    })
+        "type": "excel_upload",
+        "generation": info.get("generation", 0) + 1,
+        "yayinlanma": datetime.now(timezone.utc).isoformat(),
+        "collections": list(targets),
+        "physical": {**physical, **targets},
+        "previous_physical": physical,
+        "file_hash": file_hash,
+        "onceki_guncelleme": info.get("son_guncelleme"),
+        "onceki_file_hash": info.get("file_hash"),
+        # Yüklemenin ayrıntılı raporu ingest_reports içinde bu id ile tutulur
+        "ingest_job_id": job_id,
+    }
+    await record_generation(new_info)
+    return new_info
+
+async def rollback_generation() -> Optional[Dict[str, Any]]:
+    """Point every collection back at the copies of the previous upload.
+
+    Haritalar yer değiştirir, veri taşınmaz. Tekrar çağrılırsa geri alınan
+    yüklemeye döner. Bir yükleme yazılırken önceki nesil yoktur (bkz.
+    reserve_inactive_copies).
+    """
+    info = await db.system_info.find_one({"type": "excel_upload"}, {"_id": 0})
+    if not info or info.get("previous_physical") is None:
+        return None
+    new_info = {
+        **info,
+        "physical": info["previous_physical"],
+        "previous_physical": info.get("physical") or {},
+        "son_guncelleme": info.get("onceki_guncelleme") or info.get("son_guncelleme"),
+        "onceki_guncelleme": info.get("son_guncelleme"),
+        "file_hash": info.get("onceki_file_hash"),
+        "onceki_file_hash": info.get("file_hash"),
+        "generation": info.get("generation", 0) + 1,
+        # Geri alınan veri daha eski olsa da yanıtlar değişti; Last-Modified ileri gitmeli
+        "yayinlanma": datetime.now(timezone.utc).isoformat(),
+    }
+    # Okuma ile yazma arasında bir yükleme önceki nesli aldıysa hiçbir şey yazılmaz
+    result = await db.system_info.replace_one(
+        {"type": "excel_upload", "generation": info.get("generation", 0),
+         "previous_physical": {"$exists": True}},
+        new_info,
+    )
+    if not result.matched_count:
+        return None
+    response_cache.set_generation(new_info["generation"], new_info["yayinlanma"])
+    db.physical = new_info["physical"]
+    logger.info(f"Rolled back to upload of {new_info['son_guncelleme']}")
+    return new_info
+
+async def migrate_generation_copies():
+    """Move the __prev copies of older versions into the alternate copies, drop staging leftovers.
+
+    Eski sürümde canlı veri {ad}, önceki nesil {ad}__prev idi; __prev, __alt
+    olur ve geri alma hedefi olarak kaydedilir.
+    """
+    claimed = await db.system_info.find_one_and_update(
+        {"type": "excel_upload", "physical": {"$exists": False}}, {"$set": {"physical": {}}},
+        projection={"_id": 0, "collections": 1},
+    )
+    existing = set(await db.database.list_collection_names())
+    for name in existing:
+        if name.endswith(LEGACY_SUFFIXES):
+            await db.database[name].drop()
+    if claimed is None:
+        return
+    previous = {}
+    for name in claimed.get("collections") or []:
+        if name + LEGACY_PREVIOUS_SUFFIX in existing:
+            await db.database[name + LEGACY_PREVIOUS_SUFFIX].rename(name + ALTERNATE_SUFFIX, dropTarget=True)
+            previous[name] = name + ALTERNATE_SUFFIX
+    if previous:
+        await db.system_info.update_one({"type": "excel_upload"}, {"$set": {"previous_physical": previous}})
+        logger.info(f"Moved {len(previous)} previous-generation copies to {ALTERNATE_SUFFIX}")
+
+# Boyut tabloları: DST, TTE ve DSM için kalıcı tamsayı id'li kanonik kayıtlar.
+# {_id, ad, anahtarlar}; anahtarlar bu kayda çözülen tüm normalize isimlerdir
+# (ör. DATA sayfasındaki kısaltılmış TTE adı, DSM'in takım adı). Id'ler
+# yüklemeler arasında korunur, yeni isimler max(id) + 1 alır.
+DIMENSIONS = {"dst": "dst_dim", "tte": "tte_dim", "dsm": "dsm_dim"}
+
+# Fact satırlarına yazılan id alanları: {koleksiyon: {id alanı: (boyut, kaynak alan)}}
+DIMENSION_FIELDS = {
+    "bayiler": {"dst_id": ("dst", "dst"), "tte_id": ("tte", "tte"), "dsm_id": ("dsm", "dsm")},
+    "konya_gun": {"dst_id": ("dst", "dst"), "dsm_id": ("dsm", "dsm")},
+    "stand_raporu": {"dst_id": ("dst", "dst"), "tte_id": ("tte", "tte")},
+    "rut_data": {"dst_id": ("dst", "dst_name")},
+    "tte_data": {"tte_id": ("tte", "tte_name")},
+}
+DIMENSION_SOURCES = ("dsm_teams", "dst_data", *DIMENSION_FIELDS)
+
+def dimension_key(name) -> str:
+    return turkish_to_ascii(str(name or "").strip())
+
+class DimensionRegistry:
+    """Normalized name -> dimension row, seeded with the previous upload's rows so ids stay stable"""
     
-    # Create indexes
-    await db.bayiler.create_index("bayi_kodu")
-    await db.bayiler.create_index("bayi_kodu_ascii")
-    await db.bayiler.create_index("bayi_unvani_ascii")
-    await db.faturalar.create_index("bayi_kodu")
-    await db.faturalar.create_index("matbu_no")
-    await db.belge_detay.create_index("matbu_no")
-    await db.tahsilatlar.create_index("bayi_kodu")
-    await db.konya_gun.create_index("bayi_kodu")
-    await db.stand_raporu.create_index("bayi_durumu")
-    await db.bayi_hedef.create_index("bayi_kodu")
-    await db.loyalty_bayiler.create_index("bayi_kodu")
+    def __init__(self, rows: List[dict]):
+        self.rows = [dict(row) for row in sorted(rows, key=lambda r: r["_id"])]
+        self.by_key = {key: row for row in self.rows for key in row["anahtarlar"]}
+        self.next_id = max((row["_id"] for row in self.rows), default=0) + 1
     
-    logger.info("Excel processing completed!")
+    def add(self, name, display: bool = False) -> Optional[dict]:
+        """Row for name, created if unknown; display=True makes name the row's display name"""
+        key = dimension_key(name)
+        if not key:
+            return None
+        row = self.by_key.get(key)
+        if row is None:
+            row = {"_id": self.next_id, "ad": str(name).strip(), "anahtarlar": [key]}
+            self.next_id += 1
+            self.rows.append(row)
+            self.by_key[key] = row
+        elif display:
+            row["ad"] = str(name).strip()
+        return row
+    
+    def alias(self, name) -> Optional[dict]:
+        """Like add, but an unknown name joins the first row whose key contains it or is contained in it"""
+        key = dimension_key(name)
+        if key and key not in self.by_key:
+            for other, row in list(self.by_key.items()):
+                if key in other or other in key:
+                    row["anahtarlar"].append(key)
+                    self.by_key[key] = row
+                    break
+        return self.add(name, display=True)
+    
+    def id_of(self, name) -> Optional[int]:
+        row = self.by_key.get(dimension_key(name))
+        return row["_id"] if row else None
 
+def build_dimensions(dst_dim: List[dict], tte_dim: List[dict], dsm_dim: List[dict], dsm_teams: List[dict],
+                     dst_data: List[dict], *facts: List[dict]) -> Dict[str, List[dict]]:
+    """Register every DST/TTE/DSM name, stamp the fact rows with their ids and return the dimension rows.
+
+    facts are the DIMENSION_FIELDS collections' rows, in that order; they are updated in place.
+    """
+    registries = {"dst": DimensionRegistry(dst_dim), "tte": DimensionRegistry(tte_dim), "dsm": DimensionRegistry(dsm_dim)}
+    dsts, ttes, dsms = registries["dst"], registries["tte"], registries["dsm"]
+    fact_rows = dict(zip(DIMENSION_FIELDS, facts))
+    
+    # Görünen adlar: takım tanımları, DST kullanıcıları ve DATA sayfası
+    for team in dsm_teams:
+        dsm = dsms.add(team.get("dsm_name"), display=True)
+        if dsm is None:
+            continue
+        team_key = dimension_key(team.get("team_name"))
+        if team_key and team_key not in dsms.by_key:
+            dsm["anahtarlar"].append(team_key)
+            dsms.by_key[team_key] = dsm
+        dsm["team_name"] = team.get("team_name")
+        for name in team.get("dst_list") or []:
+            dst = dsts.add(name, display=True)
+            if dst is not None:
+                dst["dsm_id"] = dsm["_id"]
+    for info in DST_USERS.values():
+        dsts.add(info["name"], display=True)
+    for row in dst_data:
+        dsts.add(row.get("dst"), display=True)
+    
+    for name, fields in DIMENSION_FIELDS.items():
+        if name == "tte_data":
+            continue
+        for doc in fact_rows[name]:
+            for kind, source in fields.values():
+                registries[kind].add(doc.get(source))
+    # Takım tanımında olmayan DST'ler DSM'e KONYA GÜN satırlarından bağlanır
+    for doc in fact_rows["konya_gun"]:
+        dst = dsts.by_key.get(dimension_key(doc.get("dst")))
+        dsm_id = dsms.id_of(doc.get("dsm"))
+        if dst is not None and dsm_id is not None:
+            dst.setdefault("dsm_id", dsm_id)
+    # DATA sayfasındaki TTE adları stand raporundakilerden farklı yazılabiliyor
+    for doc in fact_rows["tte_data"]:
+        ttes.alias(doc.get("tte_name"))
+    
+    for name, fields in DIMENSION_FIELDS.items():
+        for doc in fact_rows[name]:
+            for id_field, (kind, source) in fields.items():
+                doc[id_field] = registries[kind].id_of(doc.get(source))
+    return {DIMENSIONS[kind]: registry.rows for kind, registry in registries.items()}
+
+async def dimension_sources(loads: Dict[str, List[dict]]) -> List[List[dict]]:
+    """build_dimensions arguments: the live dimension rows, then this upload's (or the live) sources"""
+    previous = [await db[collection].find({}).to_list(None) for collection in DIMENSIONS.values()]
+    return previous + await derived_sources(loads, DIMENSION_SOURCES)
+
+async def dimension_id(kind: str, name: str) -> Optional[int]:
+    row = await db[DIMENSIONS[kind]].find_one({"anahtarlar": dimension_key(name)}, {"_id": 1})
+    return row["_id"] if row else None
+
+# Bayi kartı: bayiler + konya_gun (borç yaşlandırma) + stand_raporu (ziyaret
+# günleri) + bayi_hedef tek dokümanda, _id = kanonik bayi kodu
+PROFILE_BORC_FIELDS = ["musteri_bakiyesi", *[f"gun_{i}" for i in range(14)], "gun_14_uzeri"]
+PROFILE_HEDEF_MARKALAR = ["camel", "winston", "mcarlo", "ld"]
+PROFILE_SKIPPED_FIELDS = {"_id", "bayi_kodu_ascii", "bayi_unvani_ascii",
+                          "dst_id", "tte_id", "dsm_id"}
+PROFILE_SOURCES = ("bayiler", "konya_gun", "stand_raporu", "bayi_hedef")
+
+def hedef_toplamlari(hedef: dict) -> dict:
+    """bayi_hedef row without _id plus the Camel + Winston + M.Carlo + LD totals"""
+    hedef = {k: v for k, v in hedef.items() if k != "_id"}
+    hedef["toplam_hedef"] = sum(safe_float(hedef.get(f"{m}_hedef", 0)) for m in PROFILE_HEDEF_MARKALAR)
+    hedef["toplam_satis"] = sum(safe_float(hedef.get(f"{m}_satis", 0)) for m in PROFILE_HEDEF_MARKALAR)
+    return hedef
+
+def build_bayi_profiles(bayiler: List[dict], konya_gun: List[dict], stand_raporu: List[dict],
+                        bayi_hedef: List[dict]) -> List[dict]:
+    """Merge the per-dealer rows into one profile document per dealer"""
+    # Aynı koddan birden fazla satır varsa ilki geçerli
+    borclar, standlar, hedefler = {}, {}, {}
+    for rows, target in ((konya_gun, borclar), (stand_raporu, standlar), (bayi_hedef, hedefler)):
+        for row in rows:
+            target.setdefault(row.get("bayi_kodu"), row)
+    
+    profiles = {}
+    for bayi in bayiler:
+        kod = bayi.get("bayi_kodu")
+        if not kod or kod in profiles:
+            continue
+        profile = {k: v for k, v in bayi.items() if k not in PROFILE_SKIPPED_FIELDS}
+        profile["_id"] = kod
+        profile["bayi_unvani"] = bayi.get("bayi_unvani") or ""
+        
+        toplam_2024 = safe_float(bayi.get("toplam_satis_2024"))
+        toplam_2025 = safe_float(bayi.get("toplam_satis_2025"))
+        profile["gelisim_yuzdesi"] = ((toplam_2025 - toplam_2024) / toplam_2024) * 100 if toplam_2024 > 0 else 0.0
+        
+        borc = borclar.get(kod)
+        profile["borc"] = {field: safe_float(borc.get(field)) for field in PROFILE_BORC_FIELDS} if borc else None
+        bakiye = profile["borc"]["musteri_bakiyesi"] if borc else 0.0
+        profile["borc_durumu"] = f"{bakiye:,.1f} TL" if bakiye > 0 else "Borcu yoktur"
+        
+        stand = standlar.get(kod)
+        profile["ziyaret_gunleri"] = stand.get("ziyaret_gunleri", []) if stand else []
+        
+        hedef = hedefler.get(kod)
+        profile["hedef"] = hedef_toplamlari(hedef) if hedef else None
+        profiles[kod] = profile
+    return list(profiles.values())
+
+# Özet (materialized) koleksiyonlar: /tte-data, /tte-tip-kirilim, /dst-sinif-kirilim
+# ve /ilce-verileri her yüklemede bir kez hesaplanır, istekte sadece okunur
+OZET_COLLECTIONS = ["tte_ozet", "tte_tip_ozet", "dst_sinif_ozet", "ilce_ozet"]
+OZET_SOURCES = ("tte_data", "stand_raporu", "bayiler")
+SINIF_SIRASI = ['A+', 'A', 'B', 'C', 'D', 'E+', 'E', 'E-']
+
+def stand_var(value) -> bool:
+    """Stand alanı dolu mu (boş, "0" ve "none" stand yok sayılır)"""
+    return bool(value) and bool(str(value).strip()) and str(value).strip() != '0' and str(value).lower() != 'none'
+
+def build_ozetler(tte_data: List[dict], stand_raporu: List[dict], bayiler: List[dict]) -> Dict[str, List[dict]]:
+    """Compute the TTE, TTE tip, DST sınıf and ilçe breakdowns served by the summary endpoints"""
+    tte_counts, tip_counts, dst_kodlari, ilce_data = {}, {}, {}, {}
+    for stand in stand_raporu:
+        tte_name = turkish_upper(stand.get('tte') or '')
+        bayi_durumu = turkish_upper(stand.get('bayi_durumu') or '')
+        counts = tte_counts.setdefault(stand.get('tte_id'), {'aktif': 0, 'pasif': 0})
+        if 'AKTİF' in bayi_durumu or 'AKTIF' in bayi_durumu:
+            counts['aktif'] += 1
+        elif 'PASİF' in bayi_durumu or 'PASIF' in bayi_durumu:
+            counts['pasif'] += 1
+        
+        tip = stand.get('tip', '')
+        if tip:
+            tipler = tip_counts.setdefault(tte_name, {})
+            tipler[tip] = tipler.get(tip, 0) + 1
+        
+        kod = stand.get('bayi_kodu', '')
+        if kod and stand.get('dst_id') is not None:
+            dst_kodlari.setdefault(kod, set()).add(stand['dst_id'])
+        
+        ilce = stand.get("ilce", "")
+        if ilce:
+            row = ilce_data.setdefault(ilce, {"ilce": ilce, "bayi_sayisi": 0, "aktif_bayi": 0, "pasif_bayi": 0, "bayiler": []})
+            row["bayi_sayisi"] += 1
+            durum = str(stand.get("bayi_durumu", "")).upper()
+            if durum == "AKTİF" or durum == "AKTIF":
+                row["aktif_bayi"] += 1
+            else:
+                row["pasif_bayi"] += 1
+            row["bayiler"].append({
+                "bayi_kodu": stand.get("bayi_kodu", ""),
+                "bayi_unvani": stand.get("bayi_unvani", ""),
+                "bayi_durumu": durum
+            })
+    
+    tte_stands, sinif_counts = {}, {}
+    for bayi in bayiler:
+        stands = tte_stands.setdefault(bayi.get('tte_id'), {'jti': 0, 'pmi': 0, 'bat': 0})
+        for marka in ('jti', 'pmi', 'bat'):
+            if stand_var(bayi.get(f'{marka}_stant')):
+                stands[marka] += 1
+        
+        # satisa_gore_sinif alanını kullan (H sütunu)
+        sinif = bayi.get('satisa_gore_sinif', '') or bayi.get('sinif', '')
+        if sinif:
+            for dst_id in dst_kodlari.get(bayi.get('bayi_kodu', ''), ()):
+                counts = sinif_counts.setdefault(dst_id, {})
+                counts[sinif] = counts.get(sinif, 0) + 1
+    
+    tte_ozet = []
+    for sira, tte in enumerate(tte_data[:10]):
+        row = {k: v for k, v in tte.items() if k != '_id'}
+        # DATA'daki TTE adı boyut tablosunda stand raporundaki adla aynı id'ye çözülür
+        counts = tte_counts.get(tte.get('tte_id'), {'aktif': 0, 'pasif': 0})
+        stands = tte_stands.get(tte.get('tte_id'), {'jti': 0, 'pmi': 0, 'bat': 0})
+        row['aktif_bayi_sayisi'] = counts['aktif']
+        row['pasif_bayi_sayisi'] = counts['pasif']
+        row['bayi_sayisi'] = counts['aktif'] + counts['pasif']
+        # Stand oranı = stand sayısı / aktif bayi * 100
+        aktif = counts['aktif'] or 1  # Avoid division by zero
+        row.update({f'{marka}_stand': stands[marka] for marka in ('jti', 'pmi', 'bat')})
+        row.update({f'{marka}_stand_oran': round((stands[marka] / aktif) * 100, 1) for marka in ('jti', 'pmi', 'bat')})
+        row['sira'] = sira
+        tte_ozet.append(row)
+    
+    dst_sinif_ozet = []
+    for dst_id, counts in sinif_counts.items():
+        # A+, A, B, C, D, E+, E, E- sıralaması, sonra kalanlar alfabetik
+        siniflar = [{"sinif": sinif, "count": counts[sinif]} for sinif in SINIF_SIRASI if sinif in counts]
+        siniflar += [{"sinif": sinif, "count": count} for sinif, count in sorted(counts.items()) if sinif not in SINIF_SIRASI]
+        dst_sinif_ozet.append({"_id": dst_id, "siniflar": siniflar})
+    
+    ilceler = sorted(ilce_data.values(), key=lambda x: x["bayi_sayisi"], reverse=True)
+    return {
+        "tte_ozet": tte_ozet,
+        "tte_tip_ozet": [
+            {"_id": tte_name, "tipler": [{"tip": tip, "count": count} for tip, count in sorted(tipler.items())]}
+            for tte_name, tipler in tip_counts.items()
+        ],
+        "dst_sinif_ozet": dst_sinif_ozet,
+        "ilce_ozet": [{**row, "sira": sira} for sira, row in enumerate(ilceler)],
+    }
+
+# Borç yaşlandırma: konya_gun'daki her borçlu bayi için dolu her gün dilimi
+# (0..13, 14_uzeri) ve toplam bakiye ayrı satır. Kapsam (DST/DSM/TTE/kanal) +
+# gün + tutar index'leri sayesinde filtre ve azalan sıralama Mongo'da yapılır.
+GUN_ALANLARI = {
+    **{str(i): f"gun_{i}" for i in range(14)},
+    "14_uzeri": "gun_14_uzeri",
+    "toplam": "musteri_bakiyesi",
+}
+CARI_KAPSAMLARI = {"dst": "dst_id", "dsm": "dsm_id", "tte": "tte_id", "kanal": "kanal_grubu"}
+CARI_SOURCES = ("konya_gun", "bayiler")
+
+def build_cari_yaslandirma(konya_gun: List[dict], bayiler: List[dict]) -> List[dict]:
+    """One row per (indebted dealer, non-empty aging bucket), stamped with its scope keys"""
+    tte_ids = {}
+    for bayi in bayiler:
+        tte_ids.setdefault(bayi.get("bayi_kodu"), bayi.get("tte_id"))
+    
+    rows = []
+    for r in konya_gun:
+        bakiye = r.get("musteri_bakiyesi") or 0
+        if bakiye <= 0:
+            continue
+        base = {
+            "bayi_kodu": str(r.get("bayi_kodu", "")),
+            "unvan": r.get("unvan", ""),
+            "dst": r.get("dst", ""),
+            "dsm": r.get("dsm", ""),
+            "tip": r.get("tip", ""),
+            "sinif": r.get("sinif", ""),
+            "musteri_bakiyesi": bakiye,
+            "dst_id": r.get("dst_id"),
+            "dsm_id": r.get("dsm_id"),
+            "tte_id": tte_ids.get(r.get("bayi_kodu")),
+            "kanal_grubu": r.get("kanal_grubu"),
+            "kanal_kodu": r.get("kanal_kodu"),
+        }
+        for gun, field in GUN_ALANLARI.items():
+            deger = r.get(field) or 0
+            if deger > 0:
+                rows.append({**base, "gun": gun, "gun_deger": deger})
+    return rows
+
+# Boyut tablolarının ve türetilmiş koleksiyonların girdileri bayi sayısıyla
+# sınırlıdır ve derlemeler için bütün gerekir. Diğer koleksiyonlar işçilerden
+# parça parça akar ve hiçbir süreçte bütün halde tutulmaz (bkz. run_sheet_group).
+DERIVED_INPUTS = {*DIMENSION_SOURCES, *PROFILE_SOURCES, *OZET_SOURCES, *CARI_SOURCES}
+
+async def derived_sources(loads: Dict[str, List[dict]], names) -> List[List[dict]]:
+    """Rows a derived collection is built from: this upload's, or the live ones if it has none"""
+    sources = []
+    for name in names:
+        if name in loads and (loads[name] or name in REPLACED_COLLECTIONS):
+            sources.append(loads[name])
+        else:
+            sources.append(await db[name].find({}, {"_id": 0}).to_list(None))
+    return sources
+
+async def process_excel(file_path: str, job_id: Optional[str] = None, file_hash: Optional[str] = None):
+    """Process the Excel file and publish it as a new collection generation.
+
+    Returns the per-collection load stats, or None when the file is identical
+    to the one already live.
+    """
+    logger.info("Starting Excel processing...")
+    
+    if file_hash is None:
+        file_hash = await asyncio.to_thread(hash_file, file_path)
+    info = await db.system_info.find_one({"type": "excel_upload"}, {"file_hash": 1})
+    if info and info.get("file_hash") == file_hash:
+        logger.info(f"Workbook unchanged (sha256 {file_hash[:12]}), skipping ingest")
+        return None
+    
+    # Stage timings end up in the job and, from there, in the ingest report
+    stages = []
+    
+    async def finish_stage(stage: str, start: float, **counts):
+        stages.append({"stage": stage, "seconds": round(time.perf_counter() - start, 3), **counts})
+        await update_ingest_job(job_id, stages=stages)
+    
+    # Yayındaki kopyalara dokunulmaz; her koleksiyon diğer kopyasına yazılır.
+    # Büyük sayfalar ayrıştırılırken parça parça oraya akar (bkz. CopyWriter)
+    published = await reserve_inactive_copies()
+    physical = published.get("physical") or {}
+    start = time.perf_counter()
+    parsed, writers = await parse_workbook(file_path, job_id, physical)
+    await finish_stage("parse", start, rows=sum(len(docs) for docs in parsed.values())
+                       + sum(writer.rows for writer in writers.values()), streamed=len(writers))
+    
+    # Collections without new rows keep their old data, except the ones that
+    # are rebuilt on every upload, which are emptied
+    loads = {name: docs for name, docs in parsed.items() if docs}
+    for name in REPLACED_COLLECTIONS:
+        if name not in writers:
+            loads.setdefault(name, [])
+    
+    start = time.perf_counter()
+    loads.update(await asyncio.to_thread(build_dimensions, *await dimension_sources(loads)))
+    await finish_stage("dimensions", start, rows=sum(len(loads[name]) for name in DIMENSIONS.values()))
+    
+    start = time.perf_counter()
+    loads["bayi_profile"] = await asyncio.to_thread(
+        build_bayi_profiles, *await derived_sources(loads, PROFILE_SOURCES))
+    await finish_stage("profile", start, rows=len(loads["bayi_profile"]))
+    
+    start = time.perf_counter()
+    loads.update(await asyncio.to_thread(build_ozetler, *await derived_sources(loads, OZET_SOURCES)))
+    await finish_stage("ozet", start, rows=sum(len(loads[name]) for name in OZET_COLLECTIONS))
+    
+    start = time.perf_counter()
+    loads["cari_yaslandirma"] = await asyncio.to_thread(
+        build_cari_yaslandirma, *await derived_sources(loads, CARI_SOURCES))
+    await finish_stage("yaslandirma", start, rows=len(loads["cari_yaslandirma"]))
+    
+    await update_ingest_job(job_id, stage="loading", rows_total=(
+        sum(len(docs) for docs in loads.values()) + sum(writer.rows for writer in writers.values())
+    ))
+    start = time.perf_counter()
+    
+    async def write_load(name: str, docs: List[dict]) -> Dict[str, Any]:
+        writer = writers[name] = CopyWriter(name, inactive_copy(physical, name), job_id)
+        await writer.write_all(docs)
+        return await writer.finish()
+    
+    stats = list(await asyncio.gather(
+        *(write_load(name, docs) for name, docs in loads.items()),
+        *(writer.finish() for writer in list(writers.values())),
+    ))
+    # Akan koleksiyonların satırları ayrıştırma sırasında yazıldı; burada
+    # silinen satırlar ve index'ler. Toplam index süresi ayrıca raporlanır
+    await finish_stage("write", start, rows=sum(s["rows"] for s in stats), collections=len(stats),
+                       index_seconds=round(sum(s["index_seconds"] for s in stats), 3))
+    
+    await update_ingest_job(job_id, stage="publishing")
+    start = time.perf_counter()
+    info = await publish_generation({name: writer.target for name, writer in writers.items()},
+                                    published, file_hash, job_id)
+    # Delta ile güncellenen ve bu yüklemede olmayan koleksiyonlar da güncel
+    # COLLECTION_INDEXES'e kavuşsun; create_index var olan index için no-op
+    for name in COLLECTION_INDEXES:
+        await create_collection_indexes(name)
+    await finish_stage("publish", start, collections=len(info["collections"]))
+    await update_ingest_job(job_id, generation=info["generation"])
+    
+    logger.info(f"Excel processing completed! (generation {info['generation']})")
+    return list(stats)
+
+
+# Ingest job queue
+# Yüklenen dosyalar ingest_jobs koleksiyonunda kuyruğa alınır ve arka plandaki
+# worker tarafından sırayla işlenir. ingest_locks içindeki kira (lease) kaydı
+# aynı anda birden fazla process'in yıkıcı bir yükleme çalıştırmasını engeller.
+UPLOAD_DIR = Path(os.environ.get('UPLOAD_DIR', str(ROOT_DIR / 'uploads')))
+INGEST_LOCK_TTL = int(os.environ.get('INGEST_LOCK_TTL', '1800'))
+INGEST_POLL_INTERVAL = float(os.environ.get('INGEST_POLL_INTERVAL', '5'))
+INGEST_MAX_ATTEMPTS = 3
+INGEST_WORKER_ID = str(uuid.uuid4())
+_ingest_wakeup = asyncio.Event()
+_ingest_worker_task: Optional[asyncio.Task] = None
+
+class IngestLeaseLost(RuntimeError):
+    """The ingest lock or the job was taken over by another worker"""
+
+async def acquire_ingest_lock() -> bool:
+    now = datetime.utcnow()
+    try:
+        await db.ingest_locks.update_one(
+            {"_id": "ingest", "$or": [
+                {"owner": None},
+                {"owner": INGEST_WORKER_ID},
+                {"expires_at": {"$lt": now}},
+            ]},
+            {"$set": {"owner": INGEST_WORKER_ID, "expires_at": now + timedelta(seconds=INGEST_LOCK_TTL)}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+async def release_ingest_lock():
+    await db.ingest_locks.update_one(
+        {"_id": "ingest", "owner": INGEST_WORKER_ID},
+        {"$set": {"owner": None, "expires_at": None}},
+    )
+
+async def update_ingest_job(job_id: Optional[str], inc: Optional[Dict[str, int]] = None, **fields):
+    """Record job progress and extend the ingest lock; no-op outside a job.
+
+    Raises IngestLeaseLost when this worker no longer holds the lock or the job, so a
+    worker whose lease expired stops before it publishes over the new owner's load.
+    """
+    if not job_id:
+        return
+    now = datetime.utcnow()
+    lock = await db.ingest_locks.update_one(
+        {"_id": "ingest", "owner": INGEST_WORKER_ID},
+        {"$set": {"expires_at": now + timedelta(seconds=INGEST_LOCK_TTL)}},
+    )
+    if lock.matched_count == 0:
+        raise IngestLeaseLost(f"Ingest kilidi {INGEST_WORKER_ID} worker'ında değil")
+    update: Dict[str, Any] = {"$set": {**fields, "updated_at": now.isoformat()}}
+    if inc:
+        update["$inc"] = inc
+    result = await db.ingest_jobs.update_one({"id": job_id, "worker": INGEST_WORKER_ID}, update)
+    if result.matched_count == 0:
+        raise IngestLeaseLost(f"{job_id} işi başka bir worker'a geçti")
+
+async def enqueue_ingest_job(file_path: str, source: str, filename: str = "",
+                             file_hash: Optional[str] = None,
+                             download: Optional[Dict[str, Any]] = None) -> str:
+    job_id = str(uuid.uuid4())
+    await db.ingest_jobs.insert_one({
+        "id": job_id,
+        "state": "queued",
+        "source": source,
+        "filename": filename,
+        "file_path": file_path,
+        "file_hash": file_hash,
+        "created_at": datetime.utcnow().isoformat(),
+        "attempts": 0,
+        "rows_processed": 0,
+        "sheet_timings": [],
+        "download": download,
+    })
+    _ingest_wakeup.set()
+    logger.info(f"Queued ingest job {job_id} for {file_path}")
+    return job_id
+
+async def run_next_ingest_job() -> bool:
+    """Claim and process the oldest job. Returns False when there was nothing to do."""
+    if not await acquire_ingest_lock():
+        return False
+    try:
+        # Kilidi tutarken 'running' görünen iş, yarıda kalmış bir önceki denemedir
+        job = await db.ingest_jobs.find_one_and_update(
+            {"state": {"$in": ["queued", "running"]}},
+            {
+                "$set": {"state": "running", "worker": INGEST_WORKER_ID, "started_at": datetime.utcnow().isoformat()},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not job:
+            return False
+        
+        try:
+            if job["attempts"] > INGEST_MAX_ATTEMPTS:
+                raise RuntimeError(f"{INGEST_MAX_ATTEMPTS} denemede tamamlanamadı")
+            logger.info(f"Running ingest job {job['id']} (attempt {job['attempts']})")
+            stats = await process_excel(job["file_path"], job["id"], job.get("file_hash"))
+            await update_ingest_job(
+                job["id"],
+                state="done",
+                stage="done",
+                current_sheets=[],
+                collections=stats or [],
+                finished_at=datetime.utcnow().isoformat(),
+                message=("Excel dosyası başarıyla yüklendi ve işlendi" if stats is not None
+                         else "Dosya mevcut verilerle aynı, değişiklik yok"),
+            )
+        except IngestLeaseLost as e:
+            # İş ve dosyası artık kilidi alan worker'ın; ona dokunmadan çık
+            logger.error(f"Ingest job {job['id']} stopped: {e}")
+            return True
+        except Exception as e:
+            logger.error(f"Ingest job {job['id']} failed: {e}")
+            await update_ingest_job(
+                job["id"],
+                state="failed",
+                error=str(e),
+                finished_at=datetime.utcnow().isoformat(),
+            )
+        if os.path.exists(job["file_path"]):
+            os.remove(job["file_path"])
+        await save_ingest_report(job["id"])
+        return True
+    finally:
+        await release_ingest_lock()
+
+def seconds_between(start: Optional[str], end: Optional[str]) -> Optional[float]:
+    if not start or not end:
+        return None
+    return round((datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds(), 3)
+
+async def save_ingest_report(job_id: str):
+    """Store the finished job's stage timings as a report in ingest_reports"""
+    try:
+        job = await db.ingest_jobs.find_one({"id": job_id}, {"_id": 0})
+        if not job:
+            return
+        stages = job.get("stages", [])
+        if job.get("download"):
+            stages = [{"stage": "download", **job["download"]}] + stages
+        sheets = sorted(job.get("sheet_timings", []),
+                        key=lambda t: t["seconds"] + t.get("transform_seconds", 0), reverse=True)
+        report = {
+            "id": job_id,
+            "state": job.get("state"),
+            "source": job.get("source"),
+            "filename": job.get("filename"),
+            "file_hash": job.get("file_hash"),
+            "generation": job.get("generation"),
+            "attempts": job.get("attempts"),
+            "created_at": job.get("created_at"),
+            "started_at": job.get("started_at"),
+            "finished_at": job.get("finished_at"),
+            "queued_seconds": seconds_between(job.get("created_at"), job.get("started_at")),
+            "total_seconds": seconds_between(job.get("started_at"), job.get("finished_at")),
+            "rows_total": sum(t.get("rows", 0) for t in sheets),
+            "slowest_sheet": sheets[0]["sheet"] if sheets else None,
+            "stages": stages,
+            "sheets": sheets,
+            "collections": job.get("collections", []),
+            "message": job.get("message"),
+            "error": job.get("error"),
+        }
+        await db.ingest_reports.replace_one({"id": job_id}, report, upsert=True)
+    except Exception as e:
+        logger.error(f"Could not save ingest report for {job_id}: {e}")
+
+async def backfill_normalized_keys():
+    """Add the NORMALIZED_KEYS fields to rows loaded before they existed"""
+    for name, keys in NORMALIZED_KEYS.items():
+        missing = db[name].find({next(iter(keys)): {"$exists": False}}, {source: 1 for source in keys.values()})
+        ops = []
+        count = 0
+        async for doc in missing:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+                key_field: turkish_to_ascii(doc.get(source) or "") for key_field, source in keys.items()
+            }}))
+            if len(ops) >= INGEST_BATCH_SIZE:
+                await db[name].bulk_write(ops, ordered=False)
+                count += len(ops)
+                ops = []
+        if ops:
+            await db[name].bulk_write(ops, ordered=False)
+            count += len(ops)
+        if count:
+            await create_collection_indexes(name)
+            logger.info(f"Backfilled normalized keys on {count} {name} records")
+
+async def canonicalize_stored_bayi_kodu():
+    """Rewrite dealer codes stored before canonical_bayi_kodu ("1234.0", padded)"""
+    for name, field in BAYI_KODU_FIELDS.items():
+        ops = []
+        async for doc in db[name].find({field: {"$regex": r"^\s|\s$|^\d+\.0+$"}}, {field: 1}):
+            kod = canonical_bayi_kodu(doc[field])
+            update = {field: kod}
+            if name == "bayiler":
+                update["bayi_kodu_ascii"] = turkish_to_ascii(kod)
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        for i in range(0, len(ops), INGEST_BATCH_SIZE):
+            await db[name].bulk_write(ops[i:i + INGEST_BATCH_SIZE], ordered=False)
+        if ops:
+            logger.info(f"Canonicalized {len(ops)} dealer codes in {name}")
+
+async def backfill_bayi_profile():
+    """Build bayi_profile from the live collections if the last upload predates it"""
+    if await db.bayi_profile.find_one({}, {"_id": 1}) or not await db.bayiler.find_one({}, {"_id": 1}):
+        return
+    profiles = await asyncio.to_thread(build_bayi_profiles, *await derived_sources({}, PROFILE_SOURCES))
+    for i in range(0, len(profiles), INGEST_BATCH_SIZE):
+        await db.bayi_profile.insert_many(profiles[i:i + INGEST_BATCH_SIZE], ordered=False)
+    logger.info(f"Built {len(profiles)} dealer profiles from live data")
+
+async def backfill_kanal_kodlari():
+    """Add kanal_kodu/kanal_grubu to rows loaded before they existed, fix groups stamped from the wrong table"""
+    # cari_yaslandirma satırları kanal alanlarını konya_gun'dan kopyalar
+    for name, kodlar in {**KANAL_COLLECTIONS, "cari_yaslandirma": KONYA_GUN_KANAL_KODLARI}.items():
+        changed = 0
+        for tip in await db[name].distinct("tip"):
+            kod = kanal_kodu(tip)
+            grup = kodlar.get(kod)
+            result = await db[name].update_many(
+                {"tip": tip, "$or": [{"kanal_kodu": {"$ne": kod}}, {"kanal_grubu": {"$ne": grup}}]},
+                {"$set": {"kanal_kodu": kod, "kanal_grubu": grup}},
+            )
+            changed += result.modified_count
+        result = await db[name].update_many({"kanal_kodu": {"$exists": False}}, {"$set": {"kanal_kodu": None, "kanal_grubu": None}})
+        changed += result.modified_count
+        if changed:
+            await create_collection_indexes(name)
+            logger.info(f"Backfilled channel codes on {changed} {name} rows")
+
+async def backfill_dimensions():
+    """Build the dimension tables and stamp their ids on live rows loaded before they existed"""
+    if await db.dst_dim.find_one({}, {"_id": 1}) or not await db.stand_raporu.find_one({}, {"_id": 1}):
+        return
+    dimensions = await asyncio.to_thread(build_dimensions, *await dimension_sources({}))
+    registries = {kind: DimensionRegistry(dimensions[collection]) for kind, collection in DIMENSIONS.items()}
+    for name, fields in DIMENSION_FIELDS.items():
+        for id_field, (kind, source) in fields.items():
+            for value in await db[name].distinct(source):
+                await db[name].update_many({source: value}, {"$set": {id_field: registries[kind].id_of(value)}})
+        await create_collection_indexes(name)
+    for collection, rows in dimensions.items():
+        if rows:
+            await db[collection].insert_many(rows, ordered=False)
+        await create_collection_indexes(collection)
+    logger.info(f"Built dimension tables: {', '.join(f'{c} {len(r)}' for c, r in dimensions.items())}")
+
+async def backfill_cari_yaslandirma():
+    """Build cari_yaslandirma from the live data if the last upload predates it"""
+    if await db.cari_yaslandirma.find_one({}, {"_id": 1}) or not await db.konya_gun.find_one({}, {"_id": 1}):
+        return
+    rows = await asyncio.to_thread(build_cari_yaslandirma, *await derived_sources({}, CARI_SOURCES))
+    for i in range(0, len(rows), INGEST_BATCH_SIZE):
+        await db.cari_yaslandirma.insert_many(rows[i:i + INGEST_BATCH_SIZE], ordered=False)
+    await create_collection_indexes("cari_yaslandirma")
+    logger.info(f"Built {len(rows)} debt aging rows from live data")
+
+async def backfill_ozetler():
+    """Build the summary collections from the live data if the last upload predates them"""
+    # DST sınıf özeti eskiden DST adıyla anahtarlanırdı
+    eski = await db.dst_sinif_ozet.find_one({"_id": {"$type": "string"}}, {"_id": 1})
+    if (await db.tte_ozet.find_one({}, {"_id": 1}) and not eski) or not await db.stand_raporu.find_one({}, {"_id": 1}):
+        return
+    ozetler = await asyncio.to_thread(build_ozetler, *await derived_sources({}, OZET_SOURCES))
+    for name, docs in ozetler.items():
+        await db[name].delete_many({})
+        if docs:
+            await db[name].insert_many(docs, ordered=False)
+    logger.info("Built summary collections from live data")
+
+async def ingest_worker():
+    # Önceki sürümlerle yüklenmiş canlı veriyi bir kez güncelle
+    try:
+        await response_cache.current_generation()
+    except Exception as e:
+        logger.error(f"Reading the published generation failed: {e}")
+    for migration in (migrate_generation_copies, backfill_normalized_keys, canonicalize_stored_bayi_kodu, backfill_bayi_profile,
+                      backfill_kanal_kodlari, backfill_dimensions, backfill_ozetler,
+                      backfill_cari_yaslandirma):
+        try:
+            await migration()
+        except Exception as e:
+            logger.error(f"{migration.__name__} failed: {e}")
+    # Migration'lar nesli artırmadan canlı veriyi değiştirir
+    response_cache.clear()
+    while True:
+        try:
+            processed = await run_next_ingest_job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ingest worker error: {e}")
+            processed = False
+        if not processed:
+            try:
+                await asyncio.wait_for(_ingest_wakeup.wait(), timeout=INGEST_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            _ingest_wakeup.clear()
+
+@app.on_event("startup")
+async def start_ingest_worker():
+    global _ingest_worker_task
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    _ingest_worker_task = asyncio.create_task(ingest_worker())
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Response cache hit/miss/eviction counters"""
+    return response_cache.stats()
 
 # Health check endpoint for Kubernetes probes
 @app.get("/health")
@@ -3469,14 +4547,161 @@ async def health_check():
 # Include the router in the main app
 app.include_router(api_router)
 
+def if_none_match(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """ETag / Last-Modified for generation-scoped GETs; unchanged data gets 304 Not Modified.
+
+    Yanıtlar yalnızca yeni bir yükleme yayınlandığında değişir, bu yüzden ETag
+    yol + sıralı sorgu parametreleri + nesilden türetilir ve endpoint çalışmadan
+    hesaplanır. Her istek ayrıca başta okunan nesle sabitlenir (request_generation).
+    """
+    try:
+        generation = await response_cache.current_generation()
+    except Exception as e:
+        logger.error(f"Error reading generation: {e}")
+        generation = None
+    # Yeni bir yayın istek ortasında haritayı değiştirse de bu istek aynı
+    # nesilden okumaya devam eder
+    request_generation.set((response_cache.generation, db.physical))
+    if request.method != "GET" or generation is None:
+        return await call_next(request)
+    endpoint = None
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            endpoint = getattr(route, "endpoint", None)
+            break
+    if not getattr(endpoint, "generation_scoped", False):
+        return await call_next(request)
+    
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()[:16]
+    # Sıkıştırılmış ve ham gövde aynı içeriği taşır: weak ETag
+    headers = {"ETag": f'W/"{generation}-{digest}"', "Cache-Control": "no-cache"}
+    published_at = response_cache.published_at
+    if published_at:
+        headers["Last-Modified"] = format_datetime(published_at, usegmt=True)
+    
+    not_modified = False
+    if "if-none-match" in request.headers:
+        not_modified = if_none_match(request.headers["if-none-match"], headers["ETag"])
+    elif published_at and "if-modified-since" in request.headers:
+        try:
+            not_modified = published_at <= parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            pass
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    
+    response = await call_next(request)
+    # Hata durumunda endpoint'ler 5xx döner; ETag yalnızca başarılı ve istek
+    # süresince nesli değişmemiş yanıtlara verilir
+    if response.status_code == 200 and response_cache.generation == generation:
+        response.headers.update(headers)
+    return response
+
+# Bu boyutun altındaki yanıtlar sıkıştırılmaz
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+def accepted_encoding(header: str) -> Optional[str]:
+    """Pick br over gzip from an Accept-Encoding header; q=0 excludes a coding"""
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+    for coding in ("br", "gzip"):
+        if coding in accepted or "*" in accepted:
+            return coding
+    return None
+
+class CompressionMiddleware:
+    """Brotli/gzip for JSON and text responses of at least minimum_size bytes.
+
+    Yanıt gövdesi tamamen bellekte toplanıp tek seferde sıkıştırılır; JSON
+    yanıtları zaten bellekte üretildiği için akış gerekmez. Excel gibi diğer
+    içerikler olduğu gibi geçer.
+    """
+    
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    def compress(self, body: bytes, coding: str) -> bytes:
+        if coding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+    
+    async def __call__(self, scope, receive, send):
+        coding = accepted_encoding(Headers(scope=scope).get("accept-encoding", "")) if scope["type"] == "http" else None
+        # HEAD yanıtının gövdesi yoktur; content-length GET'teki boyutu söyler, ezilmez
+        if coding is None or scope["method"] == "HEAD":
+            return await self.app(scope, receive, send)
+        
+        start = None
+        chunks: List[bytes] = []
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if ("content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES)
+                        or message["status"] in (204, 304)):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            # Başlık listesi önbellekteki yanıtla paylaşılabilir; yerinde değiştirilmez
+            headers = [(k, v) for k, v in start["headers"] if k != b"content-length"]
+            if len(body) >= self.minimum_size:
+                body = self.compress(body, coding)
+                vary = [v for k, v in headers if k == b"vary"]
+                headers = [(k, v) for k, v in headers if k != b"vary"]
+                headers += [
+                    (b"content-encoding", coding.encode()),
+                    (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+                ]
+            headers.append((b"content-length", str(len(body)).encode()))
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_compressed)
+
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Web istemcisi ETag'i okuyup If-None-Match olarak geri gönderir
+    expose_headers=["ETag", "Last-Modified"],
 )
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if _ingest_worker_task is not None:
+        _ingest_worker_task.cancel()
     client.close()
+    if _ingest_pool is not None:
+        _ingest_pool.shutdown(wait=False, cancel_futures=True)
@@ -12,7 +12,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter } from 'expo-router';
-import api from '../../src/services/api';
+import { getAllPages } from '../../src/services/api';
 import { useAuth } from '../../src/context/AuthContext';
 
 interface DSTSummary {
@@ -33,8 +33,10 @@ export default function DSTScreen() {
 
   const fetchDSTList = async () => {
     try {
-      const response = await api.get('/dst-data');
-      let data = response.data;
+      // Liste kartında gösterilen alanlar; DST detayı tüm alanları ayrıca yükler
+      let data = await getAllPages<DSTSummary>('/dst-data', {
+        fields: 'dst,bayi_sayisi,aktif_bayi_sayisi,pasif_bayi_sayisi,hedef_basari_orani,aralik_satis',
+      });
       
       // DST kullanıcısı ise sadece kendi verisini göster
       if (user?.role === 'dst' && user?.dst_name) {
@@ -13,7 +13,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter } from 'expo-router';
-import api from '../../src/services/api';
+import api, { getAllPages } from '../../src/services/api';
 
 const { width } = Dimensions.get('window');
 
@@ -38,13 +38,13 @@ export default function HaritaScreen() {
 
   const fetchData = async () => {
     try {
-      const [dstRes, totalsRes, statsRes] = await Promise.all([
-        api.get('/dst-data'),
+      const [dstListesi, totalsRes, statsRes] = await Promise.all([
+        getAllPages<DSTData>('/dst-data'),
         api.get('/distributor-totals'),
         api.get('/dashboard/stats'),
       ]);
       
-      setDstVerileri(dstRes.data || []);
+      setDstVerileri(dstListesi);
       setToplamVeriler({
         ...totalsRes.data,
         ...statsRes.data,
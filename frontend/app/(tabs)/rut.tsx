@@ -16,7 +16,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { Ionicons } from '@expo/vector-icons';
 import { useAuth } from '../../src/context/AuthContext';
 import { router } from 'expo-router';
-import api from '../../src/services/api';
+import api, { getAllPages } from '../../src/services/api';
 import * as FileSystem from 'expo-file-system/legacy';
 import * as Sharing from 'expo-sharing';
 
@@ -68,6 +68,7 @@ export default function RutScreen() {
   const [gunler, setGunler] = useState<string[]>([]);
   const [selectedGun, setSelectedGun] = useState<string>('');
   const [rutData, setRutData] = useState<RutItem[]>([]);
+  const [hafta, setHafta] = useState<Record<string, RutItem[]>>({});
   const [editMode, setEditMode] = useState(false);
   const [editedData, setEditedData] = useState<RutItem[]>([]);
   const [sending, setSending] = useState(false);
@@ -88,52 +89,42 @@ export default function RutScreen() {
     if (!isAdmin) return;
     
     try {
-      const response = await api.get('/dst-data');
-      const data = response.data || [];
-      setDstList(data);
+      setDstList(await getAllPages('/dst-data', { fields: 'dst' }));
     } catch (error) {
       console.error('Error loading DST list:', error);
     }
   }, [isAdmin]);
 
-  // Gün listesini yükle
-  const loadGunler = useCallback(async () => {
+  // DST'nin tüm haftasını tek istekte yükle
+  const loadHafta = useCallback(async () => {
     if (!dstName) {
       setGunler([]);
+      setHafta({});
       return;
     }
     
-    try {
-      const response = await api.get(`/rut/gunler?dst_name=${encodeURIComponent(dstName)}`);
-      const data = response.data || [];
-      setGunler(data);
-      
-      if (data.length > 0 && !selectedGun) {
-        setSelectedGun(data[0]);
-      }
-    } catch (error) {
-      console.error('Error loading gunler:', error);
-    }
-  }, [dstName, selectedGun]);
-
-  // RUT verilerini yükle
-  const loadRutData = useCallback(async () => {
-    if (!selectedGun || !dstName) return;
-    
     try {
       setLoading(true);
       
-      const response = await api.get(`/rut?dst_name=${encodeURIComponent(dstName)}&gun=${encodeURIComponent(selectedGun)}`);
-      const data = response.data || [];
-      setRutData(data);
-      setEditedData(data);
+      const response = await api.get(`/rut/hafta?dst_name=${encodeURIComponent(dstName)}`);
+      const data: { gun: string; musteriler: RutItem[] }[] = response.data || [];
+      const byGun: Record<string, RutItem[]> = {};
+      data.forEach(({ gun, musteriler }) => {
+        byGun[gun] = musteriler;
+      });
+      setHafta(byGun);
+      setGunler(data.map(d => d.gun));
+      
+      if (data.length > 0) {
+        setSelectedGun(current => current || data[0].gun);
+      }
     } catch (error) {
-      console.error('Error loading rut data:', error);
+      console.error('Error loading rut hafta:', error);
     } finally {
       setLoading(false);
       setRefreshing(false);
     }
-  }, [selectedGun, dstName]);
+  }, [dstName]);
 
   useEffect(() => {
     if (isAdmin) {
@@ -143,15 +134,16 @@ export default function RutScreen() {
 
   useEffect(() => {
     if (dstName) {
-      loadGunler();
+      loadHafta();
     }
-  }, [dstName, loadGunler]);
+  }, [dstName, loadHafta]);
 
+  // Seçilen günün verisi yüklenmiş haftadan gelir
   useEffect(() => {
-    if (selectedGun && dstName) {
-      loadRutData();
-    }
-  }, [selectedGun, dstName, loadRutData]);
+    const data = hafta[selectedGun] || [];
+    setRutData(data);
+    setEditedData(data);
+  }, [selectedGun, hafta]);
 
   // DST seçildiğinde günleri sıfırla
   const handleSelectDST = (dst: string) => {
@@ -170,7 +162,7 @@ export default function RutScreen() {
 
   const onRefresh = () => {
     setRefreshing(true);
-    loadRutData();
+    loadHafta();
   };
 
   // Sırayı değiştir (yukarı/aşağı)
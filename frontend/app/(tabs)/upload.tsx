@@ -22,6 +22,8 @@ import api from '../../src/services/api';
 const API_URL = process.env.EXPO_PUBLIC_BACKEND_URL || 'https://sales-tracker-519.preview.emergentagent.com';
 const MAX_RETRIES = 5;
 const RETRY_DELAY = 3000;
+const JOB_POLL_INTERVAL = 2000;
+const JOB_POLL_MAX_ERRORS = 10;
 
 export default function UploadScreen() {
   const [uploading, setUploading] = useState(false);
@@ -44,6 +46,46 @@ export default function UploadScreen() {
 
   const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
 
+  // Sunucu dosyayı kuyruğa alır; işlem bitene kadar iş durumunu sorgula
+  const waitForJob = async (jobId: string): Promise<{ success: boolean; message: string }> => {
+    let errors = 0;
+    while (true) {
+      await sleep(JOB_POLL_INTERVAL);
+      try {
+        const { data: job } = await api.get(`/upload/jobs/${jobId}`);
+        errors = 0;
+        if (job.state === 'done') {
+          return { success: true, message: job.message || 'Excel dosyası başarıyla yüklendi ve işlendi' };
+        }
+        if (job.state === 'failed') {
+          return { success: false, message: `İşleme hatası: ${job.error || 'Bilinmeyen'}` };
+        }
+        if (job.state === 'queued') {
+          setStatusMessage(`Sırada bekliyor... (${job.queue_position || 1}. sıra)`);
+        } else if (job.rows_total) {
+          setStatusMessage(`Veriler kaydediliyor... (${job.rows_processed}/${job.rows_total} satır)`);
+        } else {
+          setStatusMessage('Sayfalar okunuyor...');
+        }
+      } catch (error) {
+        console.error('Job status error:', error);
+        errors += 1;
+        if (errors >= JOB_POLL_MAX_ERRORS) {
+          return { success: false, message: 'İşlem durumu alınamadı. Verileri daha sonra kontrol edin.' };
+        }
+      }
+    }
+  };
+
+  const finishUpload = async (data: { success: boolean; message: string; job_id?: string }) => {
+    if (data.job_id) {
+      setStatusMessage('Veriler işleniyor...');
+      setResult(await waitForJob(data.job_id));
+    } else {
+      setResult(data);
+    }
+  };
+
   // Google Drive Link ile Upload
   const handleGDriveUpload = async () => {
     if (!gdriveLink.trim()) {
@@ -65,8 +107,8 @@ export default function UploadScreen() {
       setProgress(30);
       const response = await api.post('/upload-gdrive', { link: gdriveLink });
       setProgress(100);
-      setResult(response.data);
       setGdriveLink('');
+      await finishUpload(response.data);
     } catch (error: any) {
       console.error('GDrive upload error:', error);
       setResult({
@@ -136,7 +178,7 @@ export default function UploadScreen() {
           },
         });
         
-        setResult(response.data);
+        await finishUpload(response.data);
       } catch (error: any) {
         console.error('Upload error:', error);
         setResult({
@@ -198,7 +240,7 @@ export default function UploadScreen() {
       if (uploadResult.status === 200) {
         setProgress(100);
         const response = JSON.parse(uploadResult.body);
-        setResult(response);
+        await finishUpload(response);
         setStatusMessage('');
         setUploading(false);
       } else if (uploadResult.status >= 500) {
@@ -71,17 +71,8 @@ export default function BayiDetailScreen() {
       setBayi(bayiData);
       setFaturalar(faturaData);
       setTahsilatlar(tahsilatData);
-      
-      // Bayi hedef bilgilerini al
-      try {
-        const hedefResponse = await fetch(`${process.env.EXPO_PUBLIC_BACKEND_URL || 'https://sales-tracker-519.preview.emergentagent.com'}/api/bayi-hedef/${id}`);
-        if (hedefResponse.ok) {
-          const hedefData = await hedefResponse.json();
-          setBayiHedef(hedefData);
-        }
-      } catch (hedefError) {
-        console.log('Bayi hedef not found:', hedefError);
-      }
+      // Bayi hedef bilgileri detay yanıtında geliyor
+      setBayiHedef(bayiData.hedef ?? null);
     } catch (error) {
       console.error('Error fetching bayi data:', error);
     } finally {
@@ -11,7 +11,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useLocalSearchParams, useRouter } from 'expo-router';
-import api from '../../src/services/api';
+import { getAllPages } from '../../src/services/api';
 
 interface CariBayi {
   bayi_kodu: string;
@@ -52,8 +52,8 @@ export default function CariBayilerTumuScreen() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const response = await api.get(`/cari-bayiler-tumu?gun=${gun}`);
-        setBayiler(response.data);
+        const data = await getAllPages(`/cari-bayiler-tumu?gun=${gun}`);
+        setBayiler(data);
       } catch (error) {
         console.error('Error fetching cari bayiler:', error);
       } finally {
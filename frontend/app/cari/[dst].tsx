@@ -12,7 +12,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter, useLocalSearchParams } from 'expo-router';
-import api from '../../src/services/api';
+import { getAllPages } from '../../src/services/api';
 
 interface CariBayi {
   bayi_kodu: string;
@@ -57,8 +57,8 @@ export default function CariBayilerScreen() {
   const fetchCariBayiler = async () => {
     try {
       const dstDecoded = decodeURIComponent(dst);
-      const response = await api.get(`/cari-bayiler/${encodeURIComponent(dstDecoded)}?gun=${gun}`);
-      setBayiler(response.data);
+      const data = await getAllPages(`/cari-bayiler/${encodeURIComponent(dstDecoded)}?gun=${gun}`);
+      setBayiler(data);
     } catch (error) {
       console.error('Error fetching cari bayiler:', error);
     } finally {
@@ -12,7 +12,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter, useLocalSearchParams } from 'expo-router';
-import api from '../../src/services/api';
+import { getAllPages } from '../../src/services/api';
 
 interface CariliBayi {
   bayi_kodu: string;
@@ -40,8 +40,7 @@ export default function CariliKanalScreen() {
 
   const fetchBayiler = async () => {
     try {
-      const response = await api.get(`/carili-kanal-bayiler/${kanal}`);
-      setBayiler(response.data || []);
+      setBayiler(await getAllPages(`/carili-kanal-bayiler/${kanal}`));
     } catch (error) {
       console.error('Error fetching carili kanal bayiler:', error);
       setBayiler([]);
@@ -12,7 +12,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter } from 'expo-router';
-import api from '../src/services/api';
+import { getAllPages } from '../src/services/api';
 
 interface DSTSummary {
   dst: string;
@@ -31,8 +31,7 @@ export default function DSTListScreen() {
 
   const fetchDSTList = async () => {
     try {
-      const response = await api.get('/dst-data');
-      setDstList(response.data);
+      setDstList(await getAllPages<DSTSummary>('/dst-data'));
     } catch (error) {
       console.error('Error fetching DST list:', error);
     } finally {
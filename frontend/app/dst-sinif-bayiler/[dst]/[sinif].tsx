@@ -12,7 +12,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { useLocalSearchParams, useRouter, Stack } from 'expo-router';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
-import api from '../../../src/services/api';
+import { getAllPages } from '../../../src/services/api';
 
 interface Bayi {
   bayi_kodu: string;
@@ -30,8 +30,7 @@ export default function DSTSinifBayilerScreen() {
 
   const fetchBayiler = async () => {
     try {
-      const response = await api.get(`/dst-sinif-bayiler/${encodeURIComponent(dst)}/${encodeURIComponent(sinif)}`);
-      setBayiler(response.data);
+      setBayiler(await getAllPages<Bayi>(`/dst-sinif-bayiler/${encodeURIComponent(dst)}/${encodeURIComponent(sinif)}`));
     } catch (error) {
       console.error('Error fetching bayiler:', error);
     } finally {
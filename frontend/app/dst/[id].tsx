@@ -12,7 +12,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter, useLocalSearchParams } from 'expo-router';
-import api from '../../src/services/api';
+import api, { getAllPages } from '../../src/services/api';
 import { useAuth } from '../../src/context/AuthContext';
 
 interface DSTData {
@@ -74,8 +74,7 @@ export default function DSTDetailScreen() {
 
   const fetchDSTData = async () => {
     try {
-      const response = await api.get('/dst-data');
-      const allData = response.data as DSTData[];
+      const allData = await getAllPages<DSTData>('/dst-data');
       const found = allData.find(d => d.dst === decodeURIComponent(dstName));
       setData(found || null);
     } catch (error) {
@@ -13,7 +13,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter, useLocalSearchParams } from 'expo-router';
-import api from '../../src/services/api';
+import { getAllPages } from '../../src/services/api';
 
 interface KanalMusteri {
   bayi_kodu: string;
@@ -73,9 +73,9 @@ export default function KanalMusterileriScreen() {
       if (tte) {
         url += `?tte=${encodeURIComponent(tte)}`;
       }
-      const response = await api.get(url);
-      setMusteriler(response.data);
-      setFilteredMusteriler(response.data);
+      const data = await getAllPages(url);
+      setMusteriler(data);
+      setFilteredMusteriler(data);
     } catch (error) {
       console.error('Error fetching kanal musterileri:', error);
     } finally {
@@ -13,7 +13,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter } from 'expo-router';
-import api from '../src/services/api';
+import { getAllPages } from '../src/services/api';
 
 interface LoyaltyBayi {
   bayi_kodu: string;
@@ -34,9 +34,9 @@ export default function LoyaltyBayilerScreen() {
 
   const fetchData = async () => {
     try {
-      const response = await api.get('/loyalty-bayiler');
-      setBayiler(response.data);
-      setFilteredBayiler(response.data);
+      const data = await getAllPages('/loyalty-bayiler');
+      setBayiler(data);
+      setFilteredBayiler(data);
     } catch (error) {
       console.error('Error fetching loyalty bayiler:', error);
     } finally {
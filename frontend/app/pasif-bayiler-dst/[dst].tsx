@@ -12,7 +12,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter, useLocalSearchParams } from 'expo-router';
-import api from '../../src/services/api';
+import { getAllPages } from '../../src/services/api';
 
 interface PasifBayi {
   bayi_kodu: string;
@@ -32,9 +32,9 @@ export default function PasifBayilerDSTScreen() {
   const fetchPasifBayiler = async () => {
     try {
       console.log('Fetching pasif bayiler for DST:', dst);
-      const response = await api.get(`/pasif-bayiler-dst/${encodeURIComponent(dst || '')}`);
-      console.log('Response data:', response.data);
-      setBayiler(response.data || []);
+      const data = await getAllPages(`/pasif-bayiler-dst/${encodeURIComponent(dst || '')}`);
+      console.log('Response data:', data);
+      setBayiler(data);
     } catch (error) {
       console.error('Error fetching pasif bayiler:', error);
       setBayiler([]);
@@ -4,7 +4,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { useRouter, useLocalSearchParams } from 'expo-router';
-import api from '../../src/services/api';
+import { getAllPages } from '../../src/services/api';
 
 interface PasifBayi {
   bayi_kodu: string;
@@ -24,8 +24,7 @@ export default function PasifBayilerTTEScreen() {
 
   const fetchPasifBayiler = async () => {
     try {
-      const response = await api.get(`/pasif-bayiler-tte/${encodeURIComponent(decodeURIComponent(tte))}`);
-      setBayiler(response.data);
+      setBayiler(await getAllPages(`/pasif-bayiler-tte/${encodeURIComponent(decodeURIComponent(tte))}`));
     } catch (error) {
       console.error('Error:', error);
     } finally {
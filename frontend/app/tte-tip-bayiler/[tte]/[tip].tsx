@@ -12,7 +12,7 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import { useLocalSearchParams, useRouter, Stack } from 'expo-router';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
-import api from '../../../src/services/api';
+import { getAllPages } from '../../../src/services/api';
 
 interface Bayi {
   bayi_kodu: string;
@@ -31,8 +31,7 @@ export default function TTETipBayilerScreen() {
 
   const fetchBayiler = async () => {
     try {
-      const response = await api.get(`/tte-tip-bayiler/${encodeURIComponent(tte)}/${encodeURIComponent(tip)}`);
-      setBayiler(response.data);
+      setBayiler(await getAllPages<Bayi>(`/tte-tip-bayiler/${encodeURIComponent(tte)}/${encodeURIComponent(tip)}`));
     } catch (error) {
       console.error('Error fetching bayiler:', error);
     } finally {
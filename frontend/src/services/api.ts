@@ -19,12 +19,21 @@ const api = axios.create({
     'Content-Type': 'application/json',
     'Accept': 'application/json',
   },
+  // 304 Not Modified is answered from etagCache below
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
 });
 
+// Last ETag and body per GET URL; the server answers 304 until the next upload
+const etagCache = new Map<string, { etag: string; data: any }>();
+
 // Add request interceptor for debugging
 api.interceptors.request.use(
   (config) => {
     console.log('API Request:', config.method?.toUpperCase(), config.url);
+    const cached = config.method === 'get' ? etagCache.get(api.getUri(config)) : undefined;
+    if (cached) {
+      config.headers.set('If-None-Match', cached.etag);
+    }
     return config;
   },
   (error) => {
@@ -37,6 +46,15 @@ api.interceptors.request.use(
 api.interceptors.response.use(
   (response) => {
     console.log('API Response:', response.status, response.config.url);
+    if (response.config.method !== 'get') {
+      return response;
+    }
+    const key = api.getUri(response.config);
+    if (response.status === 304) {
+      response.data = etagCache.get(key)?.data;
+    } else if (response.headers.etag) {
+      etagCache.set(key, { etag: response.headers.etag, data: response.data });
+    }
     return response;
   },
   (error) => {
@@ -142,6 +160,8 @@ export interface BayiDetail {
   gelisim_yuzdesi?: number;
   borc_durumu?: string;
   ziyaret_gunleri?: string[];
+  borc?: Record<string, number> | null;
+  hedef?: Record<string, any> | null;
 }
 
 export interface Fatura {
@@ -172,6 +192,24 @@ export interface PasifBayi {
   txtkapsam?: string;
 }
 
+// Paged list endpoints answer { items, next_cursor } when limit or after is
+// sent (without either they return a capped bare array for older app builds);
+// always send a limit and follow the cursor so each request stays small.
+const PAGE_SIZE = 500;
+
+export const getAllPages = async <T = any>(url: string, params: Record<string, any> = {}): Promise<T[]> => {
+  const items: T[] = [];
+  let after: string | null = null;
+  do {
+    const response: { data: { items: T[]; next_cursor: string | null } } = await api.get(url, {
+      params: { ...params, limit: PAGE_SIZE, ...(after ? { after } : {}) },
+    });
+    items.push(...response.data.items);
+    after = response.data.next_cursor;
+  } while (after);
+  return items;
+};
+
 // API Functions
 export const authAPI = {
   login: async (data: LoginRequest): Promise<LoginResponse> => {
@@ -186,8 +224,7 @@ export const dashboardAPI = {
     return response.data;
   },
   getPasifBayiler: async (): Promise<PasifBayi[]> => {
-    const response = await api.get('/pasif-bayiler');
-    return response.data;
+    return getAllPages<PasifBayi>('/pasif-bayiler');
   },
 };
 
@@ -201,12 +238,10 @@ export const bayiAPI = {
     return response.data;
   },
   getFaturalar: async (bayiKodu: string): Promise<Fatura[]> => {
-    const response = await api.get(`/bayiler/${bayiKodu}/faturalar`);
-    return response.data;
+    return getAllPages<Fatura>(`/bayiler/${bayiKodu}/faturalar`);
   },
   getTahsilatlar: async (bayiKodu: string): Promise<Tahsilat[]> => {
-    const response = await api.get(`/bayiler/${bayiKodu}/tahsilatlar`);
-    return response.data;
+    return getAllPages<Tahsilat>(`/bayiler/${bayiKodu}/tahsilatlar`);
   },
 };
 
@@ -218,7 +253,7 @@ export const faturaAPI = {
 };
 
 export const uploadAPI = {
-  uploadExcel: async (file: File | { uri: string; name: string; type: string }): Promise<{ success: boolean; message: string }> => {
+  uploadExcel: async (file: File | { uri: string; name: string; type: string }): Promise<{ success: boolean; message: string; job_id?: string }> => {
     const formData = new FormData();
     
     if (file instanceof File) {
@@ -241,6 +276,10 @@ export const uploadAPI = {
     });
     return response.data;
   },
+  getJob: async (jobId: string) => {
+    const response = await api.get(`/upload/jobs/${jobId}`);
+    return response.data;
+  },
 };
 
 export default api;
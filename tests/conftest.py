@@ -0,0 +1,42 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# server.py reads these at import; the unit tests never reach Mongo
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'unit_tests')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from pyxlsb.worksheet import Cell  # noqa: E402
+
+
+class FakeSheet:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def rows(self):
+        for r, values in enumerate(self._rows):
+            yield [Cell(r, c, v) for c, v in enumerate(values)]
+
+
+class FakeWorkbook:
+    """Stands in for pyxlsb.open_workbook(): {sheet name: [[cell values], ...]}"""
+
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def get_sheet(self, name):
+        return FakeSheet(self.sheets[name])
+
+
+@pytest.fixture
+def workbook():
+    return FakeWorkbook
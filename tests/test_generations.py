@@ -0,0 +1,52 @@
+import server
+
+
+def test_inactive_copy_alternates():
+    assert server.inactive_copy({}, "faturalar") == "faturalar__alt"
+    assert server.inactive_copy({"faturalar": "faturalar__alt"}, "faturalar") == "faturalar"
+    assert server.inactive_copy({"faturalar": "faturalar"}, "faturalar") == "faturalar__alt"
+
+
+def test_generation_database_resolves_through_the_request_snapshot():
+    database = server.GenerationDatabase(server.client["unit_tests"])
+    database.physical = {"faturalar": "faturalar__alt"}
+    assert database.faturalar.name == "faturalar__alt"
+    assert database["system_info"].name == "system_info"
+    token = server.request_generation.set((3, {}))
+    try:
+        # İstek başladığında yayında olan harita geçerli kalır
+        assert database["faturalar"].name == "faturalar"
+    finally:
+        server.request_generation.reset(token)
+    assert database.resolve("faturalar") == "faturalar__alt"
+
+
+def test_row_ids_depend_only_on_content():
+    rows = [{"bayi_kodu": "1", "tutar": 1.0}, {"bayi_kodu": "1", "tutar": 2.0}]
+    server.stamp_row_ids(rows)
+    inserted = [{"bayi_kodu": "1", "tutar": 0.5}, {"bayi_kodu": "1", "tutar": 1.0}, {"bayi_kodu": "1", "tutar": 2.0}]
+    server.stamp_row_ids(inserted)
+    # Araya eklenen satır diğerlerinin id'sini değiştirmez
+    assert [row["_id"] for row in inserted[1:]] == [row["_id"] for row in rows]
+
+
+def test_identical_rows_get_distinct_ids():
+    rows = [{"matbu_no": "M1"}, {"matbu_no": "M1"}, {"matbu_no": "M1"}]
+    server.stamp_row_ids(rows)
+    digest = rows[0]["_id"]
+    assert [row["_id"] for row in rows] == [digest, f"{digest}|1", f"{digest}|2"]
+
+
+def test_has_row_id_follows_the_counts():
+    rows = [{"a": 1}, {"a": 1}, {"a": 2}]
+    seen = {}
+    server.stamp_row_ids(rows[:2], seen)
+    server.stamp_row_ids(rows[2:], seen)
+    assert all(server.has_row_id(seen, row["_id"]) for row in rows)
+    assert not server.has_row_id(seen, f"{rows[0]['_id']}|2")
+    assert not server.has_row_id(seen, "0" * 24)
+
+
+def test_chunked():
+    assert list(server.chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(server.chunked([], 2)) == []
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.mark.parametrize('value, expected', [
+    (1234.0, "1234"),
+    ("1234.0", "1234"),
+    (" 1234 ", "1234"),
+    (1234, "1234"),
+    ("1234.00", "1234"),
+    (12.5, "12.5"),
+    ("12.5", "12.5"),
+    ("A-12", "A-12"),
+    (float("nan"), ""),
+    (float("inf"), ""),
+    (None, ""),
+])
+def test_canonical_bayi_kodu(value, expected):
+    assert server.canonical_bayi_kodu(value) == expected
+
+
+@pytest.mark.parametrize('kanal, expected', [
+    ("piyasa", {"kanal_grubu": {"$in": ["piyasa"]}}),
+    ("Yerel-Zincir", {"kanal_grubu": {"$in": ["yerel-zincir"]}}),
+    ("askeriye", {"kanal_grubu": {"$in": ["askeriye", "cezaevi"]}}),
+    ("cezaevi", {"kanal_grubu": {"$in": ["cezaevi"]}}),
+    ("01", {"kanal_kodu": "01"}),
+    ("01 BAK", {"kanal_kodu": "01", "tip": {"$regex": "^01\\ bak", "$options": "i"}}),
+    ("", None),
+])
+def test_kanal_filtresi(kanal, expected):
+    assert server.kanal_filtresi(kanal) == expected
+
+
+def test_kanal_filtresi_escapes_regex():
+    query = server.kanal_filtresi("01.*")
+    assert query["tip"]["$regex"] == "^01\\.\\*"
+
+
+def test_add_kanal_kodlari_uses_the_collection_table():
+    bayiler = [{"tip": "02 MAR"}, {"tip": "11 CZV"}, {"tip": None}]
+    server.add_kanal_kodlari("bayiler", bayiler)
+    assert [(d["kanal_kodu"], d["kanal_grubu"]) for d in bayiler] == [
+        ("02", "piyasa"), ("11", "cezaevi"), (None, None)]
+    konya_gun = [{"tip": "02 YER"}, {"tip": "03 CEZ"}, {"tip": "04 BEN"}]
+    server.add_kanal_kodlari("konya_gun", konya_gun)
+    assert [d["kanal_grubu"] for d in konya_gun] == ["yerel-zincir", "askeriye", "benzinlik"]
+
+
+@pytest.mark.parametrize('kapsam, gun', [("bolge", "toplam"), ("dst", "14"), ("tumu", "")])
+def test_cari_bayiler_rejects_unknown_kapsam_and_gun(kapsam, gun):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(server.cari_bayiler(kapsam, "X", gun))
+    assert exc.value.status_code == 400
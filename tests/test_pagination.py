@@ -0,0 +1,77 @@
+import base64
+from datetime import datetime
+
+import pytest
+from bson import ObjectId, json_util
+from fastapi import HTTPException
+
+import server
+
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize('values', [
+    [1234.5, "100001|00000|abc"],
+    [None, 3],
+    ["KONYA", ObjectId("6ad3312e0d287bc561bd523a")],
+    [datetime(2025, 3, 12, 8, 30), True],
+])
+def test_cursor_round_trip(values):
+    cursor = server.encode_cursor(values)
+    assert "=" not in cursor
+    assert server.decode_cursor(cursor, len(values)) == values
+
+
+@pytest.mark.parametrize('cursor', [
+    "bm90IGpzb24",  # "not json"
+    "%%%",
+    raw_cursor({"_id": 1}),
+    raw_cursor([1, 2, 3]),
+    raw_cursor([{"$ne": None}, 1]),
+    raw_cursor([{"$gt": ""}, {"$regex": "."}]),
+    raw_cursor([[1], 2]),
+])
+def test_decode_cursor_rejects_tampered_cursors(cursor):
+    with pytest.raises(HTTPException) as exc:
+        server.decode_cursor(cursor, 2)
+    assert exc.value.status_code == 400
+
+
+def test_keyset_filter_ascending():
+    sort = [("bayi_unvani", 1), ("_id", 1)]
+    assert server.keyset_filter(sort, ["ALİ", 7]) == {"$or": [
+        {"bayi_unvani": {"$gt": "ALİ"}},
+        {"bayi_unvani": "ALİ", "_id": {"$gt": 7}},
+    ]}
+
+
+def test_keyset_filter_descending_and_nulls():
+    sort = [("gun_deger", -1), ("_id", 1)]
+    assert server.keyset_filter(sort, [50.0, "x"]) == {"$or": [
+        {"$or": [{"gun_deger": {"$lt": 50.0}}, {"gun_deger": None}]},
+        {"gun_deger": 50.0, "_id": {"$gt": "x"}},
+    ]}
+    # Azalan sırada null en sondadır: ondan sonra aynı null grubu kalır
+    assert server.keyset_filter(sort, [None, "x"]) == {"$or": [{"gun_deger": None, "_id": {"$gt": "x"}}]}
+    # Artan sırada null en baştadır: ondan sonra tüm null olmayanlar gelir
+    assert server.keyset_filter([("bayi_unvani", 1), ("_id", 1)], [None, 1]) == {"$or": [
+        {"bayi_unvani": {"$ne": None}},
+        {"bayi_unvani": None, "_id": {"$gt": 1}},
+    ]}
+
+
+def test_page_limit_defaults_and_caps():
+    assert server.page_limit(None, "c") == (server.PAGE_DEFAULT_LIMIT, True)
+    assert server.page_limit(25) == (25, True)
+    assert server.page_limit(server.PAGE_MAX_LIMIT * 10) == (server.PAGE_MAX_LIMIT, True)
+    assert server.page_response([1], "c") == {"items": [1], "next_cursor": "c"}
+    assert server.page_response([]) == {"items": [], "next_cursor": None}
+
+
+def test_requests_without_limit_or_after_get_a_bare_list():
+    # Sayfalamayı bilmeyen eski uygulama sürümleri düz liste bekler
+    assert server.page_limit(None) == (server.UNPAGED_LIST_LIMIT, False)
+    assert server.page_response([1, 2], None, paged=False) == [1, 2]
+    assert server.page_response([1, 2], "c", paged=False) == [1, 2]
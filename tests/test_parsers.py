@@ -0,0 +1,78 @@
+import pytest
+
+import server
+
+
+def reference_extract(fields, row):
+    """The per-field lookups the hand-written sheet parsers did before compile_extractor"""
+    return {
+        field: server.FIELD_TYPES[kind][0](row[col].v) if len(row) > col else server.FIELD_TYPES[kind][1]
+        for field, col, kind in fields
+    }
+
+
+SCHEMAS = [value for name, value in vars(server).items()
+           if name.endswith('_SCHEMA') and isinstance(value, server.SheetSchema)]
+
+
+@pytest.mark.parametrize('schema', SCHEMAS, ids=lambda schema: schema.sheet)
+def test_compiled_extractor_matches_reference(schema, workbook):
+    values = [None, '', '  metin  ', 0, 0.0, 12.0, 12.5, 'x', 45000.0]
+    full = [values[col % len(values)] for col in range(schema.width)]
+    for width in (schema.width, schema.width // 2, 1):
+        row = next(iter(workbook({schema.sheet: [full[:width]]}).get_sheet(schema.sheet).rows()))
+        assert schema.extract(row) == reference_extract(schema.fields, row)
+
+
+def test_compile_extractor_types_and_missing_columns(workbook):
+    extract = server.compile_extractor([
+        ("ad", 0, "str"), ("not", 1, "str?"), ("tutar", 2, "float"), ("adet", 3, "int"), ("ham", 4, "raw"),
+    ])
+    row = next(iter(workbook({'s': [[' Ali ', '', '12.5', 3.9, 'x']]}).get_sheet('s').rows()))
+    assert extract(row) == {"ad": "Ali", "not": None, "tutar": 12.5, "adet": 3, "ham": "x"}
+    short = next(iter(workbook({'s': [[None]]}).get_sheet('s').rows()))
+    assert extract(short) == {"ad": None, "not": None, "tutar": 0, "adet": 0, "ham": None}
+
+
+def materialize(parsed):
+    """The big sheets' parsers return generators"""
+    return {name: list(rows) for name, rows in parsed.items()}
+
+
+def test_parse_fatura(workbook):
+    header = ['H'] * 14
+    rows = [
+        ['1234', None, None, 45000.0, None, 'M001', None, None, None, None, None, None, None, 150.5],
+        [5678.0, None, None, '12.03.2025', None, 'M002', None, None, None, None, None, None, None, None],
+        [None, None, None, 45000.0, None, 'M003', None, None, None, None, None, None, None, 1.0],
+        ['9999', None, None, 45000.0, None, 'M004'],
+    ]
+    assert materialize(server.parse_fatura(workbook({'Fatura': [header, *rows]}))) == {"faturalar": [
+        {"bayi_kodu": "1234", "tarih": "15/03/2023", "tarih_sort": 45000, "matbu_no": "M001", "net_tutar": 150.5},
+        {"bayi_kodu": "5678", "tarih": "12.03.2025", "tarih_sort": 20250312, "matbu_no": "M002", "net_tutar": 0.0},
+    ]}
+
+
+def test_parse_tahsilat_and_belge_detay(workbook):
+    tahsilat = [['H'] * 9, [None, 'NAKİT', ' 42 ', None, None, '05/11/2024', None, None, '99.9']]
+    assert materialize(server.parse_tahsilat(workbook({'tahsilat': tahsilat}))) == {"tahsilatlar": [
+        {"bayi_kodu": "42", "tahsilat_turu": "NAKİT", "islem_tarihi": "05/11/2024", "tarih_sort": 20241105,
+         "tutar": 99.9},
+    ]}
+    detay = [['H'] * 9, ['M001', None, None, None, None, None, 'URUN', 2.0, 7.5], ['M002', None, None]]
+    assert materialize(server.parse_belge_detay(workbook({'Belge detay': detay}))) == {"belge_detay": [
+        {"matbu_no": "M001", "urun": "URUN", "miktar": 2.0, "birim_fiyat": 7.5, "satir_no": 1},
+    ]}
+
+
+def test_parse_stand_raporu(workbook):
+    row = [None] * 73
+    row[5], row[6], row[7], row[11], row[12] = 1234.0, 'BAYİ', '01 BAK', 'MERAM', 'Pasif'
+    row[59], row[60], row[62] = 'DST', 'TTE', 'KAPSAM'
+    row[66], row[68] = 1.0, 1.0
+    assert server.parse_stand_raporu(workbook({'STAND RAPORU': [['H'] * 73, row, [None] * 73]})) == {
+        "stand_raporu": [{
+            "bayi_kodu": "1234", "bayi_unvani": "BAYİ", "tip": "01 BAK", "ilce": "MERAM", "bayi_durumu": "Pasif",
+            "dst": "DST", "tte": "TTE", "txtkapsam": "KAPSAM", "ziyaret_gunleri": ["Pazartesi", "Çarşamba"],
+        }],
+    }
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+class Counter:
+    def __init__(self, value="sonuç"):
+        self.calls = 0
+        self.value = value
+
+    async def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def lookup(cache, key, compute):
+    return asyncio.run(cache.get_or_compute(key, compute))
+
+
+def test_hit_within_ttl():
+    cache = server.ResponseCache(max_entries=10, ttl=60, max_bytes=1 << 20)
+    cache.set_generation(1)
+    compute = Counter()
+    assert lookup(cache, ("f", 1, ()), compute) == "sonuç"
+    assert lookup(cache, ("f", 1, ()), compute) == "sonuç"
+    assert compute.calls == 1
+    assert cache.counters["hits"] == 1 and cache.counters["misses"] == 1
+
+
+def test_expired_entry_is_recomputed():
+    cache = server.ResponseCache(max_entries=10, ttl=0, max_bytes=1 << 20)
+    cache.set_generation(1)
+    compute = Counter()
+    lookup(cache, ("f", 1, ()), compute)
+    lookup(cache, ("f", 1, ()), compute)
+    assert compute.calls == 2
+    assert cache.counters["expirations"] == 1
+    assert cache.bytes == server.response_size("sonuç")
+
+
+def test_new_generation_clears_entries():
+    cache = server.ResponseCache(max_entries=10, ttl=60, max_bytes=1 << 20)
+    cache.set_generation(1)
+    lookup(cache, ("f", 1, ()), Counter())
+    cache.set_generation(1)
+    assert cache.stats()["entries"] == 1
+    cache.set_generation(2)
+    assert cache.stats()["entries"] == 0 and cache.bytes == 0
+    assert cache.counters["invalidations"] == 1
+
+
+def test_result_of_an_old_generation_is_not_stored():
+    cache = server.ResponseCache(max_entries=10, ttl=60, max_bytes=1 << 20)
+    cache.set_generation(2)
+    compute = Counter()
+    # Hesaplama eski nesille başladıysa sonuç döner ama saklanmaz
+    assert lookup(cache, ("f", 1, ()), compute) == "sonuç"
+    assert cache.stats()["entries"] == 0
+
+
+def test_errors_and_failed_responses_are_not_cached():
+    cache = server.ResponseCache(max_entries=10, ttl=60, max_bytes=1 << 20)
+    cache.set_generation(1)
+
+    async def fail():
+        raise RuntimeError("mongo down")
+
+    with pytest.raises(RuntimeError):
+        lookup(cache, ("f", 1, ()), fail)
+    lookup(cache, ("g", 1, ()), Counter(server.FastJSONResponse([], status_code=500)))
+    assert cache.stats()["entries"] == 0
+    assert cache.counters["uncacheable"] == 1
+
+
+def test_byte_budget_evicts_least_recently_used():
+    size = server.response_size("x" * 100)
+    cache = server.ResponseCache(max_entries=10, ttl=60, max_bytes=size * 2)
+    cache.set_generation(1)
+    for name in ("a", "b"):
+        lookup(cache, (name, 1, ()), Counter("x" * 100))
+    lookup(cache, ("a", 1, ()), Counter())  # a en son kullanılan olur
+    lookup(cache, ("c", 1, ()), Counter("x" * 100))
+    assert [key[0] for key in cache._entries] == ["a", "c"]
+    assert cache.bytes == size * 2
+    assert cache.counters["evictions"] == 1
+
+
+def test_fields_order_and_duplicates_share_a_cache_entry():
+    calls = []
+
+    @server.cached
+    async def endpoint(fields=None):
+        calls.append(fields)
+        return "sonuç"
+
+    async def run():
+        server.request_generation.set((1, {}))
+        server.response_cache.set_generation(1)
+        for fields in ("a,b", "b, a", "a,b,a", "b"):
+            await endpoint(fields=fields)
+
+    server.response_cache.clear()
+    asyncio.run(run())
+    assert calls == ["a,b", "b"]